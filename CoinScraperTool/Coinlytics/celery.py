@@ -15,3 +15,7 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # ✅ enbaling discover tasks in all installed apps
 app.autodiscover_tasks()
+
+
+# ✅ Connecting the task telemetry signals (publishers and workers alike)
+import core.task_telemetry  # noqa: E402,F401
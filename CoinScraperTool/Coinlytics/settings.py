@@ -14,6 +14,18 @@ CELERY_BEAT_SCHEDULE = {
         "task": "core.tasks.clean_old_logs",
         "schedule": timedelta(days=1),
     },
+    "dispatch_scheduled_scrapes": {
+        "task": "scraper_app.tasks.dispatch_scheduled_scrapes",
+        "schedule": timedelta(minutes=1),
+    },
+    "roll_up_price_candles": {
+        "task": "scraper_app.tasks.roll_up_price_candles",
+        "schedule": timedelta(minutes=1),
+    },
+    "refresh_exchange_rates": {
+        "task": "scraper_app.tasks.refresh_exchange_rates",
+        "schedule": timedelta(minutes=5),
+    },
 }
 
 
@@ -50,6 +62,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -151,7 +164,60 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
-
+# Run tasks inline (e.g. for the test suite) when no broker is available
+CELERY_TASK_ALWAYS_EAGER = config(
+    'CELERY_TASK_ALWAYS_EAGER', default=False, cast=bool)
+
+
+# ✅ Redis used for application caches ("memory://" for an in-process stand-in)
+REDIS_URL = config('REDIS_URL', default='redis://redis:6379/1')
+REDIS_SOCKET_TIMEOUT = 2
+# Latest-price cache: hard expiry and the age after which entries are flagged stale
+LATEST_PRICE_TTL = 60 * 60
+LATEST_PRICE_STALE_SECONDS = 5 * 60
+
+
+# ✅ Scraping engine configuration (source adapters are dotted paths)
+SCRAPER_PRICE_SOURCE = 'scraper_app.sources.CoinGeckoSource'
+SCRAPER_RATE_SOURCE = 'scraper_app.sources.OpenExchangeRatesSource'
+SCRAPER_MAX_CONCURRENCY = 10
+SCRAPER_TIMEOUT = 10
+SCRAPER_RATE_BASE = 'USD'
+SCRAPER_RATE_TARGETS = ['EUR', 'GBP', 'KES', 'JPY']
+OPEN_EXCHANGE_APP_ID = config('OPEN_EXCHANGE_APP_ID', default='')
+# How often a process-local rate matrix checks for newer snapshots
+RATE_MATRIX_CHECK_SECONDS = 2
+# Parallel ScheduledScrape workers and the size/lease of each claimed batch
+SCRAPER_DISPATCH_WORKERS = 2
+SCRAPER_CLAIM_BATCH_SIZE = 1000
+SCRAPER_CLAIM_LEASE_SECONDS = 120
+SCRAPER_MAX_BATCHES_PER_TICK = 50
+# Ticks read per candle rollup transaction, and batches per task run
+CANDLE_ROLLUP_BATCH_SIZE = 20000
+CANDLE_ROLLUP_MAX_BATCHES = 50
+# How long ids skipped by the rollup (uncommitted rows) are looked for again
+CANDLE_ROLLUP_GAP_SECONDS = 10 * 60
+# Minimum gap between two price alerts for the same preference and coin
+ALERT_COOLDOWN_SECONDS = 30 * 60
+# Upper bound on cached analytics results; new candles for any member coin
+# invalidate them sooner
+ANALYTICS_CACHE_TTL = 60 * 60
+# Per-user cache of read action responses (api.response_cache); writes to the
+# rows behind a response invalidate it, the TTL bounds sliding time windows
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=True, cast=bool)
+RESPONSE_CACHE_SIZE = 2048
+RESPONSE_CACHE_TTL = 60
+# Also share cached responses between processes through Redis
+RESPONSE_CACHE_REDIS = config('RESPONSE_CACHE_REDIS', default=False, cast=bool)
+
+
+# ✅ Request metrics served at /metrics (Prometheus text format)
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+# How often each process adds its counts to the totals shared in Redis
+METRICS_FLUSH_SECONDS = 5
+# Scrapes must send "Authorization: Bearer <token>". Deployments (DEBUG off)
+# have to set it: without a token /metrics answers 404 unless DEBUG is on
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
 
 # ✅ Referencing the user model
 AUTH_USER_MODEL = 'users.CustomUser'
@@ -163,6 +229,12 @@ EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
+# Mails per send_mail_batch task (one SMTP connection each) and its retry policy
+MAIL_BATCH_SIZE = 100
+MAIL_MAX_RETRIES = 5
+MAIL_RETRY_BACKOFF = 30
+# Path (after protocol://domain/) of the link in password reset emails
+PASSWORD_RESET_CONFIRM_URL = 'password-reset/{uid}/{token}/'
 
 # ✅ Setting the authenticatication and permission policies
 REST_FRAMEWORK = {
@@ -171,6 +243,22 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
 }
+# What to do when a viewset action exceeds its query_budgets entry:
+# 'off', 'log' (a warning on the coinlytics.db logger) or 'raise'
+QUERY_BUDGET_MODE = config('QUERY_BUDGET_MODE', default='log')
+# Decimals in the values_list fast path: 'string' (as the serializers
+# render them) or 'float' (smaller and faster, but lossy)
+FAST_SERIALIZER_DECIMALS = config('FAST_SERIALIZER_DECIMALS', default='string')
+# Rows fetched and encoded per chunk by the NDJSON/CSV streaming responses
+STREAM_CHUNK_SIZE = 2000
+# Upper bound on ?max_points= of the chart endpoints (downsampled series)
+MAX_CHART_POINTS = 5000
+# Live prices (api.live, served under ASGI): ticks buffered per client before
+# its oldest are dropped, idle keepalive interval and the client retry delay
+PRICE_STREAM_QUEUE_SIZE = 100
+PRICE_STREAM_HEARTBEAT_SECONDS = 15
+PRICE_STREAM_RETRY_MS = 3000
+
 # ✅ Specifying the header type to be used in Postman
 SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
 
+from core.metrics import metrics_view
+
 admin.site.site_header = "Coin Scrape Admin"
 admin.site.index_title = "Admin"
 
@@ -11,6 +13,7 @@ urlpatterns = [
     path('api/', include('api.urls')),
     path('auth/', include('djoser.urls')),
     path('auth/', include('djoser.urls.jwt')),
+    path('metrics', metrics_view, name='metrics'),
     path('favicon.ico', RedirectView.as_view(
         url='/static/favicon.ico', permanent=True)),
 ]
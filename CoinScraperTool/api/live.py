@@ -0,0 +1,108 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+from scraper_app.live import price_hub
+
+
+_jwt = JWTStatelessUserAuthentication()
+
+
+# ✅ Authenticating a live client from its JWT without touching the database
+def token_user(authorization, token):
+    """
+    EventSource and browser WebSockets cannot send headers, so the access
+    token may also come as ?token=. The stateless user keeps thousands of
+    connecting clients off the database, at the cost of a deactivated user
+    keeping access until the token expires.
+    """
+    try:
+        raw = _jwt.get_raw_token(authorization.encode()) if authorization else None
+        raw = raw or (token.encode() if token else None)
+        if raw is None:
+            return None
+        return _jwt.get_user(_jwt.get_validated_token(raw))
+    except AuthenticationFailed:
+        return None
+
+
+def coins_param(value):
+    return [coin.strip() for coin in (value or '').upper().split(',') if coin.strip()]
+
+
+# ✅ Server-Sent Events stream of live prices (?coins=BTC,ETH filters)
+async def price_stream(request):
+    user = token_user(request.headers.get('Authorization'), request.GET.get('token'))
+    if user is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided'},
+                            status=401)
+    subscriber = await price_hub.subscribe(coins_param(request.GET.get('coins')))
+
+    async def events():
+        try:
+            yield f"retry: {settings.PRICE_STREAM_RETRY_MS}\n\n"
+            while True:
+                try:
+                    tick = await subscriber.get(settings.PRICE_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: price\ndata: {json.dumps(tick)}\n\n"
+        finally:
+            price_hub.unsubscribe(subscriber)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# ✅ WebSocket variant of the stream, served as a plain ASGI application
+async def price_socket(scope, receive, send):
+    if (await receive())['type'] != 'websocket.connect':
+        return
+    params = {key: values[-1] for key, values in
+              parse_qs(scope.get('query_string', b'').decode()).items()}
+    headers = dict(scope.get('headers', []))
+    user = token_user(headers.get(b'authorization', b'').decode(), params.get('token'))
+    if user is None:
+        await send({'type': 'websocket.close', 'code': 4401})
+        return
+
+    await send({'type': 'websocket.accept'})
+    subscriber = await price_hub.subscribe(coins_param(params.get('coins')))
+
+    async def forward():
+        while True:
+            await send({'type': 'websocket.send', 'text': json.dumps(await subscriber.get())})
+
+    # Incoming frames are ignored; the socket lives until the client leaves
+    async def wait_for_disconnect():
+        while (await receive())['type'] != 'websocket.disconnect':
+            pass
+
+    tasks = [asyncio.ensure_future(forward()), asyncio.ensure_future(wait_for_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        price_hub.unsubscribe(subscriber)
+
+
+WEBSOCKET_ROUTES = {'/ws/prices/': price_socket}
+
+
+async def websocket_application(scope, receive, send):
+    handler = WEBSOCKET_ROUTES.get(scope['path'])
+    if handler is None:
+        await receive()
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+    await handler(scope, receive, send)
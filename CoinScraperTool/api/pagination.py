@@ -0,0 +1,132 @@
+import base64
+import json
+from collections import namedtuple
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+# Position of a row in the (timestamp, id) ordering; `reverse` marks a
+# cursor that walks back towards the previous page
+Cursor = namedtuple('Cursor', ['timestamp', 'id', 'reverse'])
+
+
+# ✅ Keyset pagination on (timestamp, id) with opaque cursors
+class KeysetPagination(BasePagination):
+    """
+    Each page is `WHERE (timestamp, id) < cursor ORDER BY timestamp, id
+    LIMIT n + 1` against a (…, timestamp, id) index, so page N costs the
+    same as page 1. No COUNT(*) is run; clients follow `next`/`previous`.
+    `?ordering=timestamp` walks oldest first and `-timestamp` (the default)
+    newest first; any other ordering is a 400, since the cursor cannot
+    honour it.
+    """
+    page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    time_field = 'timestamp'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.descending = self.get_descending(request)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+
+        if self.cursor:
+            # Rows past the cursor in the direction being walked
+            older = self.descending != reverse
+            queryset = queryset.filter(self.position_filter(self.cursor, older))
+        queryset = queryset.order_by(*self.ordering(reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else self.cursor is not None
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_descending(self, request):
+        ordering = request.query_params.get('ordering') or f'-{self.time_field}'
+        if ordering not in (self.time_field, f'-{self.time_field}'):
+            raise ValidationError({'ordering': [
+                f"Only '{self.time_field}' or '-{self.time_field}' can be paginated."]})
+        return ordering != self.time_field
+
+    def ordering(self, reverse=False):
+        prefix = '-' if self.descending != reverse else ''
+        return (f'{prefix}{self.time_field}', f'{prefix}id')
+
+    def position_filter(self, cursor, older):
+        # The leading `lte`/`gte` keeps the predicate sargable on the
+        # (timestamp, id) index; the OR only breaks ties within a timestamp
+        op = 'lt' if older else 'gt'
+        return Q(**{f'{self.time_field}__{op}e': cursor.timestamp}) & (
+            Q(**{f'{self.time_field}__{op}': cursor.timestamp}) |
+            Q(**{f'id__{op}': cursor.id}))
+
+    def encode_cursor(self, row, reverse):
+        if row is None:
+            # Empty page: continue from the position we were given
+            position = (self.cursor.timestamp.isoformat(), self.cursor.id)
+        else:
+            position = (getattr(row, self.time_field).isoformat(), row.id)
+        token = base64.urlsafe_b64encode(
+            json.dumps([*position, int(reverse)]).encode()).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            timestamp, pk, reverse = json.loads(base64.urlsafe_b64decode(token))
+            return Cursor(datetime.fromisoformat(timestamp), int(pk), bool(reverse))
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1] if self.page else None, False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.page[0] if self.page else None, True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
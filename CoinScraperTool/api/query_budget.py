@@ -0,0 +1,55 @@
+import logging
+
+from django.conf import settings
+from django.db import connection
+
+
+# Rate limited by core.logging_config, so a hot N+1 cannot flood the log
+logger = logging.getLogger('coinlytics.db')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised (with QUERY_BUDGET_MODE = 'raise') when an action runs more
+    queries than its declared budget
+    """
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+# ✅ Declarative per-action query budgets for viewsets
+class QueryBudgetMixin:
+    """
+    `query_budgets` maps action names to the most queries one request may
+    run, authentication included. Budgets must not depend on the number of
+    rows returned, so an N+1 regression shows up as soon as a test lists
+    more rows than the budget. Actions without a budget are not checked.
+    """
+    query_budgets = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        if settings.QUERY_BUDGET_MODE == 'off':
+            return super().dispatch(request, *args, **kwargs)
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = super().dispatch(request, *args, **kwargs)
+        self.check_query_budget(counter.count)
+        return response
+
+    def check_query_budget(self, count):
+        budget = self.query_budgets.get(getattr(self, 'action', None))
+        if budget is None or count <= budget:
+            return
+        message = (f"{type(self).__name__}.{self.action} ran {count} queries "
+                   f"(budget {budget})")
+        if settings.QUERY_BUDGET_MODE == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning("Query budget exceeded: %s", message)
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from django.conf import settings
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+
+from core.redis_client import get_redis
+from scraper_app.user_versions import bump_failed, user_versions
+
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'respcache'
+# Response headers kept with a cached body (validators set by ConditionalGetMixin)
+CACHED_HEADERS = ['ETag', 'Cache-Control']
+
+
+# ✅ Process-local LRU of rendered responses, optionally backed by Redis
+class ResponseCache:
+    """
+    Keeps up to RESPONSE_CACHE_SIZE rendered responses per process, each
+    for at most RESPONSE_CACHE_TTL seconds. With RESPONSE_CACHE_REDIS the
+    entries are also shared through Redis, so a process that has not seen
+    a key yet can still skip the work. Keys already embed the data
+    versions, so entries are never invalidated in place: stale ones are
+    simply no longer asked for and age out of the LRU.
+
+    A version bump that fails leaves such keys pointing at stale entries,
+    so `suspend()` then drops the LRU and ignores both tiers until every
+    entry stored before the failure has expired.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.suspended_until = 0
+
+    def get(self, key):
+        if self.suspended_until > time.time():
+            return None
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry['expires'] > time.time():
+                    self.entries.move_to_end(key)
+                    return entry
+                del self.entries[key]
+        if not settings.RESPONSE_CACHE_REDIS:
+            return None
+
+        try:
+            cached = get_redis().get(f"{KEY_PREFIX}:{key}")
+        except redis.RedisError as exc:
+            logger.warning("Response cache read failed: %s", exc)
+            return None
+        if cached is None:
+            return None
+        entry = json.loads(cached)
+        self.remember(key, entry)
+        return entry
+
+    def set(self, key, entry):
+        if self.suspended_until > time.time():
+            return
+        entry['expires'] = time.time() + settings.RESPONSE_CACHE_TTL
+        self.remember(key, entry)
+        if not settings.RESPONSE_CACHE_REDIS:
+            return
+        try:
+            get_redis().set(f"{KEY_PREFIX}:{key}", json.dumps(entry),
+                            ex=settings.RESPONSE_CACHE_TTL)
+        except redis.RedisError as exc:
+            logger.warning("Response cache write failed: %s", exc)
+
+    def remember(self, key, entry):
+        with self._lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.RESPONSE_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def suspend(self):
+        self.suspended_until = time.time() + settings.RESPONSE_CACHE_TTL
+        self.clear()
+
+
+response_cache = ResponseCache()
+
+
+@receiver(bump_failed)
+def user_versions_unreliable(sender, **kwargs):
+    response_cache.suspend()
+
+
+# Raised from initial() on a hit; handle_exception() turns it into the response
+class CachedResponse(Exception):
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+def cached_response(request, entry):
+    headers = entry['headers']
+    response = None
+    if 'ETag' in headers:
+        response = get_conditional_response(request, etag=headers['ETag'])
+    if response is None:
+        response = HttpResponse(entry['content'], status=entry['status'],
+                                content_type=entry['content_type'])
+    for name, value in headers.items():
+        response.headers[name] = value
+    return response
+
+
+# ✅ Per-user caching of read actions, invalidated by writes to their models
+class ResponseCacheMixin:
+    """
+    `cached_actions` maps action names to the models whose rows they read.
+    GET responses of those actions are cached per user, query string and
+    media type; post_save/post_delete on any of the models bumps that
+    user's version (scraper_app.user_versions) once the write commits, and
+    the version is part of the key, so a cached response never outlives a
+    write. RESPONSE_CACHE_TTL bounds
+    how long results over a sliding time window are reused. When the
+    versions cannot be read, the action simply runs uncached.
+    """
+    cached_actions = {}
+
+    # Whose rows the response is built from; ALL_USERS for cross-user views
+    def response_cache_scope(self):
+        return self.request.user.pk
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._cache_key = self.response_cache_key(request)
+        entry = response_cache.get(self._cache_key) if self._cache_key else None
+        if entry is not None:
+            # Authentication, permissions and throttling have run; the
+            # action itself is skipped
+            raise CachedResponse(cached_response(request, entry))
+
+    def handle_exception(self, exc):
+        if isinstance(exc, CachedResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def response_cache_key(self, request):
+        models = self.cached_actions.get(getattr(self, 'action', None))
+        if not settings.RESPONSE_CACHE_ENABLED or models is None or request.method != 'GET':
+            return None
+        scope = self.response_cache_scope()
+        versions = user_versions(models, scope)
+        if versions is None:
+            return None
+        seed = repr((type(self).__name__, self.action, scope,
+                     sorted(request.query_params.lists()), request.accepted_media_type,
+                     timezone.get_current_timezone_name(), versions))
+        return hashlib.md5(seed.encode(), usedforsecurity=False).hexdigest()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, '_cache_key', None)
+        # Hits come back as plain HttpResponses and are not stored again
+        if key and isinstance(response, Response) and response.status_code == 200:
+            response.render()
+            response_cache.set(key, {
+                'status': response.status_code,
+                'content': response.content.decode(),
+                'content_type': response['Content-Type'],
+                'headers': {name: response[name] for name in CACHED_HEADERS
+                            if name in response},
+            })
+        return response
@@ -5,7 +5,8 @@ from scraper_app.models import (
     Profile, ScrapeLog,
     UserPreference, ScheduledScrape,
     ErrorLog, ExchangeRateSnapshot,
-    CoinComparison, UserActivity
+    CoinComparison, UserActivity,
+    PriceCandle
 )
 
 
@@ -23,10 +24,25 @@ class ScrapeLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = ScrapeLog
         fields = ['id', 'user', 'coin', 'price', 'currency', 'timestamp']
+        read_only_fields = ['timestamp']
+
+    # Symbols are stored upper-case so lookups can use plain equality
+    def validate_coin(self, value):
+        return value.upper()
+
+    def validate_currency(self, value):
+        return value.upper()
+
+
+class PriceCandleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PriceCandle
+        fields = ['coin', 'currency', 'resolution', 'bucket',
+                  'open', 'high', 'low', 'close', 'count']
 
 
 class UserPreferenceSerializer(serializers.ModelSerializer):
-    user_id = serializers.PrimaryKeyRelatedField(read_only=True)
+    user = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         model = UserPreference
@@ -40,7 +56,8 @@ class ScheduleScrapeSerializer(serializers.ModelSerializer):
     class Meta:
         model = ScheduledScrape
         fields = ['id', 'user', 'coin', 'currency',
-                  'interval_minutes', 'is_active', 'last_run']
+                  'interval_minutes', 'is_active', 'last_run', 'next_run_at']
+        read_only_fields = ['next_run_at']
 
 
 class ErrorLogSerializer(serializers.ModelSerializer):
@@ -48,17 +65,17 @@ class ErrorLogSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ErrorLog
-        fields = ['id', 'source', 'error_message', 'timestamp']
+        fields = ['id', 'user', 'source', 'error_message', 'timestamp']
 
 
 class ExchangeRateSnapshotSerializer(serializers.ModelSerializer):
     class Meta:
         model = ExchangeRateSnapshot
-        field = ['id', 'base_currency', 'target_currency', 'rate', 'timestamp']
+        fields = ['id', 'base_currency', 'target_currency', 'rate', 'timestamp']
 
 
 class CoinComparisonSerializer(serializers.ModelSerializer):
-    user_id = serializers.PrimaryKeyRelatedField(read_only=True)
+    user = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         model = CoinComparison
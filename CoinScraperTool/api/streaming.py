@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+
+# ✅ Encoding values the same way the DRF serializers render them
+def encode_value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return value
+
+
+def ndjson_chunks(rows, fields, chunk_size):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(
+            {field: encode_value(value) for field, value in zip(fields, row)}))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def csv_chunks(rows, fields, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    pending = 1
+    for row in rows:
+        writer.writerow([encode_value(value) for value in row])
+        pending += 1
+        if pending >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+STREAM_ENCODERS = {
+    'ndjson': ('application/x-ndjson', ndjson_chunks),
+    'csv': ('text/csv', csv_chunks),
+}
+
+
+# ✅ Streaming a queryset as NDJSON/CSV with flat memory use
+def stream_queryset(queryset, fields, stream_format, filename=None):
+    """
+    Rows are read through `values_list(...).iterator(chunk_size)` (a
+    server-side cursor on PostgreSQL) and encoded one chunk at a time, so
+    memory stays constant whatever the range and the first bytes go out
+    as soon as the first chunk is fetched.
+    """
+    chunk_size = settings.STREAM_CHUNK_SIZE
+    content_type, encoder = STREAM_ENCODERS[stream_format]
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+    response = StreamingHttpResponse(
+        encoder(rows, fields, chunk_size), content_type=content_type)
+    if filename:
+        response['Content-Disposition'] = (
+            f'attachment; filename="{filename}.{stream_format}"')
+    return response
+
+
+# ✅ Renderers that let DRF negotiate ?format=ndjson|csv; successful
+# responses bypass them with a StreamingHttpResponse, so they only ever
+# render small payloads such as validation errors
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(json.dumps(row, default=encode_value) + '\n'
+                       for row in rows).encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        buffer = io.StringIO()
+        if rows:
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return buffer.getvalue().encode(self.charset)
@@ -1,3 +1,712 @@
-from django.test import TestCase
+import asyncio
+import json
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import redis
+from asgiref.sync import iscoroutinefunction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.metrics import MetricsMiddleware, registry
+from core.redis_client import get_redis
+from core.testing import make_user
+from scraper_app.models import (
+    ScrapeLog, UserPreference, ExchangeRateSnapshot, ScheduledScrape, ErrorLog,
+    CoinComparison, UserActivity, Profile, PriceCandle)
+from .fastpath import ORJSONRenderer, RowSerializer
+from .live import price_stream, websocket_application
+from .query_budget import QueryBudgetExceeded
+from .response_cache import ResponseCache, response_cache
+from .serializers import ScrapeLogSerializer, ExchangeRateSnapshotSerializer
+from .views import UserActivityViewSet
+from scraper_app.price_cache import read_latest_prices, write_latest_prices
+from scraper_app.rates import rate_matrix
+from scraper_app.rollups import update_candles
+from scraper_app.engine import save_errors
+from scraper_app.live import PRICE_CHANNEL, price_hub, publish_ticks
+
+
+# Every API test also enforces the viewsets' query budgets
+@override_settings(REDIS_URL='memory://', QUERY_BUDGET_MODE='raise')
+class APITestCase(TestCase):
+
+    def setUp(self):
+        get_redis().flushdb()
+        # Rolled-back tests reuse user ids, so cached responses must not carry over
+        response_cache.clear()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class ScrapeLogViewSetTests(APITestCase):
+
+    def test_symbols_are_stored_upper_case(self):
+        response = self.client.post('/api/scrape-logs/', {
+            'coin': 'btc', 'currency': 'usd', 'price': '65000.5'})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['coin'], 'BTC')
+        self.assertEqual(response.data['currency'], 'USD')
+
+    def test_posted_prices_stay_private(self):
+        self.client.post('/api/scrape-logs/', {'coin': 'btc', 'price': '1'})
+
+        self.assertTrue(ScrapeLog.objects.get().is_manual)
+        self.assertEqual(read_latest_prices([('BTC', 'USD')]), {('BTC', 'USD'): None})
+        self.assertEqual(update_candles(), (0, 0, 0))
+        self.assertEqual(len(self.client.get(
+            '/api/scrape-logs/by_coin/', {'coin': 'btc'}).json()), 1)
+
+    def test_price_history_keeps_intraday_order(self):
+        now = timezone.now()
+        for minutes, price in [(30, '3'), (90, '1'), (60, '2')]:
+            ScrapeLog.objects.create(user=self.user, coin='btc', price=price,
+                                     timestamp=now - timedelta(minutes=minutes))
+
+        response = self.client.get(
+            '/api/scrape-logs/price_history/', {'coin': 'Btc', 'days': 1})
+
+        self.assertEqual([Decimal(row['price']) for row in response.data],
+                         [1, 2, 3])
+
+    def test_price_history_reads_candles_for_resolution(self):
+        now = timezone.now()
+        for hours in range(48):
+            ScrapeLog.objects.create(user=self.user, coin='BTC', price=hours,
+                                     timestamp=now - timedelta(hours=hours))
+        update_candles()
+
+        response = self.client.get('/api/scrape-logs/price_history/',
+                                   {'coin': 'btc', 'days': 3, 'resolution': '1d'})
+
+        self.assertEqual(sum(row['count'] for row in response.data), 48)
+        self.assertLessEqual(len(response.data), 3)
+
+    def test_price_history_rejects_unknown_resolution(self):
+        response = self.client.get('/api/scrape-logs/price_history/',
+                                   {'coin': 'btc', 'resolution': '5m'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_price_history_converts_to_another_currency(self):
+        rate_matrix.reset()
+        ExchangeRateSnapshot.objects.create(
+            base_currency='USD', target_currency='EUR', rate='0.5')
+        ScrapeLog.objects.create(user=self.user, coin='BTC', price='100',
+                                 currency='USD')
+
+        response = self.client.get('/api/scrape-logs/price_history/',
+                                   {'coin': 'btc', 'convert_to': 'eur'})
+
+        self.assertEqual((response.data[0]['price'],
+                          response.data[0]['currency']), ('50.000000', 'EUR'))
+
+    def test_price_history_rejects_unreachable_currency(self):
+        rate_matrix.reset()
+        ScrapeLog.objects.create(user=self.user, coin='BTC', price='100')
+
+        response = self.client.get('/api/scrape-logs/price_history/',
+                                   {'coin': 'btc', 'convert_to': 'jpy'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_price_history_streams_ndjson(self):
+        for price in ['1', '2', '3']:
+            ScrapeLog.objects.create(user=self.user, coin='BTC', price=price)
+
+        response = self.client.get('/api/scrape-logs/price_history/',
+                                   {'coin': 'btc', 'format': 'ndjson'})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in
+                b''.join(response.streaming_content).decode().splitlines()]
+        json_rows = self.client.get('/api/scrape-logs/price_history/',
+                                    {'coin': 'btc'}).json()
+        self.assertEqual(rows, json_rows)
+
+    def test_price_history_streams_csv(self):
+        ScrapeLog.objects.create(user=self.user, coin='BTC', price='7.5')
+
+        response = self.client.get('/api/scrape-logs/price_history/',
+                                   {'coin': 'btc', 'format': 'csv'})
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,user,coin,price,currency,timestamp')
+        self.assertIn(',BTC,7.500000,USD,', lines[1])
+
+    def test_price_history_downsamples_to_max_points(self):
+        now = timezone.now()
+        ScrapeLog.objects.bulk_create(
+            ScrapeLog(user=self.user, coin='BTC', price=i,
+                      timestamp=now - timedelta(minutes=i))
+            for i in range(200))
+
+        response = self.client.get('/api/scrape-logs/price_history/',
+                                   {'coin': 'BTC', 'max_points': 20})
+
+        self.assertEqual(len(response.data), 20)
+        self.assertEqual(response.data[0]['price'], '199.000000')
+        self.assertEqual(response.data[-1]['price'], '0.000000')
+        self.assertEqual(self.client.get(
+            '/api/scrape-logs/price_history/',
+            {'coin': 'BTC', 'max_points': 1}).status_code, 400)
+        self.assertEqual(self.client.get(
+            '/api/scrape-logs/price_history/',
+            {'coin': 'BTC', 'max_points': 5001}).status_code, 400)
+
+    def test_list_walks_keyset_pages_both_ways(self):
+        now = timezone.now()
+        # Ties on timestamp are broken by id, so no row is skipped or repeated
+        for i in range(5):
+            ScrapeLog.objects.create(user=self.user, coin='BTC', price=i,
+                                     timestamp=now - timedelta(minutes=i // 2))
+
+        pages, url = [], '/api/scrape-logs/?page_size=2'
+        while url:
+            with self.assertNumQueries(1):
+                data = self.client.get(url).json()
+            pages.append([row['price'] for row in data['results']])
+            last, url = data, data['next']
+
+        # Newest first, then highest id within a shared timestamp
+        self.assertEqual(pages, [['1.000000', '0.000000'],
+                                 ['3.000000', '2.000000'], ['4.000000']])
+        previous = self.client.get(last['previous']).json()
+        self.assertEqual([row['price'] for row in previous['results']],
+                         ['3.000000', '2.000000'])
+
+    def test_list_rejects_orderings_the_cursor_cannot_follow(self):
+        ScrapeLog.objects.create(user=self.user, coin='BTC', price=1)
+
+        response = self.client.get('/api/scrape-logs/', {'ordering': 'price'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.data)
+        for ordering in ('timestamp', '-timestamp'):
+            self.assertEqual(self.client.get(
+                '/api/scrape-logs/', {'ordering': ordering}).status_code, 200)
+
+    def test_list_rejects_tampered_cursor(self):
+        response = self.client.get('/api/scrape-logs/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class UserPreferenceViewSetTests(APITestCase):
+
+    def test_latest_serves_favorites_from_cache_with_candle_fallback(self):
+        preference = UserPreference.objects.create(
+            user=self.user, favorite_coins=['BTC', 'ETH', 'DOGE'])
+        now = timezone.now()
+        write_latest_prices([('BTC', 'USD', Decimal('65000'), now)])
+        ScrapeLog.objects.create(user=self.user, coin='ETH', price='3000',
+                                 timestamp=now - timedelta(minutes=1))
+        update_candles()
+
+        response = self.client.get(
+            f'/api/preferences/{preference.id}/latest/')
+
+        prices = {row['coin']: row['price'] for row in response.data['prices']}
+        self.assertEqual(prices, {'BTC': '65000.000000', 'ETH': '3000.000000',
+                                  'DOGE': None})
+
+    def test_correlation_matrix_of_favorites(self):
+        preference = UserPreference.objects.create(
+            user=self.user, favorite_coins=['btc', 'ETH', 'SOL'])
+        now = timezone.now()
+        for i, prices in enumerate([(100, 10, 5), (110, 12, 4), (105, 11, 6), (120, 13, 3)]):
+            for coin, price in zip(('BTC', 'ETH', 'SOL'), prices):
+                ScrapeLog.objects.create(user=self.user, coin=coin, price=price,
+                                         timestamp=now - timedelta(hours=4 - i))
+        update_candles()
+        url = f'/api/preferences/{preference.pk}/correlation_matrix/'
+
+        data = self.client.get(url).json()
+
+        self.assertEqual(data['coins'], ['BTC', 'ETH', 'SOL'])
+        self.assertEqual([data['correlation'][i][i] for i in range(3)], [1.0] * 3)
+        self.assertLess(data['correlation'][0][2], 0)
+        # Served from cache (only the preference lookup) until new candles
+        # arrive for a member coin
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        ScrapeLog.objects.create(user=self.user, coin='SOL', price=7)
+        update_candles()
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+
+class ExchangeRateSnapShotViewSetTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        rate_matrix.reset()
+        for rate in ['0.90', '0.92']:
+            ExchangeRateSnapshot.objects.create(
+                base_currency='USD', target_currency='EUR', rate=rate)
+        ExchangeRateSnapshot.objects.create(
+            base_currency='USD', target_currency='KES', rate='129.5')
+
+    def test_latest_rates_returns_newest_snapshot_per_pair(self):
+        response = self.client.get('/api/exchange-rates/latest_rates/')
+
+        self.assertEqual(
+            {(row['base_currency'], row['target_currency']): row['rate']
+             for row in response.data},
+            {('USD', 'EUR'): '0.920000', ('USD', 'KES'): '129.500000'})
+
+    def test_matrix_answers_repeat_lookups_without_queries(self):
+        rate_matrix.refresh(force=True)
+
+        with self.assertNumQueries(0):
+            rate_matrix.latest_snapshots()
+            converted = rate_matrix.convert('100', 'EUR', 'USD')
+
+        self.assertAlmostEqual(float(converted), 100 / 0.92, places=6)
+
+    def test_matrix_reloads_when_a_newer_snapshot_exists(self):
+        rate_matrix.refresh(force=True)
+        ExchangeRateSnapshot.objects.create(
+            base_currency='USD', target_currency='EUR', rate='0.95')
+        rate_matrix.checked_at = None
+
+        self.assertEqual(rate_matrix.rate('usd', 'eur'), Decimal('0.95'))
+
+    def test_convert_endpoint(self):
+        response = self.client.get('/api/exchange-rates/convert/',
+                                   {'base': 'usd', 'target': 'kes', 'amount': '2'})
+
+        self.assertEqual(response.data['converted'], '259.000000')
+
+
+class CoinComparisonViewSetTests(APITestCase):
+
+    def test_analytics_mode(self):
+        now = timezone.now()
+        for i, (btc, eth) in enumerate([(100, 10), (110, 12), (105, 11), (120, 13)]):
+            for coin, price in (('BTC', btc), ('ETH', eth)):
+                ScrapeLog.objects.create(user=self.user, coin=coin, price=price,
+                                         timestamp=now - timedelta(hours=4 - i))
+        update_candles()
+
+        response = self.client.get('/api/coin-comparisons/compare_coins/', {
+            'coin1': 'btc', 'coin2': 'eth', 'mode': 'analytics'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['points'], 4)
+        self.assertEqual(response.data['total_return']['BTC'], 0.2)
+        self.assertEqual(self.client.get('/api/coin-comparisons/compare_coins/', {
+            'coin1': 'btc', 'coin2': 'doge', 'mode': 'analytics'}).status_code, 400)
+
+
+class QueryBudgetTests(APITestCase):
+    ROWS = 5
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        Profile.objects.get_or_create(user=self.user)
+        self.preference = UserPreference.objects.create(
+            user=self.user, favorite_coins=['BTC', 'ETH', 'SOL'])
+        for i in range(self.ROWS):
+            ScrapeLog.objects.create(user=self.user, coin='BTC', price=100 + i,
+                                     timestamp=now - timedelta(hours=i))
+            ScheduledScrape.objects.create(user=self.user, coin=f'C{i}')
+            ErrorLog.objects.create(user=self.user, source='coingecko', error_message='x')
+            UserActivity.objects.create(user=self.user, action='scraped price')
+            CoinComparison.objects.create(user=self.user, coin1='BTC', coin2='ETH',
+                                          coin1_price=1, coin2_price=2)
+            ExchangeRateSnapshot.objects.create(
+                base_currency='USD', target_currency=f'X{i}', rate=1 + i)
+            for coin in ['BTC', 'ETH', 'SOL']:
+                PriceCandle.objects.create(
+                    resolution='1m', coin=coin, currency='USD',
+                    bucket=now - timedelta(minutes=i), open=1, high=1, low=1,
+                    close=10 + i, open_at=now, close_at=now)
+
+    def test_list_endpoints_stay_within_budget(self):
+        # Any per-row query would exceed the budgets with ROWS rows
+        for path in ['/api/profiles/', '/api/profiles/my_profile/', '/api/scrape-logs/',
+                     '/api/scrape-logs/by_coin/?coin=btc',
+                     '/api/scrape-logs/price_history/?coin=btc',
+                     '/api/preferences/', '/api/preferences/my_preference/',
+                     f'/api/preferences/{self.preference.pk}/latest/',
+                     '/api/schedule-scrapes/', '/api/schedule-scrapes/active_scrapes/',
+                     '/api/error-logs/', '/api/error-logs/recent_errors/',
+                     '/api/error-logs/error_summary/',
+                     '/api/exchange-rates/', '/api/exchange-rates/latest_rates/',
+                     '/api/coin-comparisons/', '/api/coin-comparisons/recent_comparisons/',
+                     '/api/coin-comparisons/compare_coins/?coin1=btc&coin2=eth',
+                     '/api/user-activities/', '/api/user-activities/recent_activity/',
+                     '/api/user-activities/activity_summary/']:
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path).status_code, 200)
+
+    def test_nested_users_and_fixed_actions(self):
+        data = self.client.get('/api/user-activities/').json()
+        self.assertEqual(data['results'][0]['user']['username'], self.user.username)
+        self.assertEqual(self.client.get('/api/preferences/my_preference/').json()['id'],
+                         self.preference.pk)
+        summary = self.client.get('/api/error-logs/error_summary/').json()
+        self.assertEqual(summary, {'sources': [{'source': 'coingecko', 'error_count': 5}],
+                                   'total_errors': 5})
+        latest = self.client.get(f'/api/preferences/{self.preference.pk}/latest/').json()
+        self.assertEqual([price['price'] for price in latest['prices']],
+                         ['10.000000'] * 3)
+
+    def test_exceeding_a_budget_fails_loudly(self):
+        with mock.patch.dict(UserActivityViewSet.query_budgets, {'list': 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/api/user-activities/')
+            with self.settings(QUERY_BUDGET_MODE='log'), \
+                    self.assertLogs('coinlytics.db', 'WARNING') as logs:
+                self.assertEqual(self.client.get('/api/user-activities/').status_code, 200)
+        self.assertIn('UserActivityViewSet.list ran 1 queries (budget 0)', logs.output[0])
+
+
+class FastPathTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now().replace(microsecond=123456)
+        for i, price in enumerate(['65000.5', '0.000001', '12']):
+            ScrapeLog.objects.create(user=self.user, coin='BTC', price=price,
+                                     timestamp=now - timedelta(minutes=i))
+            snapshot = ExchangeRateSnapshot.objects.create(
+                base_currency='USD', target_currency='EUR', rate=price)
+        ExchangeRateSnapshot.objects.filter(pk=snapshot.pk).update(
+            timestamp=now.replace(microsecond=0))
+
+    def assert_same_json(self, serializer_class, queryset):
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        fast = ORJSONRenderer().render(RowSerializer(serializer_class).serialize(queryset))
+        self.assertEqual(fast, expected)
+
+    def test_rows_match_the_model_serializers(self):
+        logs = ScrapeLog.objects.order_by('timestamp')
+        rates = ExchangeRateSnapshot.objects.order_by('id')
+        self.assert_same_json(ScrapeLogSerializer, logs)
+        self.assert_same_json(ExchangeRateSnapshotSerializer, rates)
+        with timezone.override('Africa/Nairobi'):
+            self.assert_same_json(ScrapeLogSerializer, logs)
+            self.assert_same_json(ExchangeRateSnapshotSerializer, rates)
+
+    @override_settings(FAST_SERIALIZER_DECIMALS='float')
+    def test_decimals_can_be_floats(self):
+        rows = RowSerializer(ScrapeLogSerializer).serialize(ScrapeLog.objects.order_by('-price'))
+        self.assertEqual([row['price'] for row in rows], [65000.5, 12.0, 1e-06])
+
+    def test_endpoints_render_through_orjson(self):
+        response = self.client.get('/api/scrape-logs/price_history/', {'coin': 'btc'})
+        self.assertEqual(response.content, JSONRenderer().render(ScrapeLogSerializer(
+            ScrapeLog.objects.order_by('timestamp'), many=True).data))
+        response = self.client.get('/api/exchange-rates/currency_pair/',
+                                   {'base': 'usd', 'target': 'eur'})
+        self.assertEqual(len(response.json()), 3)
+
+    def test_renderer_matches_drf_for_other_values(self):
+        data = {'amount': Decimal('1.50'), 1: [timezone.now(), None], 'text': 'a\u2028b'}
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)),
+                         json.loads(JSONRenderer().render(data)))
+        self.assertIn(b'\\u2028', ORJSONRenderer().render(data))
+
+
+class ConditionalGetTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        rate_matrix.reset()
+        self.now = timezone.now()
+        for i, price in enumerate([100, 110, 105]):
+            ScrapeLog.objects.create(user=self.user, coin='BTC', price=price,
+                                     timestamp=self.now - timedelta(minutes=30 * (3 - i)))
+
+    def revalidate(self, path, params, response, **headers):
+        return self.client.get(path, params, HTTP_IF_NONE_MATCH=response['ETag'], **headers)
+
+    def test_unchanged_history_is_not_modified(self):
+        path, params = '/api/scrape-logs/price_history/', {'coin': 'btc', 'days': 1}
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertNotIn('Last-Modified', response)
+
+        # One aggregate query, no rows fetched or serialized
+        with self.assertNumQueries(1):
+            cached = self.revalidate(path, params, response)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b'')
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+        # Another representation of the same rows has its own ETag
+        self.assertEqual(self.revalidate(
+            path, {**params, 'format': 'csv'}, response).status_code, 200)
+
+        ScrapeLog.objects.create(user=self.user, coin='BTC', price=120,
+                                 timestamp=self.now - timedelta(hours=2))
+        changed = self.revalidate(path, params, response)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+        self.assertEqual(len(changed.json()), 4)
+
+    def test_candle_versions_skip_the_database(self):
+        update_candles()
+        path = '/api/scrape-logs/price_history/'
+        params = {'coin': 'btc', 'currency': 'usd', 'resolution': '1m'}
+        response = self.client.get(path, params)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.revalidate(path, params, response).status_code, 304)
+
+        ScrapeLog.objects.create(user=self.user, coin='BTC', price=130, timestamp=self.now)
+        update_candles()
+        self.assertEqual(self.revalidate(path, params, response).status_code, 200)
+
+    def test_latest_rates_follow_the_rate_matrix(self):
+        ExchangeRateSnapshot.objects.create(base_currency='USD', target_currency='EUR',
+                                            rate='0.90')
+        path = '/api/exchange-rates/latest_rates/'
+        response = self.client.get(path)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.revalidate(path, {}, response).status_code, 304)
+
+        ExchangeRateSnapshot.objects.create(base_currency='USD', target_currency='EUR',
+                                            rate='0.95')
+        rate_matrix.checked_at = None
+        self.assertEqual(self.revalidate(path, {}, response).status_code, 200)
+
+    def test_if_modified_since_and_other_users(self):
+        CoinComparison.objects.create(user=self.user, coin1='BTC', coin2='ETH',
+                                      coin1_price=100, coin2_price=10)
+        path = '/api/coin-comparisons/recent_comparisons/'
+        response = self.client.get(path)
+
+        # Deleting the newest row leaves an older "newest" timestamp behind;
+        # only the ETag can tell, so If-Modified-Since alone never gets a 304
+        since = http_date(time.time())
+        CoinComparison.objects.all().delete()
+        self.assertEqual(self.client.get(path, HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+
+        other = APIClient()
+        other.force_authenticate(make_user('other'))
+        self.assertEqual(other.get(path, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+
+class ResponseCacheTests(APITestCase):
+
+    def test_summaries_are_served_from_cache_until_a_write(self):
+        path = '/api/user-activities/activity_summary/'
+        UserActivity.objects.create(user=self.user, action='viewed price history')
+        response = self.client.get(path)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(path)
+        self.assertEqual(cached.content, response.content)
+
+        # Versions move on once the write commits, never before
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/user-activities/log_activity/', {'action': 'compared coins'})
+            self.assertEqual(self.client.get(path).json()['total_activities'], 1)
+        self.assertEqual(self.client.get(path).json()['total_activities'], 2)
+
+    def test_keys_cover_user_and_query_params(self):
+        path = '/api/user-activities/activity_summary/'
+        UserActivity.objects.create(user=self.user, action='compared coins')
+        self.client.get(path)
+        self.assertEqual(self.client.get(path, {'days': 30}).json()['period_days'], 30)
+
+        other = APIClient()
+        other.force_authenticate(make_user('other'))
+        self.assertEqual(other.get(path).json()['total_activities'], 0)
+
+    def test_staff_error_summary_sees_every_users_writes(self):
+        path = '/api/error-logs/error_summary/'
+        self.user.is_staff = True
+        self.user.save()
+        self.client.get(path)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ErrorLog.objects.create(user=make_user('other'), source='coingecko',
+                                    error_message='timeout')
+        self.assertEqual(self.client.get(path).json()['total_errors'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            save_errors([('coingecko', 'timeout')])
+        self.assertEqual(self.client.get(path).json()['total_errors'], 2)
+
+    def test_cached_responses_keep_their_validators(self):
+        path = '/api/coin-comparisons/recent_comparisons/'
+        CoinComparison.objects.create(user=self.user, coin1='BTC', coin2='ETH',
+                                      coin1_price=100, coin2_price=10)
+        response = self.client.get(path)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(path, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+    @override_settings(RESPONSE_CACHE_REDIS=True)
+    def test_redis_tier_is_shared_between_processes(self):
+        path = '/api/user-activities/activity_summary/'
+        response = self.client.get(path)
+        response_cache.clear()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(path).content, response.content)
+
+    def test_unreadable_versions_bypass_the_cache(self):
+        path = '/api/user-activities/activity_summary/'
+        with mock.patch('api.response_cache.user_versions', return_value=None):
+            self.client.get(path)
+            with self.assertNumQueries(1):
+                self.client.get(path)
+
+    def test_failed_bumps_suspend_the_cache(self):
+        path = '/api/user-activities/activity_summary/'
+        self.client.get(path)
+        self.addCleanup(setattr, response_cache, 'suspended_until', 0)
+        with mock.patch('scraper_app.user_versions.get_redis',
+                        side_effect=redis.ConnectionError('down')):
+            with self.captureOnCommitCallbacks(execute=True):
+                UserActivity.objects.create(user=self.user, action='compared coins')
+
+        self.assertEqual(response_cache.entries, {})
+        self.assertEqual(self.client.get(path).json()['total_activities'], 1)
+        with self.assertNumQueries(1):
+            self.client.get(path)
+
+    @override_settings(RESPONSE_CACHE_SIZE=2)
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ResponseCache()
+        for key in ['a', 'b']:
+            cache.set(key, {})
+        cache.get('a')
+        cache.set('c', {})
+        self.assertEqual(list(cache.entries), ['a', 'c'])
+
+
+class LivePriceTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        price_hub.subscribers.clear()
+        self.token = str(AccessToken.for_user(self.user))
+
+    def ticks(self, *coins):
+        return [(coin, 'USD', '100.5', timezone.now()) for coin in coins]
+
+    # Like ASGIHandler on http.disconnect: the pending read is cancelled
+    async def disconnect(self, events):
+        pending = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+
+    async def test_sse_stream_filters_by_coin(self):
+        response = await self.async_client.get(
+            '/api/live/prices/', {'coins': 'btc', 'token': self.token})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = aiter(response.streaming_content)
+        self.assertTrue((await anext(events)).startswith(b'retry:'))
+
+        publish_ticks(self.ticks('ETH', 'BTC'))
+        event = await asyncio.wait_for(anext(events), 1)
+        self.assertTrue(event.startswith(b'event: price\n'))
+        self.assertEqual(json.loads(event.split(b'data: ')[1])['coin'], 'BTC')
+
+        await self.disconnect(events)
+        self.assertEqual(price_hub.count, 0)
+
+    @override_settings(PRICE_STREAM_HEARTBEAT_SECONDS=0.01)
+    async def test_idle_streams_send_keepalives(self):
+        response = await self.async_client.get(
+            '/api/live/prices/', headers={'Authorization': f'Bearer {self.token}'})
+        events = aiter(response.streaming_content)
+        await anext(events)
+        self.assertEqual(await asyncio.wait_for(anext(events), 1), b': keepalive\n\n')
+        await self.disconnect(events)
+
+    async def test_stream_requires_a_token(self):
+        response = await self.async_client.get('/api/live/prices/', {'token': 'nope'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_one_subscription_fans_out_to_every_client(self):
+        subscribers = [await price_hub.subscribe(coins) for coins in (['BTC'], ['ETH'], [])]
+        btc, eth, everything = subscribers
+        listener = price_hub._listener
+        self.assertEqual(len(get_redis()._subscribers), 1)
+
+        publish_ticks(self.ticks('BTC'))
+        self.assertEqual((await asyncio.wait_for(btc.get(), 1))['coin'], 'BTC')
+        self.assertEqual((await asyncio.wait_for(everything.get(), 1))['coin'], 'BTC')
+        self.assertTrue(eth.queue.empty())
+
+        for subscriber in subscribers:
+            price_hub.unsubscribe(subscriber)
+        await asyncio.sleep(0)
+        self.assertTrue(listener.cancelled())
+
+    async def test_malformed_messages_do_not_stop_the_listener(self):
+        subscriber = await price_hub.subscribe(['BTC'])
+        for message in ('not json', '[{"price": "1"}]', '42'):
+            get_redis().publish(PRICE_CHANNEL, message)
+        publish_ticks(self.ticks('BTC'))
+
+        with self.assertLogs('scraper_app.live', 'WARNING') as logs:
+            self.assertEqual((await asyncio.wait_for(subscriber.get(), 1))['coin'], 'BTC')
+        self.assertEqual(len(logs.output), 3)
+        self.assertFalse(price_hub._listener.done())
+        price_hub.unsubscribe(subscriber)
+
+    async def test_requests_are_measured_on_the_async_path(self):
+        self.assertTrue(iscoroutinefunction(MetricsMiddleware(price_stream)))
+        registry.take()
+        response = await self.async_client.get(
+            '/api/scrape-logs/', headers={'Authorization': f'Bearer {self.token}'})
+        self.assertEqual(response.status_code, 200)
+
+        pending = registry.take()
+        labels = (('method', 'GET'), ('status', '200'), ('view', 'scrapelog-list'))
+        self.assertGreater(pending[('http_request_duration_seconds', labels, '_sum')], 0)
+        self.assertGreater(pending[('http_request_db_queries', labels, '_sum')], 0)
+
+    @override_settings(PRICE_STREAM_QUEUE_SIZE=2)
+    async def test_slow_clients_drop_their_oldest_ticks(self):
+        subscriber = await price_hub.subscribe(['BTC'])
+        price_hub.dispatch([{'coin': 'BTC', 'price': str(i)} for i in range(3)])
+        self.assertEqual(subscriber.dropped, 1)
+        self.assertEqual((await subscriber.get())['price'], '1')
+        price_hub.unsubscribe(subscriber)
+
+    async def test_websocket_stream(self):
+        incoming, outgoing = asyncio.Queue(), asyncio.Queue()
+        scope = {'type': 'websocket', 'path': '/ws/prices/', 'headers': [],
+                 'query_string': f'coins=eth&token={self.token}'.encode()}
+        await incoming.put({'type': 'websocket.connect'})
+        app = asyncio.ensure_future(websocket_application(scope, incoming.get, outgoing.put))
+        self.assertEqual((await asyncio.wait_for(outgoing.get(), 1))['type'], 'websocket.accept')
+        while not price_hub.count:
+            await asyncio.sleep(0)
+
+        publish_ticks(self.ticks('BTC', 'ETH'))
+        message = await asyncio.wait_for(outgoing.get(), 1)
+        self.assertEqual(json.loads(message['text'])['coin'], 'ETH')
+
+        await incoming.put({'type': 'websocket.disconnect'})
+        await asyncio.wait_for(app, 1)
+        self.assertEqual(price_hub.count, 0)
+
+    async def test_websocket_rejects_missing_tokens(self):
+        incoming, outgoing = asyncio.Queue(), asyncio.Queue()
+        await incoming.put({'type': 'websocket.connect'})
+        await websocket_application({'type': 'websocket', 'path': '/ws/prices/'},
+                                    incoming.get, outgoing.put)
+        self.assertEqual((await outgoing.get())['code'], 4401)
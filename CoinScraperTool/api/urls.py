@@ -1,5 +1,6 @@
 from django.urls import path
 from rest_framework_nested import routers
+from .live import price_stream
 from .views import (
     ProfileViewSet,
     ScrapeLogViewSet,
@@ -29,4 +30,7 @@ router.register('user-activities', UserActivityViewSet,
                 basename='useractivity')
 
 
-urlpatterns = router.urls
+urlpatterns = [
+    path('live/prices/', price_stream, name='live-prices'),
+    *router.urls,
+]
@@ -1,13 +1,17 @@
+from django.conf import settings
 from django.shortcuts import render
 from rest_framework import status, filters
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.settings import api_settings
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
-from django.db.models import Max, Q
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
 from datetime import timedelta
 
 from api.serializers import (
@@ -18,7 +22,8 @@ from api.serializers import (
     ErrorLogSerializer,
     ExchangeRateSnapshotSerializer,
     CoinComparisonSerializer,
-    UserActivitySerializer
+    UserActivitySerializer,
+    PriceCandleSerializer
 )
 from scraper_app.models import (
     Profile,
@@ -28,22 +33,80 @@ from scraper_app.models import (
     ErrorLog,
     ExchangeRateSnapshot,
     CoinComparison,
-    UserActivity
+    UserActivity,
+    PriceCandle
 )
+from scraper_app.rollups import RESOLUTIONS, bucket_start, candle_versions
+from scraper_app.price_cache import read_latest_prices, write_latest_prices
+from scraper_app.rates import current_rates_version, rate_matrix
+from scraper_app.conversion import convert_rows, ConversionError
+from scraper_app.downsampling import downsample_queryset
+from scraper_app.analytics import compare_pair, correlation_matrix, AnalyticsError
+from scraper_app.user_versions import ALL_USERS
+from api.conditional import ConditionalGetMixin
+from api.fastpath import ORJSONRenderer, RowSerializer
+from api.pagination import KeysetPagination
+from api.query_budget import QueryBudgetMixin
+from api.response_cache import ResponseCacheMixin
+from api.serializer_metrics import SerializerMetricsMixin
+from api.streaming import (
+    NDJSONRenderer, CSVRenderer, STREAM_ENCODERS, stream_queryset
+)
+
+
+# High-volume read actions render their JSON through orjson
+FAST_RENDERERS = [ORJSONRenderer, *api_settings.DEFAULT_RENDERER_CLASSES]
+# Actions that can also stream their rows with ?format=ndjson|csv
+STREAMING_RENDERERS = [*FAST_RENDERERS, NDJSONRenderer, CSVRenderer]
+
+# Row-per-tuple serializers for the high-volume read paths
+SCRAPE_LOG_ROWS = RowSerializer(ScrapeLogSerializer)
+PRICE_CANDLE_ROWS = RowSerializer(PriceCandleSerializer)
+EXCHANGE_RATE_ROWS = RowSerializer(ExchangeRateSnapshotSerializer)
+
+
+# ✅ Re-expressing whole price series in another currency in one vectorised pass
+def converted_response(rows, convert_to, price_fields, time_field, **kwargs):
+    try:
+        rows = convert_rows(list(rows), convert_to,
+                            price_fields, time_field, **kwargs)
+    except ConversionError as exc:
+        return Response({'error': str(exc)},
+                        status=status.HTTP_400_BAD_REQUEST)
+    return Response(rows)
+
+
+# ✅ Reading the optional ?max_points= limit of the chart endpoints
+def max_points_param(request):
+    value = request.query_params.get('max_points')
+    if value is None:
+        return None
+    try:
+        max_points = int(value)
+    except ValueError:
+        max_points = 0
+    if not 3 <= max_points <= settings.MAX_CHART_POINTS:
+        raise ValidationError({'error': 'max_points must be an integer between 3 '
+                                        f'and {settings.MAX_CHART_POINTS}'})
+    return max_points
 
 
 # ✅ Viewset for managing user profiles
-class ProfileViewSet(ModelViewSet):
+class ProfileViewSet(QueryBudgetMixin, SerializerMetricsMixin, ModelViewSet):
     serializer_class = ProfileSerializer
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     permission_classes = [IsAuthenticated]
+    query_budgets = {
+        'list': 2, 'retrieve': 2, 'my_profile': 2,
+        'create': 3, 'update': 3, 'partial_update': 3, 'destroy': 3,
+    }
     filtered_fields = ['username', 'bio']
     search_fields = ['username']
     ordering_fields = ['username']
     ordering = ['username']
 
     def get_queryset(self):
-        return Profile.objects.filter(user=self.request.user)
+        return Profile.objects.filter(user=self.request.user).select_related('user')
 
     def get_permissions(self):
         return super().get_permissions()
@@ -55,7 +118,7 @@ class ProfileViewSet(ModelViewSet):
     @action(detail=False, methods=['get'])
     def my_profile(self, request):
         try:
-            profile = Profile.objects.get(user=request.user)
+            profile = self.get_queryset().get()
             serializer = self.get_serializer(profile)
             return Response(serializer.data)
         except Profile.DoesNotExist:
@@ -66,23 +129,32 @@ class ProfileViewSet(ModelViewSet):
 
 
 # ✅ Viewset for managing scrape logs
-class ScrapeLogViewSet(ModelViewSet):
+class ScrapeLogViewSet(QueryBudgetMixin, SerializerMetricsMixin, ConditionalGetMixin,
+                       ModelViewSet):
     serializer_class = ScrapeLogSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {
+        'list': 2, 'retrieve': 2, 'by_coin': 2, 'price_history': 5,
+        'create': 3, 'update': 3, 'partial_update': 3, 'destroy': 3,
+    }
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filtered_fields = ['coin', 'price', 'currency']
     search_fields = ['coin']
-    ordering_fields = ['timestamp', 'price']
+    ordering_fields = ['timestamp']
     ordering = ['-timestamp']
 
     def get_queryset(self):
         return ScrapeLog.objects.filter(user=self.request.user)
 
+    # Prices entered by hand are the user's own record: only scraped quotes
+    # (engine.fan_out_price_logs) reach the shared cache, alerts and streams
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user=self.request.user, is_manual=True,
+                        is_market_tick=False)
 
     # fetching scrape logs filtered by specific coin
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], renderer_classes=FAST_RENDERERS)
     def by_coin(self, request):
         coin = request.query_params.get('coin')
         if not coin:
@@ -90,12 +162,14 @@ class ScrapeLogViewSet(ModelViewSet):
                 {'error': 'Coin parameter is required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        logs = self.get_queryset().filter(coin__iexact=coin)
-        serializer = self.get_serializer(logs, many=True)
-        return Response(serializer.data)
+        logs = self.get_queryset().filter(coin=coin.upper())
+        currency = request.query_params.get('currency')
+        if currency:
+            logs = logs.filter(currency=currency.upper())
+        return Response(SCRAPE_LOG_ROWS.serialize(logs))
 
     # Fetching price history for a specific coin over time
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], renderer_classes=STREAMING_RENDERERS)
     def price_history(self, request):
         coin = request.query_params.get('coin')
         days = int(request.query_params.get('days', 30))
@@ -106,19 +180,100 @@ class ScrapeLogViewSet(ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         start_date = timezone.now() - timedelta(days=days)
+        currency = request.query_params.get('currency')
+        convert_to = request.query_params.get('convert_to')
+        max_points = max_points_param(request)
+        stream_format = request.accepted_renderer.format
+        streaming = stream_format in STREAM_ENCODERS
+        if streaming and convert_to:
+            return Response(
+                {'error': 'convert_to cannot be combined with a streaming format'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Converted prices also depend on the rate history; without its
+        # version counter they are never answered with a 304
+        rates_version = current_rates_version() if convert_to else None
+        conditional = not convert_to or rates_version is not None
+
+        # Rolled-up market candles: cost grows with buckets, not ticks. Unlike
+        # the raw path below they are market-wide (one series per pair built
+        # from scraped quotes), so they leave out the user's manual entries
+        resolution = request.query_params.get('resolution')
+        if resolution:
+            if resolution not in RESOLUTIONS:
+                return Response(
+                    {'error': f"resolution must be one of {', '.join(RESOLUTIONS)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            first_bucket = bucket_start(start_date, resolution)
+            candles = PriceCandle.objects.filter(
+                resolution=resolution,
+                coin=coin.upper(),
+                bucket__gte=first_bucket
+            ).order_by('bucket')
+            if currency:
+                candles = candles.filter(currency=currency.upper())
+            if conditional:
+                # Candles of one pair carry a version bumped by every roll-up,
+                # so polls skip the database; otherwise one aggregate query
+                version = (candle_versions([(coin.upper(), currency.upper())])[0]
+                           if currency else None)
+                if version is not None:
+                    not_modified = self.not_modified(
+                        request, version, first_bucket, rates_version)
+                else:
+                    not_modified = self.queryset_not_modified(
+                        request, candles, 'close_at', rates_version)
+                if not_modified is not None:
+                    return not_modified
+            if max_points:
+                candles = downsample_queryset(
+                    candles, max_points, 'bucket', 'close', series_field='currency')
+            if streaming:
+                return stream_queryset(
+                    candles, PriceCandleSerializer.Meta.fields, stream_format,
+                    f'{coin.upper()}_{resolution}_candles')
+            if convert_to:
+                return converted_response(
+                    candles.values(*PriceCandleSerializer.Meta.fields),
+                    convert_to, ['open', 'high', 'low', 'close'], 'bucket')
+            return Response(PRICE_CANDLE_ROWS.serialize(candles))
+
         logs = self.get_queryset().filter(
-            coin__iexact=coin,
+            coin=coin.upper(),
             timestamp__gte=start_date
         ).order_by('timestamp')
-
-        serializer = self.get_serializer(logs, many=True)
-        return Response(serializer.data)
+        if currency:
+            logs = logs.filter(currency=currency.upper())
+        if conditional:
+            not_modified = self.queryset_not_modified(
+                request, logs, 'timestamp', rates_version)
+            if not_modified is not None:
+                return not_modified
+        if max_points:
+            logs = downsample_queryset(
+                logs, max_points, 'timestamp', 'price', series_field='currency')
+        if streaming:
+            return stream_queryset(
+                logs, ScrapeLogSerializer.Meta.fields, stream_format,
+                f'{coin.upper()}_price_history')
+        if convert_to:
+            return converted_response(
+                logs.values(*ScrapeLogSerializer.Meta.fields),
+                convert_to, ['price'], 'timestamp')
+
+        return Response(SCRAPE_LOG_ROWS.serialize(logs))
 
 
 # ✅ Viewset for managing user's preference
-class UserPreferenceViewSet(ModelViewSet):
+class UserPreferenceViewSet(QueryBudgetMixin, SerializerMetricsMixin, ModelViewSet):
     serializer_class = UserPreferenceSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {
+        'list': 2, 'retrieve': 2, 'my_preference': 2, 'latest': 3,
+        'correlation_matrix': 3, 'get_coin': 3, 'remove_favorite_coin': 3,
+        'create': 3, 'update': 3, 'partial_update': 3, 'destroy': 3,
+    }
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filter_fields = ['favorite_coins', 'preferred_currency']
     search_fields = ['preferred_currency', 'favorite_coins']
@@ -134,15 +289,71 @@ class UserPreferenceViewSet(ModelViewSet):
     # Fetching the user preference
     @action(detail=False, methods=['get'])
     def my_preference(self, request):
-        try:
-            preference = UserPreference.objects.get(user=request.user)
-            serializer = self.get_serializer(preference)
-            return Response(serializer)
-        except UserPreference.DoesNotExist:
+        # A user may hold several preferences; the first one created wins
+        preference = self.get_queryset().order_by('id').first()
+        if preference is None:
             return Response(
-                {'error', 'Preference not found'},
+                {'error': 'Preference not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        serializer = self.get_serializer(preference)
+        return Response(serializer.data)
+
+    # Fetching the latest price of every favorite coin in one cache round trip
+    @action(detail=True, methods=['get'])
+    def latest(self, request, pk=None):
+        preference = self.get_object()
+        currency = preference.preferred_currency.upper()
+        pairs = [(coin.upper(), currency) for coin in preference.favorite_coins]
+        cached = read_latest_prices(pairs)
+
+        # Cache misses fall back to the newest 1m candle (one query for all
+        # of them) and are written back
+        misses = [coin for (coin, _), entry in cached.items() if entry is None]
+        backfill = []
+        if misses:
+            candles = PriceCandle.objects.filter(
+                resolution='1m', coin__in=misses, currency=currency
+            ).annotate(newest=Window(
+                RowNumber(), partition_by=[F('coin')], order_by=F('bucket').desc()
+            )).filter(newest=1)
+            backfill = [(candle.coin, currency, candle.close, candle.close_at)
+                        for candle in candles]
+        if backfill:
+            write_latest_prices(backfill)
+            cached.update(read_latest_prices(
+                [(coin, currency) for coin, currency, _, _ in backfill]))
+
+        prices = []
+        for coin, _ in pairs:
+            entry = cached.get((coin, currency))
+            prices.append({
+                'coin': coin,
+                'price': str(entry['price']) if entry else None,
+                'timestamp': entry['timestamp'] if entry else None,
+                'stale': entry['stale'] if entry else None,
+            })
+        return Response({'currency': currency, 'prices': prices})
+
+    # Correlation/covariance of all favorite coins in one vectorised pass
+    @action(detail=True, methods=['get'])
+    def correlation_matrix(self, request, pk=None):
+        preference = self.get_object()
+        resolution = request.query_params.get('resolution', '1h')
+        if resolution not in RESOLUTIONS:
+            return Response(
+                {'error': f"resolution must be one of {', '.join(RESOLUTIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            return Response(correlation_matrix(
+                preference.favorite_coins,
+                currency=preference.preferred_currency,
+                days=int(request.query_params.get('days', 30)),
+                resolution=resolution))
+        except AnalyticsError as exc:
+            return Response({'error': str(exc)},
+                            status=status.HTTP_400_BAD_REQUEST)
 
     # Adding a coin to a user's favorites
     @action(detail=True, methods=['post'])
@@ -184,16 +395,21 @@ class UserPreferenceViewSet(ModelViewSet):
 
 
 # ✅ Viewset to manage scheduled scraping jobs
-class ScheduledScrapeViewSet(ModelViewSet):
+class ScheduledScrapeViewSet(QueryBudgetMixin, SerializerMetricsMixin, ModelViewSet):
     serializer_class = ScheduleScrapeSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {
+        'list': 2, 'retrieve': 2, 'active_scrapes': 2, 'toggle_active': 3,
+        'update_last_run': 3, 'create': 3, 'update': 3, 'partial_update': 3, 'destroy': 3,
+    }
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filter_fields = ['coin', 'currency', 'is_active']
     ordering_fields = ['last_run', 'interval_minutes']
     ordering = ['-last_run']
 
     def get_queryset(self):
-        return ScheduledScrape.objects.get(user=self.request.user)
+        return ScheduledScrape.objects.filter(
+            user=self.request.user).select_related('user')
 
     def perform_create(self, serializer):
         return serializer.save(user=self.request.user)
@@ -227,9 +443,16 @@ class ScheduledScrapeViewSet(ModelViewSet):
 
 
 # ✅ A read-only viewset for error logs with filtering capabilities
-class ErrorLogViewSet(ModelViewSet):
+class ErrorLogViewSet(QueryBudgetMixin, SerializerMetricsMixin, ResponseCacheMixin,
+                      ModelViewSet):
     serializer_class = ErrorLogSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {
+        'list': 2, 'retrieve': 2, 'recent_errors': 2, 'error_summary': 2,
+        'create': 3, 'update': 3, 'partial_update': 3, 'destroy': 3,
+    }
+    cached_actions = {'error_summary': [ErrorLog]}
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     search_fields = ['error_message', 'source']
     ordering_fields = ['timestamp']
@@ -237,17 +460,24 @@ class ErrorLogViewSet(ModelViewSet):
 
     # Admin users can see all errors, regular users see only their own
     def get_queryset(self):
+        errors = ErrorLog.objects.select_related('user')
+        if self.request.user.is_staff:
+            return errors
+        return errors.filter(user=self.request.user)
+
+    def response_cache_scope(self):
         if self.request.user.is_staff:
-            return ErrorLog.objects.all()
-        return ErrorLog.objects.filter(user=self.request.user)
+            return ALL_USERS
+        return super().response_cache_scope()
 
     # Fetching recent errors (last 24 hours)
     @action(detail=False, methods=['get'])
     def recent_errors(self, request):
         yesterday = timezone.now() - timedelta(days=1)
         recent_errors = self.get_queryset().filter(timestamp__gte=yesterday)
-        serializer = self.get_serializer(recent_errors, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(recent_errors)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     # Fetching error summary by source
     @action(detail=False, methods=['get'])
@@ -258,44 +488,76 @@ class ErrorLogViewSet(ModelViewSet):
             error_count=Count('id')
         ).order_by('-error_count')
 
+        return Response({
+            'sources': summary,
+            'total_errors': sum(item['error_count'] for item in summary)
+        })
+
 
 # ✅ Read-only viewset for exchange rate snapshots
-class ExchangeRateSnapShotViewSet(ModelViewSet):
+class ExchangeRateSnapShotViewSet(QueryBudgetMixin, SerializerMetricsMixin, ConditionalGetMixin,
+                                  ModelViewSet):
     serializer_class = ExchangeRateSnapshotSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {
+        'list': 2, 'retrieve': 2, 'latest_rates': 2, 'convert': 2,
+        'currency_pair': 3, 'create': 3, 'update': 3, 'partial_update': 3, 'destroy': 3,
+    }
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filter_fields = ['base_currency', 'target_currency']
+    ordering_fields = ['timestamp']
     ordering = ['rate', 'timestamp']
 
     def get_queryset(self):
         return ExchangeRateSnapshot.objects.all()
 
-    # Fetching the latest timestamp for each currency pair
+    # Fetching the latest snapshot for each currency pair (served from memory)
     @action(detail=False, methods=['get'])
     def latest_rates(self, request):
+        snapshots = rate_matrix.latest_snapshots()
+        not_modified = self.not_modified(
+            request, [snapshot.pk for snapshot in snapshots])
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(snapshots, many=True)
+        return Response(serializer.data)
 
-        latest_snapshots = ExchangeRateSnapshot.objects.values(
-            'base_currency', 'target_currency'
-        ).annotate(
-            latest_timestamp=Max('timestamp')
-        )
+    # Converting an amount between two currencies using the latest rates
+    @action(detail=False, methods=['get'])
+    def convert(self, request):
+        base = request.query_params.get('base')
+        target = request.query_params.get('target')
+        amount = request.query_params.get('amount', '1')
 
-        # Filtering to get only the latest snapshots
-        latest_rates = []
-        for snapshot_info in latest_snapshots:
-            latest_rate = ExchangeRateSnapshot.objects.filter(
-                base_currency=snapshot_info['base_currency'],
-                target_currency=snapshot_info['target_currency'],
-                timestamp=snapshot_info['latest_timestamp']
-            ).first()
-            if latest_rate:
-                latest_rates.append(latest_rate)
-
-        serializer = self.get_serializer(latest_rates, many=True)
-        return Response(serializer.data)
+        if not base or not target:
+            return Response(
+                {'error': 'Both base and target currency parameters are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            converted = rate_matrix.convert(amount, base, target)
+        except ArithmeticError:
+            return Response(
+                {'error': 'Amount must be a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if converted is None:
+            return Response(
+                {'error': f'No exchange rate from {base.upper()} to {target.upper()}'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response({
+            'base': base.upper(),
+            'target': target.upper(),
+            'amount': amount,
+            'rate': str(rate_matrix.rate(base, target)),
+            'converted': str(converted),
+        })
 
     # Fetching exchange rate history for specific currency pair
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], renderer_classes=STREAMING_RENDERERS)
     def currency_pair(self, request):
         base = request.query_params.get('base')
         target = request.query_params.get('target')
@@ -313,15 +575,32 @@ class ExchangeRateSnapShotViewSet(ModelViewSet):
             target_currency=target.upper(),
             timestamp__gte=start_date
         ).order_by('timestamp')
+        max_points = max_points_param(request)
+        not_modified = self.queryset_not_modified(request, rates, 'timestamp')
+        if not_modified is not None:
+            return not_modified
+        if max_points:
+            rates = downsample_queryset(rates, max_points, 'timestamp', 'rate')
 
-        serializer = self.get_serializer(rates, many=True)
-        return Response(serializer.data)
+        stream_format = request.accepted_renderer.format
+        if stream_format in STREAM_ENCODERS:
+            return stream_queryset(
+                rates, ExchangeRateSnapshotSerializer.Meta.fields, stream_format,
+                f'{base.upper()}_{target.upper()}_rates')
+
+        return Response(EXCHANGE_RATE_ROWS.serialize(rates))
 
 
 # ✅  Managing coin comparisons ViewSet
-class CoinComparisonViewSet(ModelViewSet):
+class CoinComparisonViewSet(QueryBudgetMixin, SerializerMetricsMixin, ResponseCacheMixin,
+                            ConditionalGetMixin, ModelViewSet):
     serializer_class = CoinComparisonSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {
+        'list': 2, 'retrieve': 2, 'compare_coins': 4, 'recent_comparisons': 2,
+        'create': 3, 'update': 3, 'partial_update': 3, 'destroy': 3,
+    }
+    cached_actions = {'recent_comparisons': [CoinComparison]}
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['coin1', 'coin2']
     search_fields = ['coin1', 'coin2']
@@ -345,11 +624,38 @@ class CoinComparisonViewSet(ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # ?mode=analytics: statistics over both coins' candle series
+        if request.query_params.get('mode') == 'analytics':
+            resolution = request.query_params.get('resolution', '1h')
+            if resolution not in RESOLUTIONS:
+                return Response(
+                    {'error': f"resolution must be one of {', '.join(RESOLUTIONS)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                return Response(compare_pair(
+                    coin1, coin2,
+                    currency=request.query_params.get('currency', 'USD'),
+                    days=int(request.query_params.get('days', 30)),
+                    resolution=resolution,
+                    window=max(int(request.query_params.get('window', 24)), 2)))
+            except AnalyticsError as exc:
+                return Response({'error': str(exc)},
+                                status=status.HTTP_400_BAD_REQUEST)
+
         comparisons = self.get_queryset().filter(
             Q(coin1__iexact=coin1, coin2__iexact=coin2) |
             Q(coin1__iexact=coin2, coin2__iexact=coin1)
         ).order_by('-comparison_date')
 
+        # Stored prices are in `currency` (USD unless told otherwise)
+        convert_to = request.query_params.get('convert_to')
+        if convert_to:
+            return converted_response(
+                comparisons.values(*CoinComparisonSerializer.Meta.fields),
+                convert_to, ['coin1_price', 'coin2_price'], 'comparison_date',
+                default_currency=request.query_params.get('currency', 'USD'))
+
         serializer = self.get_serializer(comparisons, many=True)
         return Response(serializer.data)
 
@@ -360,21 +666,33 @@ class CoinComparisonViewSet(ModelViewSet):
         recent_comparisons = self.get_queryset().filter(
             comparison_date__gte=week_ago
         )
+        not_modified = self.queryset_not_modified(
+            request, recent_comparisons, 'comparison_date')
+        if not_modified is not None:
+            return not_modified
         serializer = self.get_serializer(recent_comparisons, many=True)
         return Response(serializer.data)
 
 
 # ✅  Read-only ViewSet for user activity tracking
-class UserActivityViewSet(ReadOnlyModelViewSet):
+class UserActivityViewSet(QueryBudgetMixin, SerializerMetricsMixin, ResponseCacheMixin,
+                          ReadOnlyModelViewSet):
     serializer_class = UserActivitySerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {
+        'list': 2, 'retrieve': 2, 'recent_activity': 2, 'activity_summary': 2,
+        'log_activity': 2,
+    }
+    cached_actions = {'activity_summary': [UserActivity]}
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     search_fields = ['action']
     ordering_fields = ['timestamp']
     ordering = ['-timestamp']
 
     def get_queryset(self):
-        return UserActivity.objects.filter(user=self.request.user)
+        return UserActivity.objects.filter(
+            user=self.request.user).select_related('user')
 
     # Fetching recent user activity (last 24 hours)
     @action(detail=False, methods=['get'])
@@ -382,8 +700,9 @@ class UserActivityViewSet(ReadOnlyModelViewSet):
 
         yesterday = timezone.now() - timedelta(days=1)
         recent_activity = self.get_queryset().filter(timestamp__gte=yesterday)
-        serializer = self.get_serializer(recent_activity, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(recent_activity)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     # Fetch activity summary with counts
     @action(detail=False, methods=['get'])
@@ -0,0 +1,255 @@
+import bisect
+import glob
+import gzip
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import TimedRotatingFileHandler
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process is assumed
+    fcntl = None
+
+LOG_FILE = "coinlytics_system.log"
+# Matches the "[%(asctime)s]" prefix written by core.logging_config
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Lines per gzip member; the unit of seeking and of partial trimming
+BLOCK_LINES = 2000
+INDEX_SUFFIX = ".idx"
+# Lock files shared by every process writing LOG_FILE (web, celery, ...)
+ROTATE_LOCK_SUFFIX = ".rotate.lock"
+COMPRESS_LOCK_SUFFIX = ".compress.lock"
+# A rotated segment is compressed once nothing has written to it for this long
+COMPRESS_GRACE_SECONDS = 60
+
+
+def line_epoch(line):
+    if line[:1] != b"[":
+        return None
+    try:
+        return time.mktime(time.strptime(line[1:20].decode(), TIME_FORMAT))
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def first_epoch(lines):
+    return next((epoch for epoch in map(line_epoch, lines) if epoch is not None), None)
+
+
+# ✅ Compressing a rotated segment into independently readable gzip members
+def compress_segment(source, target):
+    """
+    Streams `source` into `target` as one gzip member per BLOCK_LINES lines
+    (concatenated members are still a valid .gz file) and writes a sidecar
+    index of "<first epoch> <byte offset>" per member plus an "end <epoch>"
+    trailer, so retention can seek and trim without decompressing.
+    """
+    entries, block, last_epoch = [], [], None
+
+    partial = target + ".tmp"
+    with open(source, "rb") as src, open(partial, "wb") as dst:
+        def flush():
+            nonlocal last_epoch
+            epoch = first_epoch(block)
+            entries.append((epoch if epoch is not None else last_epoch, dst.tell()))
+            last_epoch = first_epoch(reversed(block)) or entries[-1][0]
+            dst.write(gzip.compress(b"".join(block)))
+            block.clear()
+
+        for line in src:
+            block.append(line)
+            if len(block) >= BLOCK_LINES:
+                flush()
+        if block:
+            flush()
+
+    os.replace(partial, target)
+    write_index(target, [(epoch, offset) for epoch, offset in entries
+                         if epoch is not None], last_epoch)
+
+
+def write_index(segment, entries, end):
+    temp = segment + INDEX_SUFFIX + ".tmp"
+    with open(temp, "w") as index:
+        for epoch, offset in entries:
+            index.write(f"{epoch:.0f} {offset}\n")
+        if end is not None:
+            index.write(f"end {end:.0f}\n")
+    os.replace(temp, segment + INDEX_SUFFIX)
+
+
+def read_index(segment):
+    epochs, offsets, end = [], [], None
+    try:
+        with open(segment + INDEX_SUFFIX) as index:
+            for line in index:
+                key, value = line.split()
+                if key == "end":
+                    end = float(value)
+                else:
+                    epochs.append(float(key))
+                    offsets.append(int(value))
+    except (OSError, ValueError):
+        return [], [], None
+    return epochs, offsets, end
+
+
+@contextmanager
+def file_lock(path, blocking=True):
+    """
+    Exclusive advisory lock across processes; yields False when
+    `blocking` is off and another process holds it
+    """
+    with open(path, "a") as handle:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def unused_segment_name(log_file, start):
+    # Never reuses the name of an existing segment, compressed or not
+    name = f"{log_file}.{time.strftime('%Y-%m-%d_%H-%M', time.localtime(start))}"
+    candidate, counter = name, 0
+    while os.path.exists(candidate) or os.path.exists(candidate + ".gz"):
+        counter += 1
+        candidate = f"{name}.{counter}"
+    return candidate
+
+
+# ✅ Time-rotated log file shared by several processes
+class SegmentedLogHandler(TimedRotatingFileHandler):
+    """
+    Every process (web, celery, ...) appends to the same live file and
+    rolls over at the same interval boundaries. Rollover runs under a
+    cross-process lock: the first process renames the live file to a new,
+    never reused segment name; the others find the file already replaced
+    and only reopen it. Segments are compressed later by compress_pending,
+    off the logging path, once nothing writes to them anymore.
+    """
+
+    def __init__(self, filename=LOG_FILE, when="H", interval=1):
+        super().__init__(filename, when=when, interval=interval,
+                         backupCount=0, encoding="utf-8")
+
+    # Boundaries of the interval, not offsets from this process's start
+    def computeRollover(self, currentTime):
+        return currentTime - currentTime % self.interval + self.interval
+
+    def owns_live_file(self):
+        if self.stream is None:
+            return False
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(self.stream.fileno())
+        return (current.st_dev, current.st_ino) == (opened.st_dev, opened.st_ino)
+
+    def doRollover(self):
+        rotated = False
+        with file_lock(self.baseFilename + ROTATE_LOCK_SUFFIX):
+            owned = self.owns_live_file()
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            if owned and os.path.getsize(self.baseFilename):
+                os.rename(self.baseFilename, unused_segment_name(
+                    self.baseFilename, self.rolloverAt - self.interval))
+                rotated = True
+            self.stream = self._open()
+        self.rolloverAt = self.computeRollover(time.time())
+        if rotated:
+            timer = threading.Timer(COMPRESS_GRACE_SECONDS, compress_pending,
+                                    args=(self.baseFilename,))
+            timer.daemon = True
+            timer.start()
+
+
+def list_segments(log_file=LOG_FILE):
+    return sorted(glob.glob(f"{glob.escape(log_file)}.*.gz"))
+
+
+def pending_segments(log_file=LOG_FILE):
+    return sorted(path for path in glob.glob(f"{glob.escape(log_file)}.*")
+                  if not path.endswith((".gz", INDEX_SUFFIX, ".tmp", ".lock")))
+
+
+# ✅ Compressing rotated segments that nothing writes to anymore
+def compress_pending(log_file=LOG_FILE, grace=COMPRESS_GRACE_SECONDS, now=None):
+    """
+    Runs in a timer thread after each rollover and from the retention task.
+    One process compresses at a time; the others skip the run.
+    """
+    now = now or time.time()
+    compressed = 0
+    with file_lock(log_file + COMPRESS_LOCK_SUFFIX, blocking=False) as locked:
+        if not locked:
+            return 0
+        for source in pending_segments(log_file):
+            if now - os.path.getmtime(source) < grace:
+                continue
+            compress_segment(source, source + ".gz")
+            os.remove(source)
+            compressed += 1
+    return compressed
+
+
+def remove_segment(segment):
+    for path in (segment, segment + INDEX_SUFFIX):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def trim_segment(segment, epochs, offsets, keep):
+    # Streams the members from `keep` onwards into a replacement file
+    start = offsets[keep]
+    temp = segment + ".tmp"
+    with open(segment, "rb") as src, open(temp, "wb") as dst:
+        src.seek(start)
+        shutil.copyfileobj(src, dst)
+    _, _, end = read_index(segment)
+    os.replace(temp, segment)
+    write_index(segment, [(epoch, offset - start) for epoch, offset
+                          in zip(epochs[keep:], offsets[keep:])], end)
+
+
+# ✅ Expiring rotated segments older than `retain_seconds`
+def purge_segments(retain_seconds, log_file=LOG_FILE, now=None):
+    """
+    Whole segments ending before the cutoff are deleted. The one segment
+    straddling it is binary searched through its index and loses only the
+    gzip members that end before the cutoff. Memory use is bounded by the
+    index, never by the size of the logs.
+    """
+    cutoff = (now or time.time()) - retain_seconds
+    removed = trimmed = 0
+    for segment in list_segments(log_file):
+        epochs, offsets, end = read_index(segment)
+        if end is None:
+            # No index (e.g. an interrupted compression): the file was last
+            # written when it was rotated
+            end = os.path.getmtime(segment)
+        if end < cutoff:
+            remove_segment(segment)
+            removed += 1
+            continue
+        # Members before `keep` all end at or before epochs[keep] <= cutoff
+        keep = bisect.bisect_right(epochs, cutoff) - 1
+        if keep > 0:
+            trim_segment(segment, epochs, offsets, keep)
+            trimmed += 1
+    return removed, trimmed
@@ -1,11 +1,20 @@
 import logging
 from datetime import datetime
+from decouple import config
 from django.utils import timezone
 from django.apps import apps
 from django.core.signals import request_started, request_finished
 from django.db.backends.signals import connection_created
 
-LOG_FILE = "coinlytics_system.log"
+from core.log_pipeline import AsyncLogging, RateLimitFilter, SamplingFilter
+from core.log_retention import LOG_FILE, SegmentedLogHandler
+
+# Request threads only enqueue records; a background thread writes them
+LOG_ASYNC = config('LOG_ASYNC', default=True, cast=bool)
+# Keep 1 in N request lifecycle lines, and at most this many per second
+LOG_REQUEST_SAMPLE_RATE = config('LOG_REQUEST_SAMPLE_RATE', default=1, cast=int)
+LOG_REQUEST_RATE_LIMIT = config('LOG_REQUEST_RATE_LIMIT', default=200, cast=int)
+LOG_DB_RATE_LIMIT = config('LOG_DB_RATE_LIMIT', default=10, cast=int)
 
 
 # Configuring root logger
@@ -13,22 +22,38 @@ logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 
-# Creating a file handler for app-wide logging
-file_handler = logging.FileHandler(LOG_FILE)
+# Creating a file handler for app-wide logging (hourly segments, gzipped once closed)
+file_handler = SegmentedLogHandler(LOG_FILE)
 formatter = logging.Formatter(
     "[%(asctime)s] [%(levelname)s] %(message)s", "%Y-%m-%d %H:%M:%S")
 file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
+if LOG_ASYNC:
+    async_logging = AsyncLogging(logger, [file_handler]).start()
+else:
+    logger.addHandler(file_handler)
+
+
+# High-volume lifecycle messages get their own loggers so they can be
+# sampled and rate limited before they are even queued
+request_logger = logging.getLogger('coinlytics.requests')
+request_logger.addFilter(SamplingFilter(LOG_REQUEST_SAMPLE_RATE))
+request_logger.addFilter(RateLimitFilter(LOG_REQUEST_RATE_LIMIT))
+db_logger = logging.getLogger('coinlytics.db')
+db_logger.addFilter(RateLimitFilter(LOG_DB_RATE_LIMIT))
 
 
 # ✅ Registering request lifecycle signals (logs every web and API requests)
-def log_request_started(sender, environ, **kwargs):
-    logger.info(" Request started: %s %s", environ.get(
-        "REQUEST_METHOD"), environ.get("PATH_INFO"))
+def log_request_started(sender, environ=None, scope=None, **kwargs):
+    # WSGI handlers send the environ, ASGI handlers the connection scope
+    if scope is not None:
+        method, path = scope.get("method"), scope.get("path")
+    else:
+        method, path = environ.get("REQUEST_METHOD"), environ.get("PATH_INFO")
+    request_logger.info(" Request started: %s %s", method, path)
 
 
 def log_request_completed(sender, **kwargs):
-    logger.info("Request completed successfully")
+    request_logger.info("Request completed successfully")
 
 
 request_started.connect(log_request_started)
@@ -38,7 +63,7 @@ request_finished.connect(log_request_completed)
 
 
 def log_db_connection(sender, connection, **kwargs):
-    logger.info("Database connected: %s", connection.settings_dict.get("NAME"))
+    db_logger.info("Database connected: %s", connection.settings_dict.get("NAME"))
 
 
 connection_created.connect(log_db_connection)
@@ -0,0 +1,305 @@
+import bisect
+import hmac
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import redis
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+from .redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY = 'metrics:series'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+# ✅ Thread-safe store of counters and fixed-bucket histograms
+class MetricsRegistry:
+    """
+    Holds the increments recorded since the last flush to Redis. Series are
+    keyed by (name, sorted label pairs); a histogram keeps one counter per
+    bucket plus its sum and count, which is all Prometheus needs.
+    """
+
+    def __init__(self):
+        self.definitions = {}
+        self.pending = defaultdict(float)
+        self._lock = threading.Lock()
+        self.flushed_at = time.monotonic()
+
+    def counter(self, name, help_text):
+        self.definitions[name] = ('counter', help_text, None)
+
+    def histogram(self, name, help_text, buckets):
+        self.definitions[name] = ('histogram', help_text, tuple(buckets))
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())), '')
+        with self._lock:
+            self.pending[key] += amount
+
+    def observe(self, name, value, **labels):
+        buckets = self.definitions[name][2]
+        labels = tuple(sorted(labels.items()))
+        # Non-cumulative here; rendering accumulates across buckets
+        index = bisect.bisect_left(buckets, value)
+        bucket = str(buckets[index]) if index < len(buckets) else '+Inf'
+        with self._lock:
+            self.pending[(name, labels, bucket)] += 1
+            self.pending[(name, labels, '_sum')] += value
+
+    def take(self):
+        with self._lock:
+            pending, self.pending = self.pending, defaultdict(float)
+            self.flushed_at = time.monotonic()
+        return pending
+
+    def restore(self, pending):
+        with self._lock:
+            for key, value in pending.items():
+                self.pending[key] += value
+
+    # ✅ Adding this process's increments to the totals shared by all workers
+    def flush(self):
+        pending = self.take()
+        if not pending:
+            return True
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for (name, labels, part), value in pending.items():
+                pipe.hincrbyfloat(REDIS_KEY, json.dumps([name, labels, part]), value)
+            pipe.execute()
+        except redis.RedisError as exc:
+            # Kept for the next flush, so nothing is lost while Redis is down
+            self.restore(pending)
+            logger.warning("Could not flush metrics: %s", exc)
+            return False
+        return True
+
+    def flush_due(self):
+        return time.monotonic() - self.flushed_at >= settings.METRICS_FLUSH_SECONDS
+
+    def maybe_flush(self):
+        if self.flush_due():
+            self.flush()
+
+    def totals(self):
+        """
+        Shared totals when Redis is reachable, otherwise whatever this
+        process has recorded since its last successful flush
+        """
+        if self.flush():
+            try:
+                series = get_redis().hgetall(REDIS_KEY)
+                return {series_key(*json.loads(field)): float(value)
+                        for field, value in series.items()}
+            except redis.RedisError as exc:
+                logger.warning("Could not read shared metrics: %s", exc)
+        with self._lock:
+            return dict(self.pending)
+
+    def render(self):
+        grouped = defaultdict(lambda: defaultdict(dict))
+        for (name, labels, part), value in self.totals().items():
+            grouped[name][labels][part] = value
+
+        lines = []
+        for name, (kind, help_text, buckets) in sorted(self.definitions.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, parts in sorted(grouped.get(name, {}).items()):
+                if kind == 'counter':
+                    lines.append(f"{name}{format_labels(labels)} {number(parts[''])}")
+                    continue
+                cumulative = 0
+                for bound in [*map(str, buckets), '+Inf']:
+                    cumulative += parts.get(bound, 0)
+                    lines.append(f"{name}_bucket{format_labels(labels, le=bound)} "
+                                 f"{number(cumulative)}")
+                lines.append(f"{name}_sum{format_labels(labels)} {number(parts.get('_sum', 0))}")
+                lines.append(f"{name}_count{format_labels(labels)} {number(cumulative)}")
+        return '\n'.join(lines) + '\n'
+
+
+def series_key(name, labels, part):
+    # JSON round trips turn the label pairs into lists
+    return name, tuple(tuple(pair) for pair in labels), part
+
+
+def format_labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value
+                          in zip(pairs, escaped)) + '}'
+
+
+def number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = MetricsRegistry()
+registry.histogram('http_request_duration_seconds',
+                   'Time spent handling a request', LATENCY_BUCKETS)
+registry.histogram('http_request_db_queries',
+                   'Database queries executed per request', QUERY_BUCKETS)
+registry.counter('http_request_db_seconds_total',
+                 'Time spent in database queries')
+registry.counter('http_request_serializer_seconds_total',
+                 'Time spent building serializer output')
+registry.histogram('http_response_size_bytes',
+                   'Size of non-streaming response bodies', SIZE_BUCKETS)
+
+
+# Per-request accumulators, reachable from the DB wrapper and serializers
+_request_stats = ContextVar('request_stats', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats['db_seconds'] += time.perf_counter() - started
+        stats['queries'] += 1
+
+
+# Installed for good rather than per request: under ASGI the queries run on
+# sync_to_async threads, each with its own connection. Outside a request the
+# wrapper only looks up the context variable.
+def instrument_connection(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def connection_opened(sender, connection, **kwargs):
+    instrument_connection(connection)
+
+
+# ✅ Adding the time spent in a block to the current request's `stat`
+@contextmanager
+def measure(stat):
+    stats = _request_stats.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats[stat] += time.perf_counter() - started
+
+
+def view_label(request):
+    # URL patterns, never raw paths, so label cardinality stays bounded
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match._func_path
+
+
+# ✅ Recording latency, queries, serializer time and size for every request
+class MetricsMiddleware:
+    """
+    Everything is recorded in process memory under one lock; the totals go
+    to Redis at most every METRICS_FLUSH_SECONDS, so a request never waits
+    on the shared store. Serializer time is reported by the views
+    (api.serializer_metrics). Runs natively on either handler, so streaming
+    ASGI views (api.live) keep the event loop to themselves; the stats
+    travel in a context variable, which sync_to_async carries over.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.enabled = settings.METRICS_ENABLED
+        if self.enabled:
+            for alias in connections:
+                instrument_connection(connections[alias])
+            connection_created.connect(connection_opened, dispatch_uid='metrics')
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        stats, token = start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        record_request(request, response, stats, time.perf_counter() - started)
+        registry.maybe_flush()
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        stats, token = start_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_stats.reset(token)
+        record_request(request, response, stats, time.perf_counter() - started)
+        # Redis I/O stays off the event loop
+        if registry.flush_due():
+            await sync_to_async(registry.flush, thread_sensitive=False)()
+        return response
+
+
+def start_request():
+    stats = {'queries': 0, 'db_seconds': 0.0, 'serializer_seconds': 0.0}
+    return stats, _request_stats.set(stats)
+
+
+def record_request(request, response, stats, elapsed):
+    labels = {'view': view_label(request), 'method': request.method,
+              'status': str(response.status_code)}
+    registry.observe('http_request_duration_seconds', elapsed, **labels)
+    registry.observe('http_request_db_queries', stats['queries'], **labels)
+    registry.inc('http_request_db_seconds_total', stats['db_seconds'], **labels)
+    registry.inc('http_request_serializer_seconds_total',
+                 stats['serializer_seconds'], **labels)
+    if not response.streaming:
+        registry.observe('http_response_size_bytes', len(response.content), **labels)
+
+
+# ✅ Prometheus scrape endpoint with the totals of every worker
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if not token:
+        # Without a token the endpoint is only served to local development
+        if not settings.DEBUG:
+            raise Http404
+    elif not hmac.compare_digest(
+            request.headers.get('Authorization', ''), f"Bearer {token}"):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
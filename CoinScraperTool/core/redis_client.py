@@ -0,0 +1,289 @@
+import asyncio
+import threading
+import time
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.core.signals import setting_changed
+
+
+_client = None
+_lock = threading.Lock()
+
+
+# ✅ Shared Redis client for caches (the broker keeps its own connection)
+def get_redis():
+    """
+    Returns a process-wide client for settings.REDIS_URL. A `memory://` URL
+    swaps in InMemoryRedis so tests and local runs need no Redis server.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                if settings.REDIS_URL.startswith('memory://'):
+                    _client = InMemoryRedis()
+                else:
+                    _client = redis.Redis.from_url(
+                        settings.REDIS_URL,
+                        decode_responses=True,
+                        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    )
+    return _client
+
+
+def reset_redis(**kwargs):
+    global _client
+    if kwargs.get('setting', 'REDIS_URL') == 'REDIS_URL':
+        _client = None
+
+
+setting_changed.connect(reset_redis)
+
+
+# ✅ Async pub/sub connection for long-lived listeners (see scraper_app.live)
+def get_async_pubsub():
+    """
+    A new redis.asyncio PubSub bound to the running event loop; without a
+    socket timeout, since listening blocks for as long as nothing is
+    published. With `memory://` it listens to the shared InMemoryRedis.
+    """
+    if settings.REDIS_URL.startswith('memory://'):
+        return get_redis().pubsub()
+    client = redis.asyncio.Redis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=30,
+    )
+    return client.pubsub()
+
+
+# ✅ Local stand-in implementing the subset of redis-py the project uses
+class InMemoryRedis:
+    """
+    Values are stored as strings (like a client created with
+    decode_responses=True) and keys honour expiry times.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._expires = {}
+        self._subscribers = set()
+        self._lock = threading.RLock()
+
+    def _alive(self, name):
+        expires = self._expires.get(name)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(name, None)
+            self._expires.pop(name, None)
+        return name in self._data
+
+    def get(self, name):
+        with self._lock:
+            return self._data[name] if self._alive(name) else None
+
+    def set(self, name, value, ex=None, nx=False):
+        with self._lock:
+            if nx and self._alive(name):
+                return None
+            self._data[name] = str(value)
+            self._expires.pop(name, None)
+            if ex is not None:
+                self.expire(name, ex)
+            return True
+
+    def mget(self, keys, *args):
+        if isinstance(keys, str):
+            keys = [keys]
+        return [self.get(key) for key in [*keys, *args]]
+
+    def delete(self, *names):
+        with self._lock:
+            removed = 0
+            for name in names:
+                if self._alive(name):
+                    removed += 1
+                self._data.pop(name, None)
+                self._expires.pop(name, None)
+            return removed
+
+    def exists(self, *names):
+        with self._lock:
+            return sum(1 for name in names if self._alive(name))
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            value = int(self.get(name) or 0) + amount
+            self._data[name] = str(value)
+            return value
+
+    def expire(self, name, seconds):
+        with self._lock:
+            if not self._alive(name):
+                return False
+            seconds = seconds.total_seconds() if hasattr(
+                seconds, 'total_seconds') else seconds
+            self._expires[name] = time.monotonic() + seconds
+            return True
+
+    def ttl(self, name):
+        with self._lock:
+            if not self._alive(name):
+                return -2
+            expires = self._expires.get(name)
+            return -1 if expires is None else int(expires - time.monotonic())
+
+    def sadd(self, name, *values):
+        with self._lock:
+            members = self._data.get(name) if self._alive(name) else None
+            if members is None:
+                members = self._data[name] = set()
+            added = len({str(value) for value in values} - members)
+            members.update(str(value) for value in values)
+            return added
+
+    def srem(self, name, *values):
+        with self._lock:
+            if not self._alive(name):
+                return 0
+            members = self._data[name]
+            removed = len(members & {str(value) for value in values})
+            members.difference_update(str(value) for value in values)
+            if not members:
+                self.delete(name)
+            return removed
+
+    def smembers(self, name):
+        with self._lock:
+            return set(self._data[name]) if self._alive(name) else set()
+
+    def hincrbyfloat(self, name, key, amount=1.0):
+        with self._lock:
+            if not self._alive(name):
+                self._data[name] = {}
+            fields = self._data[name]
+            value = float(fields.get(key, 0)) + float(amount)
+            fields[key] = repr(value)
+            return value
+
+    def hgetall(self, name):
+        with self._lock:
+            return dict(self._data[name]) if self._alive(name) else {}
+
+    def flushdb(self):
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+            return True
+
+    def ping(self):
+        return True
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = [pubsub for pubsub in self._subscribers
+                           if channel in pubsub.channels]
+        return sum(pubsub.deliver(channel, str(message)) for pubsub in subscribers)
+
+    def pubsub(self):
+        return InMemoryPubSub(self)
+
+    def pipeline(self, transaction=True):
+        return InMemoryPipeline(self)
+
+    # Same retry loop as redis.Redis.transaction
+    def transaction(self, func, *watches, value_from_callable=False):
+        while True:
+            pipe = self.pipeline()
+            try:
+                pipe.watch(*watches)
+                value = func(pipe)
+                result = pipe.execute()
+                return value if value_from_callable else result
+            except redis.WatchError:
+                continue
+
+
+# Async listener side of InMemoryRedis.publish, which may run on any thread
+class InMemoryPubSub:
+
+    def __init__(self, client):
+        self._client = client
+        self._loop = None
+        self._messages = None
+        self.channels = set()
+
+    async def subscribe(self, *channels):
+        self._loop = asyncio.get_running_loop()
+        self._messages = asyncio.Queue()
+        self.channels.update(channels)
+        with self._client._lock:
+            self._client._subscribers.add(self)
+
+    def deliver(self, channel, data):
+        message = {'type': 'message', 'channel': channel, 'data': data}
+        try:
+            self._loop.call_soon_threadsafe(self._messages.put_nowait, message)
+        except RuntimeError:  # the listening loop is gone
+            with self._client._lock:
+                self._client._subscribers.discard(self)
+            return 0
+        return 1
+
+    async def listen(self):
+        while True:
+            yield await self._messages.get()
+
+    async def aclose(self):
+        with self._client._lock:
+            self._client._subscribers.discard(self)
+
+
+# Queues commands for execute(); after watch() they run immediately until
+# multi(), and execute() fails with WatchError if a watched key changed
+class InMemoryPipeline:
+
+    def __init__(self, client):
+        self._client = client
+        self._calls = []
+        self._watched = {}
+        self._immediate = False
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+        if self._immediate:
+            return method
+
+        def queue(*args, **kwargs):
+            self._calls.append((method, args, kwargs))
+            return self
+        return queue
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.reset()
+
+    def watch(self, *names):
+        self._watched.update((name, self._client.get(name)) for name in names)
+        self._immediate = True
+
+    def multi(self):
+        self._immediate = False
+
+    def reset(self):
+        self._calls = []
+        self._watched = {}
+        self._immediate = False
+
+    def execute(self):
+        with self._client._lock:
+            calls, watched = self._calls, self._watched
+            self.reset()
+            if any(self._client.get(name) != value for name, value in watched.items()):
+                raise redis.WatchError("Watched variable changed.")
+            return [method(*args, **kwargs) for method, args, kwargs in calls]
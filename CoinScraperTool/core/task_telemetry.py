@@ -0,0 +1,89 @@
+import logging
+import time
+from datetime import datetime
+
+from celery.signals import (
+    before_task_publish, task_failure, task_postrun, task_prerun,
+    worker_process_shutdown)
+from django.db import DatabaseError
+
+from .metrics import registry
+
+
+logger = logging.getLogger(__name__)
+
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900)
+RUNTIME_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+# Message header carrying the publish time (epoch seconds)
+PUBLISHED_HEADER = 'published_at'
+
+registry.histogram('celery_task_queue_wait_seconds',
+                   'Time from publish (or eta) until a worker starts the task',
+                   WAIT_BUCKETS)
+registry.histogram('celery_task_runtime_seconds',
+                   'Time spent executing a task', RUNTIME_BUCKETS)
+# state is SUCCESS, FAILURE or RETRY, so retries and failures per task
+# and throughput all come from this one counter
+registry.counter('celery_tasks_total', 'Finished task runs by final state')
+
+# task_id -> perf_counter at task_prerun, for the current worker process
+_started = {}
+
+
+@before_task_publish.connect
+def stamp_publish_time(headers=None, **kwargs):
+    if headers is not None:
+        headers[PUBLISHED_HEADER] = time.time()
+
+
+def queue_wait(request, now):
+    published = request.get(PUBLISHED_HEADER)
+    if published is None:
+        # Eager runs (and messages from older publishers) carry no stamp
+        return None
+    ready = float(published)
+    eta = request.get('eta')
+    if eta:
+        # A countdown is intended delay, not lag
+        ready = max(ready, datetime.fromisoformat(eta).timestamp())
+    return max(now - ready, 0.0)
+
+
+@task_prerun.connect
+def task_started(task_id=None, task=None, **kwargs):
+    _started[task_id] = time.perf_counter()
+    wait = queue_wait(task.request, time.time())
+    if wait is not None:
+        registry.observe('celery_task_queue_wait_seconds', wait, task=task.name)
+
+
+@task_postrun.connect
+def task_finished(task_id=None, task=None, state=None, **kwargs):
+    started = _started.pop(task_id, None)
+    state = state or 'UNKNOWN'
+    if started is not None:
+        registry.observe('celery_task_runtime_seconds',
+                         time.perf_counter() - started, task=task.name, state=state)
+    registry.inc('celery_tasks_total', task=task.name, state=state)
+    registry.maybe_flush()
+
+
+# ✅ Keeping a short ErrorLog entry for every failed task run
+@task_failure.connect
+def task_failed(sender=None, task_id=None, exception=None, **kwargs):
+    # Imported here: this module is loaded with the Celery app, before Django apps
+    from scraper_app.models import ErrorLog
+
+    request = sender.request
+    message = (f"{type(exception).__name__}: {exception} "
+               f"(task {task_id}, retries {request.retries or 0})")
+    try:
+        ErrorLog.objects.create(source=f"celery:{sender.name}"[:100],
+                                error_message=message)
+    except DatabaseError as exc:
+        logger.warning("Could not record failure of %s: %s", sender.name, exc)
+
+
+@worker_process_shutdown.connect
+def flush_on_shutdown(**kwargs):
+    registry.flush()
@@ -0,0 +1,12 @@
+from django.contrib.auth import get_user_model
+
+
+# ✅ Test user shared by the app test suites
+def make_user(username='member'):
+    """
+    No password on purpose: hashing one runs the full PBKDF2 work factor for
+    every user created (about 15x the suite's run time), and the tests
+    authenticate with force_authenticate or JWTs, never with a password.
+    """
+    return get_user_model().objects.create_user(
+        username=username, email=f'{username}@example.com')
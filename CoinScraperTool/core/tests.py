@@ -0,0 +1,298 @@
+import gzip
+import logging
+import os
+import queue
+import tempfile
+import time
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.serializers import BaseSerializer
+from rest_framework.test import APIClient
+
+from scraper_app.models import ErrorLog, ScrapeLog
+from .log_pipeline import (
+    AsyncLogging, BatchingQueueListener, RateLimitFilter, SamplingFilter)
+from .log_retention import (
+    SegmentedLogHandler, compress_pending, compress_segment, list_segments,
+    pending_segments, purge_segments, read_index)
+from .metrics import MetricsMiddleware, MetricsRegistry, record_query, registry
+from .redis_client import get_redis
+from .task_telemetry import PUBLISHED_HEADER, queue_wait
+
+
+def log_line(epoch, message):
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(epoch))
+    return f"[{stamp}] [INFO] {message}\n"
+
+
+@mock.patch('core.log_retention.BLOCK_LINES', 10)
+class LogRetentionTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.tmp.name, 'system.log')
+        self.now = time.time()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def segment(self, name, start, lines):
+        plain = os.path.join(self.tmp.name, 'plain')
+        with open(plain, 'w') as f:
+            for i in range(lines):
+                f.write(log_line(start + i * 60, f'line {i}'))
+        target = f'{self.log_file}.{name}.gz'
+        compress_segment(plain, target)
+        return target
+
+    def handler(self):
+        handler = SegmentedLogHandler(self.log_file)
+        handler.setFormatter(logging.Formatter(
+            "[%(asctime)s] [%(levelname)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
+        return handler
+
+    def emit(self, handler, message):
+        handler.emit(logging.makeLogRecord({'msg': message, 'levelname': 'INFO'}))
+
+    @mock.patch('core.log_retention.threading.Timer')
+    def test_rollover_compresses_segment_with_index(self, timer):
+        handler = self.handler()
+        for i in range(25):
+            self.emit(handler, f'event {i}')
+        handler.doRollover()
+        self.emit(handler, 'after')
+        handler.close()
+
+        # Compression is left to a timer thread, never done while logging
+        self.assertEqual(list_segments(self.log_file), [])
+        timer.return_value.start.assert_called_once()
+        self.assertEqual(compress_pending(self.log_file, grace=0), 1)
+        [segment] = list_segments(self.log_file)
+        with gzip.open(segment, 'rt') as f:
+            self.assertEqual(len(f.readlines()), 25)
+        epochs, offsets, end = read_index(segment)
+        self.assertEqual((len(epochs), offsets[0]), (3, 0))
+        self.assertIsNotNone(end)
+        with open(self.log_file) as f:
+            self.assertIn('after', f.read())
+
+    @mock.patch('core.log_retention.threading.Timer')
+    def test_processes_sharing_the_file_rotate_it_once(self, timer):
+        web, celery = self.handler(), self.handler()
+        self.emit(web, 'web before')
+        self.emit(celery, 'celery before')
+        web.doRollover()
+        celery.doRollover()
+        self.emit(web, 'web after')
+        self.emit(celery, 'celery after')
+        web.doRollover()
+        web.close()
+        celery.close()
+
+        # Two rollovers, two distinct segments: nothing was overwritten or lost
+        segments = pending_segments(self.log_file)
+        self.assertEqual(len(segments), 2)
+        lines = []
+        for segment in segments:
+            with open(segment) as f:
+                lines += [line.split('] ')[-1].strip() for line in f]
+        self.assertEqual(sorted(lines),
+                         ['celery after', 'celery before', 'web after', 'web before'])
+
+    def test_purge_deletes_old_segments_and_trims_the_partial_one(self):
+        day = 24 * 60 * 60
+        old = self.segment('old', self.now - 8 * day, 30)
+        # 50 minutes of lines straddling the 5 day cutoff
+        partial = self.segment('partial', self.now - 5 * day - 25 * 60, 50)
+        recent = self.segment('recent', self.now - day, 30)
+        with open(self.log_file, 'w') as f:
+            f.write(log_line(self.now, 'live'))
+
+        removed, trimmed = purge_segments(5 * day, self.log_file, now=self.now)
+
+        self.assertEqual((removed, trimmed), (1, 1))
+        self.assertEqual(list_segments(self.log_file), sorted([partial, recent]))
+        self.assertFalse(os.path.exists(old + '.idx'))
+        with gzip.open(partial, 'rt') as f:
+            lines = f.readlines()
+        # Whole 10-line members before the cutoff are gone, the straddling one stays
+        self.assertEqual((len(lines), lines[0].split()[-1]), (30, '20'))
+        epochs, offsets, _ = read_index(partial)
+        self.assertEqual(offsets[0], 0)
+        self.assertTrue(os.path.exists(self.log_file))
+        self.assertEqual(purge_segments(5 * day, self.log_file, now=self.now), (0, 0))
+
+
+class RecordingHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.messages, self.flushes = [], 0
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+        self.flush()
+
+    def flush(self):
+        self.flushes += 1
+
+
+class LogPipelineTests(SimpleTestCase):
+
+    def record(self, msg, *args):
+        return logging.makeLogRecord({'msg': msg, 'args': args, 'levelno': logging.INFO})
+
+    def test_listener_writes_a_batch_with_one_flush(self):
+        log_queue, handler = queue.SimpleQueue(), RecordingHandler()
+        for i in range(5):
+            log_queue.put(self.record('event %s', i))
+        listener = BatchingQueueListener(log_queue, handler)
+
+        listener.handle_batch(listener.dequeue_batch())
+
+        self.assertEqual(handler.messages, [f'event {i}' for i in range(5)])
+        self.assertEqual(handler.flushes, 1)
+
+    def test_async_logging_delivers_records_from_other_threads(self):
+        logger, handler = logging.getLogger('coinlytics.tests.pipeline'), RecordingHandler()
+        logger.propagate = False
+        pipeline = AsyncLogging(logger, [handler]).start()
+        for i in range(100):
+            logger.warning('request %s', i)
+        pipeline.stop()
+
+        self.assertEqual(len(handler.messages), 100)
+        self.assertEqual(handler.messages[-1], 'request 99')
+        self.assertEqual(logger.handlers, [])
+
+    def test_sampling_is_per_message(self):
+        sampler = SamplingFilter(3)
+        kept = [sampler.filter(self.record(msg))
+                for _ in range(3) for msg in ('started', 'completed')]
+        self.assertEqual(kept, [True, True, False, False, False, False])
+
+    def test_rate_limit_counts_suppressed_records(self):
+        limiter = RateLimitFilter(per_second=2)
+        with mock.patch('core.log_pipeline.time.monotonic', return_value=limiter.updated):
+            kept = [limiter.filter(self.record('connected')) for _ in range(5)]
+        self.assertEqual(kept, [True, True, False, False, False])
+
+        record = self.record('connected')
+        with mock.patch('core.log_pipeline.time.monotonic', return_value=limiter.updated + 1):
+            self.assertTrue(limiter.filter(record))
+        self.assertEqual(record.getMessage(), 'connected (+3 suppressed)')
+
+
+def sample(text, line_prefix):
+    return next(float(line.rsplit(' ', 1)[1]) for line in text.splitlines()
+                if line.startswith(line_prefix))
+
+
+@override_settings(REDIS_URL='memory://', METRICS_TOKEN='s3cret')
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        get_redis().flushdb()
+        registry.take()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username='ops', email='ops@example.com')
+        self.client.force_authenticate(self.user)
+
+    def test_requests_are_recorded_per_view(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get('/api/scrape-logs/').status_code, 200)
+
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        text = response.content.decode()
+        labels = 'method="GET",status="200",view="scrapelog-list"'
+        self.assertEqual(sample(text, f'http_request_duration_seconds_count{{{labels}}}'), 3)
+        self.assertEqual(sample(
+            text, f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'), 3)
+        self.assertGreater(sample(text, f'http_request_db_queries_sum{{{labels}}}'), 0)
+        self.assertGreater(sample(text, f'http_request_serializer_seconds_total{{{labels}}}'), 0)
+        self.assertGreater(sample(text, f'http_response_size_bytes_sum{{{labels}}}'), 0)
+
+    def test_totals_are_shared_between_processes(self):
+        worker = MetricsRegistry()
+        worker.definitions = registry.definitions
+        worker.observe('http_request_duration_seconds', 0.02,
+                       view='scrapelog-list', method='GET', status='200')
+        worker.flush()
+        registry.observe('http_request_duration_seconds', 2,
+                         view='scrapelog-list', method='GET', status='200')
+
+        text = registry.render()
+        labels = 'method="GET",status="200",view="scrapelog-list"'
+        self.assertEqual(sample(text, f'http_request_duration_seconds_count{{{labels}}}'), 2)
+        self.assertEqual(sample(
+            text, f'http_request_duration_seconds_bucket{{{labels},le="0.025"}}'), 1)
+        self.assertAlmostEqual(sample(text, f'http_request_duration_seconds_sum{{{labels}}}'), 2.02)
+
+    def test_serializers_are_timed_without_patching_drf(self):
+        self.assertEqual(BaseSerializer.data.fget.__module__, 'rest_framework.serializers')
+        ScrapeLog.objects.create(user=self.user, coin='BTC', price=1)
+
+        self.client.get('/api/scrape-logs/price_history/', {'coin': 'BTC'})
+        text = self.client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer s3cret').content.decode()
+        labels = 'method="GET",status="200",view="scrapelog-price-history"'
+        self.assertGreater(sample(text, f'http_request_serializer_seconds_total{{{labels}}}'), 0)
+
+    def test_queries_on_every_database_alias_are_counted(self):
+        MetricsMiddleware(lambda request: None)
+        for alias in connections:
+            self.assertIn(record_query, connections[alias].execute_wrappers)
+
+    def test_token_protects_the_endpoint(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_endpoint_without_token_is_only_served_in_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+
+@shared_task(name='core.tests.divide')
+def divide(a, b):
+    return a / b
+
+
+@override_settings(REDIS_URL='memory://')
+class TaskTelemetryTests(TestCase):
+
+    def setUp(self):
+        get_redis().flushdb()
+        registry.take()
+
+    def test_runs_are_counted_by_state_and_failures_logged(self):
+        divide.delay(4, 2)
+        divide.delay(1, 0)
+
+        text = registry.render()
+        self.assertEqual(sample(
+            text, 'celery_tasks_total{state="SUCCESS",task="core.tests.divide"}'), 1)
+        self.assertEqual(sample(
+            text, 'celery_tasks_total{state="FAILURE",task="core.tests.divide"}'), 1)
+        self.assertEqual(sample(
+            text, 'celery_task_runtime_seconds_count{state="FAILURE",task="core.tests.divide"}'), 1)
+        error = ErrorLog.objects.get()
+        self.assertEqual(error.source, 'celery:core.tests.divide')
+        self.assertIn('ZeroDivisionError', error.error_message)
+
+    def test_queue_wait_starts_at_the_eta(self):
+        now = time.time()
+        self.assertEqual(queue_wait({}, now), None)
+        self.assertAlmostEqual(queue_wait({PUBLISHED_HEADER: now - 3}, now), 3)
+        eta = datetime.fromtimestamp(now - 1, tz=dt_timezone.utc).isoformat()
+        self.assertAlmostEqual(
+            queue_wait({PUBLISHED_HEADER: now - 60, 'eta': eta}, now), 1, places=3)
@@ -0,0 +1,170 @@
+import json
+import logging
+from decimal import Decimal
+
+import redis
+from django.conf import settings
+
+from core.redis_client import get_redis
+from .models import UserPreference
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_MARKER = 'alerts:index:built'
+
+
+def watchers_key(coin, currency):
+    return f"alerts:watchers:{coin.upper()}:{currency.upper()}"
+
+
+def subscription_key(preference_id):
+    return f"alerts:subscription:{preference_id}"
+
+
+def reference_key(preference_id, coin):
+    return f"alerts:reference:{preference_id}:{coin}"
+
+
+def cooldown_key(preference_id, coin):
+    return f"alerts:cooldown:{preference_id}:{coin}"
+
+
+def subscription(preference):
+    if not preference.notify_on_price_change or not preference.favorite_coins:
+        return None
+    return {
+        'user_id': preference.user_id,
+        'currency': preference.preferred_currency.upper(),
+        'threshold': str(preference.notify_threshhold),
+        'coins': sorted({coin.upper() for coin in preference.favorite_coins}),
+    }
+
+
+# ✅ Keeping one preference's entries in the coin -> subscribers index current
+def index_preference(preference_id, current=None):
+    """
+    `current` is the preference's subscription (None to remove it). The
+    previous subscription is read back so coins dropped from the favorites
+    or a changed currency leave the old watcher sets.
+    """
+    client = get_redis()
+    try:
+        previous = client.get(subscription_key(preference_id))
+        pipe = client.pipeline(transaction=False)
+        if previous:
+            previous = json.loads(previous)
+            for coin in previous['coins']:
+                pipe.srem(watchers_key(coin, previous['currency']), preference_id)
+        if current:
+            pipe.set(subscription_key(preference_id), json.dumps(current))
+            for coin in current['coins']:
+                pipe.sadd(watchers_key(coin, current['currency']), preference_id)
+        else:
+            pipe.delete(subscription_key(preference_id))
+        pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Could not update alert index for preference %s: %s",
+                       preference_id, exc)
+
+
+# Full rebuild, only needed when the index is missing (new or flushed Redis)
+def rebuild_alert_index():
+    preferences = UserPreference.objects.filter(
+        notify_on_price_change=True).iterator(chunk_size=2000)
+    count = 0
+    for preference in preferences:
+        index_preference(preference.pk, subscription(preference))
+        count += 1
+    get_redis().set(INDEX_MARKER, count)
+    return count
+
+
+def ensure_alert_index():
+    if not get_redis().exists(INDEX_MARKER):
+        rebuild_alert_index()
+
+
+# ✅ Checking a batch of new prices against only the coins' subscribers
+def evaluate_alerts(ticks):
+    """
+    `ticks` yields (coin, currency, price, timestamp). Each subscriber is
+    compared with its reference price (the price at its last alert, or the
+    first price seen). Crossing `notify_threshhold` percent fires an alert
+    unless the (preference, coin) cooldown is still running; firing moves
+    the reference to the new price. Alerts are queued as a single task.
+    """
+    latest = {}
+    for coin, currency, price, timestamp in ticks:
+        pair = (coin.upper(), currency.upper())
+        if pair not in latest or timestamp >= latest[pair][1]:
+            latest[pair] = (Decimal(str(price)), timestamp)
+    if not latest:
+        return []
+
+    client = get_redis()
+    try:
+        ensure_alert_index()
+        pipe = client.pipeline(transaction=False)
+        for pair in latest:
+            pipe.smembers(watchers_key(*pair))
+        candidates = [(pair, int(preference_id))
+                      for pair, members in zip(latest, pipe.execute())
+                      for preference_id in members]
+        if not candidates:
+            return []
+
+        subscriptions = client.mget(
+            [subscription_key(preference_id) for _, preference_id in candidates])
+        references = client.mget(
+            [reference_key(preference_id, pair[0]) for pair, preference_id in candidates])
+
+        seeds, hits = [], []
+        for (pair, preference_id), raw, reference in zip(
+                candidates, subscriptions, references):
+            if raw is None:
+                continue
+            price, timestamp = latest[pair]
+            if reference is None:
+                seeds.append((preference_id, pair[0], price))
+                continue
+            reference = Decimal(reference)
+            if not reference:
+                continue
+            watcher = json.loads(raw)
+            change = (price - reference) / reference * 100
+            if abs(change) >= Decimal(watcher['threshold']):
+                hits.append({
+                    'preference_id': preference_id,
+                    'user_id': watcher['user_id'],
+                    'coin': pair[0],
+                    'currency': pair[1],
+                    'price': str(price),
+                    'reference': str(reference),
+                    'change': round(float(change), 2),
+                    'timestamp': timestamp.isoformat(),
+                })
+
+        pipe = client.pipeline(transaction=False)
+        for preference_id, coin, price in seeds:
+            pipe.set(reference_key(preference_id, coin), str(price), nx=True)
+        for hit in hits:
+            pipe.set(cooldown_key(hit['preference_id'], hit['coin']), 1,
+                     ex=settings.ALERT_COOLDOWN_SECONDS, nx=True)
+        acquired = pipe.execute()[len(seeds):]
+
+        alerts = [hit for hit, ok in zip(hits, acquired) if ok]
+        pipe = client.pipeline(transaction=False)
+        for alert in alerts:
+            pipe.set(reference_key(alert['preference_id'], alert['coin']),
+                     alert['price'])
+        pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Price alert evaluation failed: %s", exc)
+        return []
+
+    if alerts:
+        # Imported here: the tasks module imports the engine, which imports us
+        from .tasks import send_price_alerts
+        send_price_alerts.delay(alerts)
+    return alerts
@@ -0,0 +1,199 @@
+import json
+import logging
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+import redis
+from django.conf import settings
+from django.utils import timezone
+
+from core.redis_client import get_redis
+from .models import PriceCandle
+from .rollups import RESOLUTIONS, bucket_start, candle_versions
+
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_YEAR = 365 * 86400
+
+
+class AnalyticsError(Exception):
+    """
+    Raised when the coins do not share enough price history to analyse
+    """
+
+
+# ✅ One aligned (time x coin) matrix of candle closes
+def load_price_matrix(coins, currency, start, resolution):
+    """
+    Reads every close for `coins` in one query, places them on the union of
+    their buckets and carries each coin's last close forward over buckets
+    it has no candle for. Rows before every coin has a price are dropped.
+    """
+    column = {coin: i for i, coin in enumerate(coins)}
+    rows = PriceCandle.objects.filter(
+        resolution=resolution, coin__in=coins, currency=currency,
+        bucket__gte=bucket_start(start, resolution), close__gt=0,
+    ).values_list('coin', 'bucket', 'close').iterator(
+        chunk_size=settings.STREAM_CHUNK_SIZE)
+    data = np.fromiter(
+        ((column[coin], bucket.timestamp(), close) for coin, bucket, close in rows),
+        dtype=[('column', np.int64), ('epoch', np.float64), ('close', np.float64)])
+
+    epochs, row = np.unique(data['epoch'], return_inverse=True)
+    matrix = np.full((len(epochs), len(coins)), np.nan)
+    matrix[row, data['column']] = data['close']
+
+    # Forward fill: index of the last row holding a value, per column
+    last = np.where(np.isnan(matrix), 0, np.arange(len(epochs))[:, None])
+    np.maximum.accumulate(last, axis=0, out=last)
+    matrix = matrix[last, np.arange(len(coins))]
+
+    complete = ~np.isnan(matrix).any(axis=1)
+    return epochs[complete], matrix[complete]
+
+
+def log_returns(matrix):
+    return np.diff(np.log(matrix), axis=0)
+
+
+# Rolling sample standard deviation per column from running sums
+def rolling_std(returns, window):
+    if len(returns) < window:
+        return np.empty((0, returns.shape[1]))
+    padded = np.vstack([np.zeros((1, returns.shape[1])), returns])
+    sums = np.cumsum(padded, axis=0)
+    squares = np.cumsum(padded ** 2, axis=0)
+    total = sums[window:] - sums[:-window]
+    total_sq = squares[window:] - squares[:-window]
+    variance = (total_sq - total ** 2 / window) / (window - 1)
+    return np.sqrt(np.clip(variance, 0, None))
+
+
+# Column-wise ranks with ties sharing their average rank (for Spearman)
+def ranks(matrix):
+    ranked = np.empty(matrix.shape, dtype=np.float64)
+    for column in range(matrix.shape[1]):
+        _, inverse, counts = np.unique(
+            matrix[:, column], return_inverse=True, return_counts=True)
+        ranked[:, column] = (np.cumsum(counts) - (counts + 1) / 2)[inverse]
+    return ranked
+
+
+def finite(value, digits=6):
+    value = float(value)
+    return round(value, digits) if math.isfinite(value) else None
+
+
+def annualisation(resolution):
+    return math.sqrt(SECONDS_PER_YEAR / RESOLUTIONS[resolution])
+
+
+# ✅ Caching a computed result until any member coin gets new candles
+def memoized(name, params, coins, currency, compute):
+    versions = candle_versions([(coin, currency) for coin in coins])
+    key = 'analytics:{}:{}:{}'.format(
+        name, ':'.join(str(param) for param in params),
+        '.'.join(version or '0' for version in versions))
+    client = get_redis()
+    try:
+        cached = client.get(key)
+    except redis.RedisError as exc:
+        logger.warning("Analytics cache read failed: %s", exc)
+        cached = None
+    if cached is not None:
+        return json.loads(cached)
+
+    result = compute()
+    try:
+        client.set(key, json.dumps(result), ex=settings.ANALYTICS_CACHE_TTL)
+    except redis.RedisError as exc:
+        logger.warning("Analytics cache write failed: %s", exc)
+    return result
+
+
+def load_returns(coins, currency, days, resolution):
+    start = timezone.now() - timedelta(days=days)
+    epochs, prices = load_price_matrix(coins, currency, start, resolution)
+    if len(prices) < 3:
+        raise AnalyticsError(
+            f"Not enough overlapping {resolution} history for {', '.join(coins)}")
+    return epochs, prices, log_returns(prices)
+
+
+def isoformat(epoch):
+    return datetime.fromtimestamp(epoch, tz=dt_timezone.utc).isoformat()
+
+
+# ✅ Returns, volatility, correlation and beta of two coins in one pass
+def compare_pair(coin1, coin2, currency='USD', days=30, resolution='1h', window=24):
+    coins = [coin1.upper(), coin2.upper()]
+    currency = currency.upper()
+    if coins[0] == coins[1]:
+        raise AnalyticsError("coin1 and coin2 must differ")
+
+    def compute():
+        epochs, prices, returns = load_returns(coins, currency, days, resolution)
+        scale = annualisation(resolution)
+        rolling = rolling_std(returns, window) * scale
+        growth = prices[-1] / prices[0]
+        # Flat series give NaN/inf statistics, reported as null
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = np.cov(returns, rowvar=False)
+            pearson = np.corrcoef(returns, rowvar=False)[0, 1]
+            spearman = np.corrcoef(ranks(returns), rowvar=False)[0, 1]
+            beta = covariance[0, 1] / covariance[1, 1]
+
+        return {
+            'coins': coins,
+            'currency': currency,
+            'resolution': resolution,
+            'window': window,
+            'points': len(prices),
+            'start': isoformat(epochs[0]),
+            'end': isoformat(epochs[-1]),
+            'total_return': {coin: finite(growth[i] - 1)
+                             for i, coin in enumerate(coins)},
+            'volatility': {coin: finite(returns[:, i].std(ddof=1) * scale)
+                           for i, coin in enumerate(coins)},
+            'rolling_volatility': {coin: {
+                'latest': finite(rolling[-1, i]) if len(rolling) else None,
+                'min': finite(rolling[:, i].min()) if len(rolling) else None,
+                'max': finite(rolling[:, i].max()) if len(rolling) else None,
+            } for i, coin in enumerate(coins)},
+            'correlation': {'pearson': finite(pearson), 'spearman': finite(spearman)},
+            # Sensitivity of coin1's returns to coin2's
+            'beta': finite(beta),
+            'relative_performance': finite(growth[0] / growth[1] - 1),
+        }
+
+    return memoized('pair', [*coins, currency, days, resolution, window],
+                    coins, currency, compute)
+
+
+# ✅ Pairwise correlation/covariance of many coins from one aligned matrix
+def correlation_matrix(coins, currency='USD', days=30, resolution='1h'):
+    coins = sorted({coin.upper() for coin in coins})
+    currency = currency.upper()
+    if len(coins) < 2:
+        raise AnalyticsError("At least two distinct coins are needed")
+
+    def compute():
+        epochs, prices, returns = load_returns(coins, currency, days, resolution)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = np.corrcoef(returns, rowvar=False)
+        covariance = np.cov(returns, rowvar=False)
+        return {
+            'coins': coins,
+            'currency': currency,
+            'resolution': resolution,
+            'points': len(prices),
+            'start': isoformat(epochs[0]),
+            'end': isoformat(epochs[-1]),
+            'correlation': [[finite(value) for value in row] for row in correlation],
+            'covariance': [[finite(value, 10) for value in row] for row in covariance],
+        }
+
+    return memoized('matrix', [*coins, currency, days, resolution],
+                    coins, currency, compute)
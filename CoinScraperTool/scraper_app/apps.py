@@ -11,4 +11,5 @@ class ScraperAppConfig(AppConfig):
     name = 'scraper_app'
 
     def ready(self):
+        import scraper_app.signals
         logger.info("🌍 Scraper Web app started successfully.")
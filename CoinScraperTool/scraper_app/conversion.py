@@ -0,0 +1,136 @@
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from .models import ExchangeRateSnapshot
+from .rates import rate_matrix
+
+
+class ConversionError(Exception):
+    """
+    Raised when no chain of exchange rates links two currencies
+    """
+
+
+def to_epochs(timestamps):
+    return np.fromiter((ts.timestamp() for ts in timestamps), dtype=np.float64,
+                       count=len(timestamps))
+
+
+# ✅ Graph of currencies linked by any quoted pair (in either direction)
+class CurrencyGraph:
+
+    def __init__(self, pairs):
+        self.quoted = set(pairs)
+        self.neighbours = defaultdict(set)
+        for base, target in self.quoted:
+            self.neighbours[base].add(target)
+            self.neighbours[target].add(base)
+
+    @classmethod
+    def from_matrix(cls, matrix=None):
+        matrix = matrix or rate_matrix
+        return cls((s.base_currency, s.target_currency)
+                   for s in matrix.latest_snapshots())
+
+    # Fewest hops first, e.g. KES -> USD -> EUR when KES/EUR isn't quoted
+    def path(self, source, target):
+        if source == target:
+            return [source]
+        previous = {source: None}
+        queue = deque([source])
+        while queue:
+            currency = queue.popleft()
+            for neighbour in sorted(self.neighbours[currency]):
+                if neighbour in previous:
+                    continue
+                previous[neighbour] = currency
+                if neighbour == target:
+                    path = [target]
+                    while previous[path[-1]] is not None:
+                        path.append(previous[path[-1]])
+                    return path[::-1]
+                queue.append(neighbour)
+        raise ConversionError(f"No exchange rate path from {source} to {target}")
+
+
+# ✅ History of one hop, as sorted epoch/rate arrays ready for as-of lookups
+def load_leg(graph, base, target, start, end):
+    inverted = (base, target) not in graph.quoted
+    if inverted:
+        base, target = target, base
+
+    snapshots = ExchangeRateSnapshot.objects.filter(
+        base_currency=base, target_currency=target)
+    # The rate in force at `start` was written before it
+    prior = list(snapshots.filter(timestamp__lt=start).order_by(
+        '-timestamp').values_list('timestamp', 'rate')[:1])
+    rows = prior + list(snapshots.filter(
+        timestamp__gte=start, timestamp__lte=end
+    ).order_by('timestamp').values_list('timestamp', 'rate'))
+
+    epochs = to_epochs([row[0] for row in rows])
+    rates = np.fromiter((row[1] for row in rows), dtype=np.float64,
+                        count=len(rows))
+    return epochs, (1.0 / rates if inverted else rates)
+
+
+def as_of(epochs, leg_epochs, leg_rates):
+    # Index of the last snapshot at or before each tick; ticks older than the
+    # first known snapshot use that first rate
+    index = np.searchsorted(leg_epochs, epochs, side='right') - 1
+    return leg_rates[np.clip(index, 0, len(leg_rates) - 1)]
+
+
+# ✅ Vectorised conversion factors for a whole series of timestamps
+def conversion_factors(timestamps, source, target, graph=None):
+    """
+    Returns one multiplier per timestamp converting `source` amounts into
+    `target`, chaining through intermediate currencies where needed and
+    using, for every hop, the rate that was valid at that moment.
+    """
+    source, target = source.upper(), target.upper()
+    epochs = timestamps if isinstance(timestamps, np.ndarray) else to_epochs(timestamps)
+    factors = np.ones(len(epochs), dtype=np.float64)
+    if source == target or not len(epochs):
+        return factors
+
+    graph = graph or CurrencyGraph.from_matrix()
+    path = graph.path(source, target)
+    start = datetime.fromtimestamp(epochs.min(), tz=timezone.utc)
+    end = datetime.fromtimestamp(epochs.max(), tz=timezone.utc) + timedelta(seconds=1)
+
+    for base, quote in zip(path, path[1:]):
+        leg_epochs, leg_rates = load_leg(graph, base, quote, start, end)
+        if not len(leg_rates):
+            raise ConversionError(f"No exchange rate history for {base}/{quote}")
+        factors *= as_of(epochs, leg_epochs, leg_rates)
+    return factors
+
+
+# ✅ Converting row dicts in place, grouped by their source currency
+def convert_rows(rows, target, price_fields, time_field, currency_field='currency',
+                 default_currency=None):
+    """
+    Mutates `rows` (dicts) so every price field is expressed in `target`.
+    Rows are grouped by currency so each group costs one vectorised pass.
+    """
+    target = target.upper()
+    graph = CurrencyGraph.from_matrix()
+    groups = defaultdict(list)
+    for row in rows:
+        groups[(row.get(currency_field) or default_currency).upper()].append(row)
+
+    for currency, group in groups.items():
+        factors = conversion_factors(
+            [row[time_field] for row in group], currency, target, graph)
+        for field in price_fields:
+            values = np.fromiter((row[field] for row in group),
+                                 dtype=np.float64, count=len(group))
+            for row, value in zip(group, np.round(values * factors, 6)):
+                row[field] = f"{value:.6f}"
+        if currency_field in group[0]:
+            for row in group:
+                row[currency_field] = target
+    return rows
@@ -0,0 +1,116 @@
+import logging
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .engine import ScrapeEngine, fan_out_price_logs, save_errors
+from .models import ScheduledScrape
+
+
+logger = logging.getLogger(__name__)
+
+# ✅ Summary of one dispatcher tick
+DispatchResult = namedtuple(
+    'DispatchResult', ['due', 'pairs', 'fetched', 'logs', 'errors'])
+
+DISPATCH_FIELDS = ('id', 'user_id', 'coin', 'currency',
+                   'interval_minutes', 'last_run', 'next_run_at')
+
+
+# Served by the partial index on next_run_at (active rows only)
+def due_queryset(now):
+    return ScheduledScrape.objects.filter(
+        is_active=True, next_run_at__lte=now).order_by('next_run_at')
+
+
+def due_scrapes(now):
+    return list(due_queryset(now).only(*DISPATCH_FIELDS))
+
+
+# ✅ Claiming a batch of due rows so parallel workers never share a job
+def claim_due_scrapes(now=None, batch_size=None, lease=None):
+    """
+    Locks up to `batch_size` due rows with SELECT ... FOR UPDATE SKIP LOCKED
+    and pushes their next_run_at forward by `lease` before committing, so a
+    concurrent worker skips them both while the lock is held and after.
+    Backends without SKIP LOCKED (SQLite in tests) fall back to a plain
+    select, which is safe there because SQLite serialises writers.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or settings.SCRAPER_CLAIM_BATCH_SIZE
+    lease = lease or timedelta(seconds=settings.SCRAPER_CLAIM_LEASE_SECONDS)
+
+    with transaction.atomic():
+        queryset = due_queryset(now).only(*DISPATCH_FIELDS)
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True, of=('self',))
+        claimed = list(queryset[:batch_size])
+        if claimed:
+            ScheduledScrape.objects.filter(
+                pk__in=[scrape.pk for scrape in claimed]
+            ).update(next_run_at=now + lease)
+    return claimed
+
+
+def group_by_pair(scrapes):
+    groups = defaultdict(list)
+    for scrape in scrapes:
+        groups[(scrape.coin.upper(), scrape.currency.upper())].append(scrape)
+    return groups
+
+
+# ✅ Coalescing due ScheduledScrape rows so each (coin, currency) is fetched once
+def dispatch_due_scrapes(scrapes, now=None, engine=None):
+    """
+    Upstream calls scale with the number of distinct pairs, not with the
+    number of subscribers: every pair is fetched once and the quote is then
+    fanned out to each subscriber's ScrapeLog. Rows whose pair failed keep
+    their old `last_run` and are retried once their claim lease expires.
+    """
+    now = now or timezone.now()
+    groups = group_by_pair(scrapes)
+    if not groups:
+        return DispatchResult(0, 0, 0, 0, 0)
+
+    result = (engine or ScrapeEngine()).scrape_prices(groups)
+
+    # A user subscribed twice to the same pair still gets a single row
+    user_ids_by_pair = {
+        pair: {scrape.user_id for scrape in groups[pair]}
+        for pair in result.quotes
+    }
+    logs = fan_out_price_logs(result.quotes.values(), user_ids_by_pair)
+    save_errors(result.errors)
+
+    completed = []
+    for pair in result.quotes:
+        for scrape in groups[pair]:
+            scrape.last_run = now
+            scrape.next_run_at = scrape.compute_next_run()
+            completed.append(scrape)
+    ScheduledScrape.objects.bulk_update(
+        completed, ['last_run', 'next_run_at'], batch_size=1000)
+
+    logger.info("Dispatched %s scheduled scrapes over %s pairs (%s failed batches)",
+                len(completed), len(groups), len(result.errors))
+    return DispatchResult(sum(len(s) for s in groups.values()), len(groups),
+                          len(result.quotes), len(logs), len(result.errors))
+
+
+# ✅ Draining claimed batches until nothing is due (one call per worker)
+def drain_due_scrapes(now=None, engine=None, max_batches=None):
+    now = now or timezone.now()
+    engine = engine or ScrapeEngine()
+    max_batches = max_batches or settings.SCRAPER_MAX_BATCHES_PER_TICK
+
+    totals = DispatchResult(0, 0, 0, 0, 0)
+    for _ in range(max_batches):
+        claimed = claim_due_scrapes(now)
+        if not claimed:
+            break
+        result = dispatch_due_scrapes(claimed, now=now, engine=engine)
+        totals = DispatchResult(*(a + b for a, b in zip(totals, result)))
+    return totals
@@ -0,0 +1,82 @@
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+
+
+SERIES_DTYPE = [('id', np.int64), ('x', np.float64), ('y', np.float64)]
+
+
+# ✅ Largest-Triangle-Three-Buckets: indices of the points worth drawing
+def lttb_indices(x, y, threshold):
+    """
+    Keeps the first and last points and, from each of `threshold - 2`
+    equal-count buckets in between, the point forming the largest triangle
+    with the previously kept point and the average of the next bucket.
+    Peaks and troughs survive, unlike plain striding or averaging.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    edges = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_start = end if end < next_end else n - 1
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                       - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(areas.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+# Streams (id, time, value) rows straight into one structured array
+def load_series(queryset, time_field, value_field):
+    rows = queryset.values_list('id', time_field, value_field).iterator(
+        chunk_size=settings.STREAM_CHUNK_SIZE)
+    return np.fromiter(((pk, ts.timestamp(), value) for pk, ts, value in rows),
+                       dtype=SERIES_DTYPE)
+
+
+# ✅ Narrowing a time-ordered queryset to at most `max_points` rows per series
+def downsample_queryset(queryset, max_points, time_field, value_field,
+                        series_field=None):
+    """
+    Only ids, times and values are read for the full range; the returned
+    queryset fetches the selected rows by id, keeping the original ordering,
+    so serializers (or streaming/conversion) only ever see `max_points`
+    rows. With `series_field`, each distinct value (e.g. each currency) is
+    downsampled on its own so separate series are never interleaved.
+    Series that already fit are kept whole by their value rather than
+    listed id by id, and a queryset with nothing to drop comes back as is.
+    """
+    if series_field:
+        series = queryset.order_by().values_list(series_field, flat=True).distinct()
+        groups = [(value, queryset.filter(**{series_field: value})) for value in series]
+    else:
+        groups = [(None, queryset)]
+
+    whole, ids = [], []
+    for value, group in groups:
+        points = load_series(group, time_field, value_field)
+        if len(points) <= max_points:
+            whole.append(value)
+            continue
+        keep = lttb_indices(points['x'], points['y'], max_points)
+        ids.extend(points['id'][keep].tolist())
+    if not ids:
+        return queryset
+
+    selected = Q(id__in=ids)
+    if whole:
+        selected |= Q(**{f'{series_field}__in': whole})
+    return queryset.filter(selected)
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+from collections import defaultdict, namedtuple
+
+import httpx
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .alerts import evaluate_alerts
+from .live import publish_ticks
+from .models import ScrapeLog, ExchangeRateSnapshot, ErrorLog
+from .price_cache import write_latest_prices
+from .rates import bump_rates_version
+from .user_versions import bump_user_versions
+
+
+logger = logging.getLogger(__name__)
+
+# ✅ Outcome of one engine run: quotes keyed by pair plus (source, message) errors
+ScrapeResult = namedtuple('ScrapeResult', ['quotes', 'errors'])
+
+
+def load_source(source):
+    if isinstance(source, str):
+        return import_string(source)()
+    return source
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# ✅ Concurrent scraping engine sharing one pooled AsyncClient per run
+class ScrapeEngine:
+    """
+    Fetches many (coin, currency) pairs and exchange rates concurrently.
+    Pairs are grouped so that every upstream request carries as many symbols
+    as the source adapter allows, and all requests go through a single
+    connection pool capped at `max_concurrency` in-flight calls.
+    """
+
+    def __init__(self, price_source=None, rate_source=None,
+                 max_concurrency=None, timeout=None, transport=None):
+        self.price_source = load_source(
+            price_source or settings.SCRAPER_PRICE_SOURCE)
+        self.rate_source = load_source(
+            rate_source or settings.SCRAPER_RATE_SOURCE)
+        self.max_concurrency = max_concurrency or settings.SCRAPER_MAX_CONCURRENCY
+        self.timeout = timeout or settings.SCRAPER_TIMEOUT
+        self.transport = transport
+
+    def _client(self):
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=self.transport,
+            headers={'Accept': 'application/json'},
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+
+    @staticmethod
+    async def _bounded(semaphore, call, *args):
+        async with semaphore:
+            return await call(*args)
+
+    async def _gather(self, source, method, batches):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._client() as client:
+            outcomes = await asyncio.gather(*(
+                self._bounded(semaphore, getattr(source, method), client, *batch)
+                for batch in batches
+            ), return_exceptions=True)
+
+        results, errors = [], []
+        for batch, outcome in zip(batches, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("Scrape batch %s failed on %s: %s",
+                               batch, source.name, outcome)
+                errors.append((source.name, f"{batch}: {outcome!r}"))
+            else:
+                results.extend(outcome)
+        return results, errors
+
+    # Coins asking for the same currencies share upstream requests
+    def _price_batches(self, pairs):
+        currencies_by_coin = defaultdict(set)
+        for coin, currency in pairs:
+            currencies_by_coin[coin].add(currency)
+
+        coins_by_currencies = defaultdict(list)
+        for coin, currencies in currencies_by_coin.items():
+            coins_by_currencies[frozenset(currencies)].append(coin)
+
+        return [
+            (chunk, sorted(currencies))
+            for currencies, coins in coins_by_currencies.items()
+            for chunk in chunked(sorted(coins), self.price_source.max_batch)
+        ]
+
+    def _rate_batches(self, pairs):
+        targets_by_base = defaultdict(set)
+        for base, target in pairs:
+            targets_by_base[base].add(target)
+
+        return [
+            (base, chunk)
+            for base, targets in targets_by_base.items()
+            for chunk in chunked(sorted(targets), self.rate_source.max_batch)
+        ]
+
+    async def fetch_prices(self, pairs):
+        pairs = {(coin.upper(), currency.upper()) for coin, currency in pairs}
+        quotes, errors = await self._gather(
+            self.price_source, 'fetch_prices', self._price_batches(pairs))
+        # Batches may return currencies nobody asked for this coin
+        return ScrapeResult(
+            {(q.coin, q.currency): q for q in quotes
+             if (q.coin, q.currency) in pairs},
+            errors,
+        )
+
+    async def fetch_rates(self, pairs):
+        pairs = {(base.upper(), target.upper()) for base, target in pairs}
+        quotes, errors = await self._gather(
+            self.rate_source, 'fetch_rates', self._rate_batches(pairs))
+        return ScrapeResult(
+            {(q.base_currency, q.target_currency): q for q in quotes
+             if (q.base_currency, q.target_currency) in pairs},
+            errors,
+        )
+
+    # Synchronous entry points for Celery tasks and management commands
+    def scrape_prices(self, pairs):
+        return asyncio.run(self.fetch_prices(pairs))
+
+    def scrape_rates(self, pairs):
+        return asyncio.run(self.fetch_rates(pairs))
+
+
+# ✅ Persisting engine output in bulk
+def save_price_logs(quotes, user_ids):
+    quotes = list(quotes)
+    return fan_out_price_logs(
+        quotes, {(quote.coin, quote.currency): user_ids for quote in quotes})
+
+
+# One fetched quote becomes one ScrapeLog row per subscribing user
+def fan_out_price_logs(quotes, user_ids_by_pair):
+    # Only each quote's first copy counts towards the market candles
+    logs = [
+        ScrapeLog(user_id=user_id, coin=quote.coin, currency=quote.currency,
+                  price=quote.price, timestamp=quote.fetched_at,
+                  is_market_tick=index == 0)
+        for quote in quotes
+        for index, user_id in enumerate(
+            user_ids_by_pair.get((quote.coin, quote.currency), ()))
+    ]
+    logs = ScrapeLog.objects.bulk_create(logs, batch_size=1000)
+    ticks = [(quote.coin, quote.currency, quote.price, quote.fetched_at)
+             for quote in quotes]
+    write_latest_prices(ticks)
+    evaluate_alerts(ticks)
+    publish_ticks(ticks)
+    return logs
+
+
+def save_rate_snapshots(rate_quotes):
+    snapshots = [
+        ExchangeRateSnapshot(base_currency=quote.base_currency,
+                             target_currency=quote.target_currency,
+                             rate=quote.rate)
+        for quote in rate_quotes
+    ]
+    snapshots = ExchangeRateSnapshot.objects.bulk_create(
+        snapshots, batch_size=1000)
+    if snapshots:
+        transaction.on_commit(bump_rates_version)
+    return snapshots
+
+
+def save_errors(errors, user_id=None):
+    logs = ErrorLog.objects.bulk_create([
+        ErrorLog(user_id=user_id, source=source, error_message=message)
+        for source, message in errors
+    ])
+    # bulk_create sends no post_save, so cached error summaries are moved on here
+    if logs:
+        transaction.on_commit(lambda: bump_user_versions(ErrorLog, [user_id]))
+    return logs
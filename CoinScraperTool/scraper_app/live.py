@@ -0,0 +1,137 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+import redis
+from django.conf import settings
+
+from core.redis_client import get_async_pubsub, get_redis
+from .price_cache import PRICE_QUANTUM
+
+
+logger = logging.getLogger(__name__)
+
+PRICE_CHANNEL = 'prices:live'
+# Subscription key of clients that want every coin
+ALL_COINS = '*'
+
+
+# ✅ Publishing a batch of new prices to every process's live subscribers
+def publish_ticks(ticks):
+    """
+    `ticks` yields (coin, currency, price, timestamp); the whole batch goes
+    out as one message. Like the latest-price cache this is best effort.
+    """
+    message = [{
+        'coin': coin.upper(),
+        'currency': currency.upper(),
+        'price': str(Decimal(price).quantize(PRICE_QUANTUM)),
+        'timestamp': timestamp.isoformat(),
+    } for coin, currency, price, timestamp in ticks]
+    if not message:
+        return 0
+    try:
+        get_redis().publish(PRICE_CHANNEL, json.dumps(message))
+    except redis.RedisError as exc:
+        logger.warning("Live price publish failed: %s", exc)
+        return 0
+    return len(message)
+
+
+class Subscriber:
+    """
+    A bounded queue of ticks for one client. A client that falls behind
+    loses its oldest ticks instead of holding up everyone else.
+    """
+
+    def __init__(self, coins):
+        self.coins = coins
+        self.queue = asyncio.Queue(maxsize=settings.PRICE_STREAM_QUEUE_SIZE)
+        self.dropped = 0
+
+    def put(self, tick):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(tick)
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+# ✅ One pub/sub subscription per process, fanned out to clients by coin
+class PriceHub:
+    """
+    Lives on the server's event loop. The first subscriber starts a single
+    listener on PRICE_CHANNEL and the last one to leave stops it, so idle
+    clients cost a queue and a suspended coroutine each, never a Redis
+    connection. The listener reconnects after Redis errors and skips
+    messages it cannot parse.
+    """
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self._listener = None
+        self._ready = None
+
+    @property
+    def count(self):
+        return len(set().union(*self.subscribers.values()))
+
+    async def subscribe(self, coins=()):
+        subscriber = Subscriber(frozenset(coin.upper() for coin in coins))
+        for coin in subscriber.coins or [ALL_COINS]:
+            self.subscribers[coin].add(subscriber)
+        loop = asyncio.get_running_loop()
+        listener = self._listener
+        if listener is None or listener.done() or listener.get_loop() is not loop:
+            self._ready = asyncio.Event()
+            self._listener = loop.create_task(self.listen(self._ready))
+        # Ticks published from here on reach the new subscriber; with Redis
+        # down the stream starts anyway and fills once the listener connects
+        try:
+            await asyncio.wait_for(self._ready.wait(), settings.REDIS_SOCKET_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Live price subscription is not ready yet")
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        for coin in subscriber.coins or [ALL_COINS]:
+            self.subscribers[coin].discard(subscriber)
+            if not self.subscribers[coin]:
+                del self.subscribers[coin]
+        if not self.subscribers and self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    async def listen(self, ready):
+        while True:
+            pubsub = get_async_pubsub()
+            try:
+                await pubsub.subscribe(PRICE_CHANNEL)
+                ready.set()
+                async for message in pubsub.listen():
+                    if message['type'] != 'message':
+                        continue
+                    # A malformed message is dropped, not fatal to every stream
+                    try:
+                        self.dispatch(json.loads(message['data']))
+                    except (ValueError, KeyError, TypeError) as exc:
+                        logger.warning("Dropped malformed live price message: %r",
+                                       exc)
+            except redis.RedisError as exc:
+                logger.warning("Live price subscription lost: %s", exc)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def dispatch(self, ticks):
+        everyone = self.subscribers.get(ALL_COINS, ())
+        for tick in ticks:
+            for subscriber in (*self.subscribers.get(tick['coin'], ()), *everyone):
+                subscriber.put(tick)
+
+
+price_hub = PriceHub()
@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from core.log_pipeline import AsyncLogging, SamplingFilter
+from core.log_retention import SegmentedLogHandler
+
+
+MODES = ['off', 'sync', 'async', 'async+sampled']
+
+
+# Simulates slow or contended storage (network volumes, busy disks)
+class SlowFlushHandler(SegmentedLogHandler):
+    flush_delay = 0
+
+    def flush(self):
+        super().flush()
+        if self.flush_delay:
+            time.sleep(self.flush_delay)
+
+
+class Command(BaseCommand):
+    help = ("Times requests through the full Django stack with the root logger "
+            "off, writing synchronously to a file, and through the queue "
+            "pipeline (with and without request-log sampling).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--path', default='/favicon.ico')
+        parser.add_argument('--sample-rate', type=int, default=10)
+        parser.add_argument('--flush-delay-ms', type=float, default=0,
+                            help="Extra latency added to every handler flush")
+        parser.add_argument('--json', action='store_true')
+
+    # DEBUG off keeps debug_toolbar's per-request checks out of the timings
+    @override_settings(DEBUG=False, ALLOWED_HOSTS=['localhost'])
+    def handle(self, *args, **options):
+        root = logging.getLogger()
+        request_logger = logging.getLogger('coinlytics.requests')
+        saved = root.handlers[:]
+        client = Client(HTTP_HOST='localhost')
+        results = {}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                for mode in MODES:
+                    root.handlers = []
+                    pipeline, sampler = None, None
+                    handler = SlowFlushHandler(os.path.join(tmp, f'{mode}.log'))
+                    handler.flush_delay = options['flush_delay_ms'] / 1000
+                    handler.setFormatter(logging.Formatter(
+                        "[%(asctime)s] [%(levelname)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
+                    if mode == 'sync':
+                        root.addHandler(handler)
+                    elif mode.startswith('async'):
+                        pipeline = AsyncLogging(root, [handler]).start()
+                    if mode == 'async+sampled':
+                        sampler = SamplingFilter(options['sample_rate'])
+                        request_logger.addFilter(sampler)
+
+                    results[mode] = self.measure(client, options)
+
+                    if pipeline:
+                        pipeline.stop()
+                    if sampler:
+                        request_logger.removeFilter(sampler)
+                    handler.close()
+            finally:
+                root.handlers = saved
+
+        self.report(results, options)
+
+    # ✅ Per-request latency in microseconds after a short warm-up
+    def measure(self, client, options):
+        for _ in range(50):
+            client.get(options['path'])
+        timings = []
+        for _ in range(options['requests']):
+            start = time.perf_counter()
+            client.get(options['path'])
+            timings.append((time.perf_counter() - start) * 1e6)
+        timings.sort()
+        return {
+            'mean_us': round(statistics.fmean(timings), 1),
+            'p50_us': round(timings[len(timings) // 2], 1),
+            'p99_us': round(timings[int(len(timings) * 0.99) - 1], 1),
+        }
+
+    def report(self, results, options):
+        baseline = results['off']['mean_us']
+        for stats in results.values():
+            stats['overhead_us'] = round(stats['mean_us'] - baseline, 1)
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{options['requests']} requests to {options['path']} "
+                          f"(flush delay {options['flush_delay_ms']}ms)")
+        for mode, stats in results.items():
+            self.stdout.write(
+                f"  {mode:<14} mean {stats['mean_us']:>8.1f}us  p50 {stats['p50_us']:>8.1f}us  "
+                f"p99 {stats['p99_us']:>8.1f}us  logging overhead {stats['overhead_us']:>7.1f}us")
@@ -0,0 +1,141 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from scraper_app.models import ScrapeLog
+
+
+COINS = ['BTC', 'ETH', 'SOL', 'ADA', 'XRP', 'DOGE', 'DOT', 'LTC', 'AVAX', 'LINK']
+BRIN_INDEX = 'scrapelog_timestamp_brin'
+
+
+class Command(BaseCommand):
+    help = ("Seeds synthetic ScrapeLog ticks inside a rolled-back transaction and "
+            "compares query plans/latencies of the ScrapeLogViewSet query shapes "
+            "before (iexact, no composite indexes) and after (equality + indexes).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000)
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        results = {}
+        # Seeded rows and dropped indexes are both undone by the rollback
+        with transaction.atomic():
+            user_id = self.seed(options)
+            self.analyze()
+            results['after'] = self.measure(
+                self.after_shapes(user_id, options), options['repeat'])
+            self.drop_indexes()
+            self.analyze()
+            results['before'] = self.measure(
+                self.before_shapes(user_id, options), options['repeat'])
+            transaction.set_rollback(True)
+
+        self.report(results)
+
+    # ✅ Seeding N ticks spread over the requested window for several users
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        User = get_user_model()
+        users = User.objects.bulk_create([
+            User(username=f'bench_{i}', email=f'bench_{i}@example.com')
+            for i in range(options['users'])
+        ])
+        user_ids = [user.id for user in User.objects.filter(
+            username__startswith='bench_').order_by('id')]
+
+        now = timezone.now()
+        span = options['days'] * 86400
+        batch = []
+        for _ in range(options['rows']):
+            batch.append(ScrapeLog(
+                user_id=rng.choice(user_ids),
+                coin=rng.choice(COINS),
+                currency=rng.choice(['USD', 'USD', 'USD', 'EUR']),
+                price=Decimal(f"{rng.uniform(1, 70000):.6f}"),
+                timestamp=now - timedelta(seconds=rng.randrange(span)),
+            ))
+            if len(batch) == 5000:
+                ScrapeLog.objects.bulk_create(batch)
+                batch = []
+        ScrapeLog.objects.bulk_create(batch)
+        self.stdout.write(
+            f"Seeded {options['rows']} ticks for {len(users)} users")
+        return user_ids[0]
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'ANALYZE {connection.ops.quote_name(ScrapeLog._meta.db_table)}')
+
+    def drop_indexes(self):
+        names = [index.name for index in ScrapeLog._meta.indexes]
+        if connection.vendor == 'postgresql':
+            names.append(BRIN_INDEX)
+        with connection.cursor() as cursor:
+            for name in names:
+                cursor.execute(
+                    f'DROP INDEX IF EXISTS {connection.ops.quote_name(name)}')
+
+    # Query shapes mirroring ScrapeLogViewSet.list / by_coin / price_history
+    def before_shapes(self, user_id, options):
+        logs = ScrapeLog.objects.filter(user_id=user_id)
+        start = timezone.now() - timedelta(days=30)
+        return {
+            'list': logs.order_by('-timestamp')[:50],
+            'by_coin': logs.filter(coin__iexact='btc'),
+            'price_history': logs.filter(
+                coin__iexact='btc', timestamp__gte=start).order_by('timestamp'),
+        }
+
+    def after_shapes(self, user_id, options):
+        logs = ScrapeLog.objects.filter(user_id=user_id)
+        start = timezone.now() - timedelta(days=30)
+        return {
+            'list': logs.order_by('-timestamp')[:50],
+            'by_coin': logs.filter(coin='BTC'),
+            'price_history': logs.filter(
+                coin='BTC', currency='USD', timestamp__gte=start
+            ).order_by('timestamp'),
+        }
+
+    def measure(self, shapes, repeat):
+        measured = {}
+        for name, queryset in shapes.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                rows = len(list(queryset.all()))
+                timings.append((time.perf_counter() - started) * 1000)
+            measured[name] = {
+                'rows': rows,
+                'median_ms': round(statistics.median(timings), 3),
+                'p95_ms': round(sorted(timings)[int(len(timings) * 0.95) - 1], 3),
+                'plan': queryset.explain(),
+            }
+        return measured
+
+    def report(self, results):
+        for name in results['after']:
+            before, after = results['before'][name], results['after'][name]
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {name} =="))
+            self.stdout.write(f"before: {before['median_ms']} ms median, "
+                              f"{before['p95_ms']} ms p95, {before['rows']} rows")
+            self.stdout.write(f"  plan: {before['plan']}")
+            self.stdout.write(f"after:  {after['median_ms']} ms median, "
+                              f"{after['p95_ms']} ms p95, {after['rows']} rows")
+            self.stdout.write(f"  plan: {after['plan']}")
+            if after['median_ms']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"speed-up: {before['median_ms'] / after['median_ms']:.1f}x"))
@@ -0,0 +1,109 @@
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.fastpath import ORJSONRenderer, RowSerializer
+from api.serializers import ExchangeRateSnapshotSerializer, ScrapeLogSerializer
+from scraper_app.models import ExchangeRateSnapshot, ScrapeLog
+
+
+class Command(BaseCommand):
+    help = ("Seeds ScrapeLog and ExchangeRateSnapshot rows inside a rolled-back "
+            "transaction and compares rows per second (query, serialization and "
+            "JSON rendering) of the DRF serializers with the values_list fast "
+            "path rendered by orjson.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options)
+            querysets = {
+                'scrape_logs': (ScrapeLogSerializer,
+                                ScrapeLog.objects.filter(user=self.user).order_by('timestamp')),
+                'exchange_rates': (ExchangeRateSnapshotSerializer,
+                                   ExchangeRateSnapshot.objects.order_by('timestamp')),
+            }
+            results = {name: self.measure(serializer_class, queryset, options)
+                       for name, (serializer_class, queryset) in querysets.items()}
+            transaction.set_rollback(True)
+        self.report(results, options)
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        self.user = get_user_model().objects.create(
+            username='bench_serializers', email='bench_serializers@example.com')
+        now = timezone.now()
+        ScrapeLog.objects.bulk_create([
+            ScrapeLog(user=self.user, coin='BTC', currency='USD',
+                      price=Decimal(f"{rng.uniform(1, 70000):.6f}"),
+                      timestamp=now - timedelta(seconds=i * 60))
+            for i in range(options['rows'])
+        ], batch_size=5000)
+        ExchangeRateSnapshot.objects.bulk_create([
+            ExchangeRateSnapshot(base_currency='USD', target_currency='EUR',
+                                 rate=Decimal(f"{rng.uniform(0.8, 1.0):.6f}"))
+            for _ in range(options['rows'])
+        ], batch_size=5000)
+
+    # ✅ Rows per second of each path, from the query to the rendered bytes
+    def measure(self, serializer_class, queryset, options):
+        rows = RowSerializer(serializer_class)
+        paths = {
+            'drf': lambda: JSONRenderer().render(
+                serializer_class(queryset.all(), many=True).data),
+            'fast': lambda: ORJSONRenderer().render(rows.serialize(queryset.all())),
+        }
+        count = queryset.count()
+        measured = {}
+        for name, render in paths.items():
+            measured[name] = self.time_path(render, count, options)
+        with override_settings(FAST_SERIALIZER_DECIMALS='float'):
+            measured['fast_float'] = self.time_path(paths['fast'], count, options)
+
+        baseline = measured['drf']['rows_per_second']
+        for stats in measured.values():
+            stats['speedup'] = round(stats['rows_per_second'] / baseline, 2)
+        return measured
+
+    def time_path(self, render, count, options):
+        render()  # warm-up
+        timings = []
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            body = render()
+            timings.append(time.perf_counter() - started)
+        median = statistics.median(timings)
+        return {
+            'median_ms': round(median * 1000, 2),
+            'rows': count,
+            'rows_per_second': round(count / median),
+            'bytes': len(body),
+        }
+
+    def report(self, results, options):
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, measured in results.items():
+            rows = next(iter(measured.values()))['rows']
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {name} ({rows} rows) =="))
+            for path, stats in measured.items():
+                self.stdout.write(
+                    f"  {path:<11} {stats['rows_per_second']:>10} rows/s  "
+                    f"{stats['median_ms']:>9.2f} ms  {stats['bytes']:>9} bytes  "
+                    f"x{stats['speedup']}")
@@ -0,0 +1,234 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from Coinlytics.celery import app as celery_app
+from api.query_budget import QueryCounter
+from scraper_app.models import (
+    ExchangeRateSnapshot, PriceCandle, RollupWatermark, ScheduledScrape, ScrapeLog, UserActivity,
+    UserPreference)
+from scraper_app.tasks import (
+    drain_scheduled_scrapes, refresh_exchange_rates, roll_up_price_candles,
+    send_price_alerts)
+from .seed_market_data import USER_PREFIX
+
+
+# name -> (path, query params); {coin1}/{coin2}/{preference} are filled in
+ENDPOINTS = {
+    'scrape_logs.list': ('/api/scrape-logs/', {}),
+    'scrape_logs.by_coin': ('/api/scrape-logs/by_coin/', {'coin': '{coin1}'}),
+    'scrape_logs.price_history': (
+        '/api/scrape-logs/price_history/', {'coin': '{coin1}', 'days': 30}),
+    'scrape_logs.price_history_1y_downsampled': (
+        '/api/scrape-logs/price_history/',
+        {'coin': '{coin1}', 'days': 365, 'max_points': 500}),
+    'scrape_logs.price_history_1y_candles': (
+        '/api/scrape-logs/price_history/',
+        {'coin': '{coin1}', 'days': 365, 'resolution': '1d'}),
+    'scrape_logs.price_history_converted': (
+        '/api/scrape-logs/price_history/',
+        {'coin': '{coin1}', 'days': 30, 'convert_to': 'EUR'}),
+    'exchange_rates.list': ('/api/exchange-rates/', {}),
+    'exchange_rates.latest_rates': ('/api/exchange-rates/latest_rates/', {}),
+    'exchange_rates.currency_pair': (
+        '/api/exchange-rates/currency_pair/', {'base': 'USD', 'target': 'EUR'}),
+    'coin_comparisons.list': ('/api/coin-comparisons/', {}),
+    'coin_comparisons.compare_coins': (
+        '/api/coin-comparisons/compare_coins/', {'coin1': '{coin1}', 'coin2': '{coin2}'}),
+    'coin_comparisons.compare_coins_analytics': (
+        '/api/coin-comparisons/compare_coins/',
+        {'coin1': '{coin1}', 'coin2': '{coin2}', 'mode': 'analytics', 'days': 90}),
+    'preferences.correlation_matrix': (
+        '/api/preferences/{preference}/correlation_matrix/', {'days': 90}),
+    'user_activities.list': ('/api/user-activities/', {}),
+    'user_activities.recent_activity': ('/api/user-activities/recent_activity/', {}),
+    'user_activities.activity_summary': (
+        '/api/user-activities/activity_summary/', {'days': 30}),
+    'error_logs.list': ('/api/error-logs/', {}),
+}
+
+STUB_SOURCES = dict(SCRAPER_PRICE_SOURCE='scraper_app.sources.StubSource',
+                    SCRAPER_RATE_SOURCE='scraper_app.sources.StubSource')
+
+
+def timings_summary(timings):
+    timings = sorted(timings)
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[max(int(len(timings) * 0.95) - 1, 0)], 3),
+        'min_ms': round(timings[0], 3),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def reset_candles():
+    PriceCandle.objects.all().delete()
+    RollupWatermark.objects.update(last_id=0)
+
+
+class Command(BaseCommand):
+    help = ("Times the hot API endpoints and Celery tasks against data from "
+            "seed_market_data and prints JSON (or writes it with --output) so "
+            "runs on two commits can be diffed. Task runs are rolled back; "
+            "scrapes use the stub sources.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--only', nargs='*', default=None,
+                            help="Benchmark names (or prefixes) to run")
+        parser.add_argument('--skip-tasks', action='store_true')
+        parser.add_argument('--output')
+        parser.add_argument('--baseline', help="Earlier JSON result to compare with")
+
+    # DEBUG off keeps debug_toolbar and query logging out of the timings
+    @override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(
+            username__startswith=USER_PREFIX).order_by('id').first()
+        if user is None:
+            raise CommandError("No seeded data found; run seed_market_data first")
+
+        results = {
+            'meta': self.meta(options),
+            'endpoints': self.run_endpoints(user, options),
+            'tasks': {} if options['skip_tasks'] else self.run_tasks(options),
+        }
+        output = json.dumps(results, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+        else:
+            self.stdout.write(output)
+        if options['baseline']:
+            self.compare(results, options['baseline'])
+
+    def selected(self, name, options):
+        return not options['only'] or any(name.startswith(prefix)
+                                          for prefix in options['only'])
+
+    def meta(self, options):
+        return {
+            'revision': git_revision(),
+            'generated_at': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'repeat': options['repeat'],
+            'rows': {model.__name__: model.objects.count() for model in (
+                ScrapeLog, ExchangeRateSnapshot, UserActivity, ScheduledScrape)},
+        }
+
+    # ✅ Latency, query count and size of every endpoint for one seeded user
+    def run_endpoints(self, user, options):
+        # Errors are reported as their status code instead of aborting the run
+        client = APIClient(raise_request_exception=False)
+        client.force_authenticate(user)
+        preference = UserPreference.objects.filter(user=user).first()
+        coins = (preference.favorite_coins if preference else []) + ['BTC', 'ETH']
+        values = {'coin1': coins[0], 'coin2': coins[1],
+                  'preference': preference.pk if preference else 0}
+
+        results = {}
+        for name, (path, params) in ENDPOINTS.items():
+            if not self.selected(name, options):
+                continue
+            path = path.format(**values)
+            params = {key: str(value).format(**values) for key, value in params.items()}
+
+            # Counted directly: request_started resets connection.queries_log
+            queries = QueryCounter()
+            started = time.perf_counter()
+            with connection.execute_wrapper(queries):
+                response = client.get(path, params)
+            first = (time.perf_counter() - started) * 1000
+            for _ in range(options['warmup']):
+                client.get(path, params)
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                client.get(path, params)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            results[name] = {
+                'status': response.status_code,
+                'bytes': len(response.content),
+                'queries': queries.count,
+                'first_ms': round(first, 3),
+                **timings_summary(timings),
+            }
+        return results
+
+    # ✅ Timing each task inline inside a transaction that is rolled back
+    def run_tasks(self, options):
+        # Work the tasks queue themselves (e.g. mail batches) runs inline too
+        eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+        recipients = list(get_user_model().objects.filter(
+            username__startswith=USER_PREFIX).values_list('id', flat=True)[:100])
+        alerts = [{'preference_id': 0, 'user_id': user_id, 'coin': 'BTC', 'currency': 'USD',
+                   'price': '61000', 'reference': '60000', 'change': 1.67,
+                   'timestamp': datetime.now(dt_timezone.utc).isoformat()}
+                  for user_id in recipients]
+        tasks = {
+            # Rebuilding every candle from the seeded ticks
+            'roll_up_price_candles.full': (
+                roll_up_price_candles, (), reset_candles),
+            'drain_scheduled_scrapes': (drain_scheduled_scrapes, (), None),
+            'refresh_exchange_rates': (refresh_exchange_rates, (), None),
+            'send_price_alerts': (send_price_alerts, (alerts,), None),
+        }
+
+        results = {}
+        try:
+            with override_settings(
+                    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                    **STUB_SOURCES):
+                for name, (task, args, prepare) in tasks.items():
+                    if not self.selected(name, options):
+                        continue
+                    timings = []
+                    for _ in range(max(options['repeat'] // 5, 1)):
+                        with transaction.atomic():
+                            if prepare:
+                                prepare()
+                            started = time.perf_counter()
+                            outcome = task.apply(args)
+                            timings.append((time.perf_counter() - started) * 1000)
+                            transaction.set_rollback(True)
+                    results[name] = {'state': outcome.state, 'runs': len(timings),
+                                     **timings_summary(timings)}
+        finally:
+            celery_app.conf.task_always_eager = eager
+        return results
+
+    def compare(self, results, baseline_path):
+        with open(baseline_path) as handle:
+            baseline = json.load(handle)
+        self.stderr.write(f"Compared with {baseline['meta'].get('revision')}:")
+        for group in ('endpoints', 'tasks'):
+            for name, current in results[group].items():
+                previous = baseline.get(group, {}).get(name)
+                if not previous or not previous['median_ms']:
+                    continue
+                change = (current['median_ms'] / previous['median_ms'] - 1) * 100
+                self.stderr.write(
+                    f"  {name:<48} {previous['median_ms']:>10.3f} -> "
+                    f"{current['median_ms']:>10.3f} ms ({change:+.1f}%)")
@@ -0,0 +1,197 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from scraper_app.models import (
+    CoinComparison, ExchangeRateSnapshot, PriceCandle, Profile, RollupWatermark,
+    ScheduledScrape, ScrapeLog, UserActivity, UserPreference)
+from scraper_app.rates import bump_rates_version
+from scraper_app.rollups import update_candles
+from scraper_app.synthetic import START_PRICES, START_RATES, coin_symbols, gbm_paths
+
+
+USER_PREFIX = 'seed_'
+BATCH_SIZE = 5000
+ACTIONS = ['scraped price', 'viewed price history', 'compared coins',
+           'updated preferences', 'converted currency', 'exported history']
+
+
+# Lets bulk_create keep the timestamps we set on auto_now_add fields
+@contextmanager
+def backdated(*fields):
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def price(value):
+    return Decimal(f"{value:.6f}")
+
+
+class Command(BaseCommand):
+    help = ("Seeds a deterministic benchmark dataset: users, years of ScrapeLog "
+            "ticks from geometric Brownian motion, exchange rate history, "
+            "activities, comparisons and schedules. Meant for a dedicated "
+            "benchmark database (SQLite or PostgreSQL); --reset clears the "
+            "market data tables first.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--coins', type=int, default=5)
+        parser.add_argument('--days', type=int, default=730)
+        parser.add_argument('--interval-minutes', type=int, default=360,
+                            help="Gap between two ticks of the same coin")
+        parser.add_argument('--activities', type=int, default=200,
+                            help="UserActivity rows per user")
+        parser.add_argument('--activity-days', type=int, default=30,
+                            help="Window the activities are spread over")
+        parser.add_argument('--comparisons', type=int, default=50,
+                            help="CoinComparison rows per user")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--skip-rollups', action='store_true')
+        parser.add_argument('--reset', action='store_true')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        User = get_user_model()
+        if options['reset']:
+            self.reset()
+        elif User.objects.filter(username__startswith=USER_PREFIX).exists():
+            raise CommandError("Seeded data already exists; pass --reset to replace it")
+
+        coins = coin_symbols(options['coins'])
+        step = options['interval_minutes'] * 60
+        steps = max(options['days'] * 86400 // step, 2)
+        end = timezone.now().replace(second=0, microsecond=0)
+        times = [end - timedelta(seconds=step * (steps - 1 - i)) for i in range(steps)]
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            users = self.seed_users(options['users'], coins)
+            paths = gbm_paths([START_PRICES.get(coin, 10) for coin in coins],
+                              steps, step, seed=options['seed'])
+            ticks = self.seed_ticks(users, coins, times, paths)
+            rates = self.seed_rates(times, step, options['seed'])
+            activities = self.seed_activities(users, options['activities'], end,
+                                              options['activity_days'], rng)
+            comparisons = self.seed_comparisons(users, coins, options['comparisons'],
+                                                times, paths, rng)
+            self.seed_schedules(users, coins, end)
+        bump_rates_version()
+
+        candles = 0
+        if not options['skip_rollups']:
+            while True:
+                processed, created, _ = update_candles()
+                candles += created
+                if not processed:
+                    break
+
+        self.stdout.write(self.style.SUCCESS(
+            f"🌱 Seeded {len(users)} users, {ticks} ticks of {len(coins)} coins over "
+            f"{options['days']} days, {rates} rate snapshots, {activities} activities, "
+            f"{comparisons} comparisons and {candles} candles in "
+            f"{time.perf_counter() - started:.1f}s."))
+
+    def reset(self):
+        get_user_model().objects.filter(username__startswith=USER_PREFIX).delete()
+        for model in (ScrapeLog, ExchangeRateSnapshot, PriceCandle, RollupWatermark):
+            model.objects.all().delete()
+
+    def seed_users(self, count, coins):
+        User = get_user_model()
+        User.objects.bulk_create([
+            User(username=f'{USER_PREFIX}{i}', email=f'{USER_PREFIX}{i}@example.com')
+            for i in range(count)
+        ])
+        users = list(User.objects.filter(username__startswith=USER_PREFIX).order_by('id'))
+        Profile.objects.bulk_create([
+            Profile(user=user, username=user.username, phone_number='')
+            for user in users
+        ])
+        # bulk_create skips the signals, so the alert index is rebuilt lazily
+        UserPreference.objects.bulk_create([
+            UserPreference(user=user, preferred_currency='USD',
+                           favorite_coins=coins[:4], notify_on_price_change=False)
+            for user in users
+        ])
+        return users
+
+    # ✅ Every user scrapes every coin at each step of the shared price paths
+    def seed_ticks(self, users, coins, times, paths):
+        batch, count = [], 0
+        for row, timestamp in enumerate(times):
+            for column, coin in enumerate(coins):
+                value = price(paths[row, column])
+                for index, user in enumerate(users):
+                    batch.append(ScrapeLog(user=user, coin=coin, price=value,
+                                           currency='USD', timestamp=timestamp,
+                                           is_market_tick=index == 0))
+            if len(batch) >= BATCH_SIZE:
+                ScrapeLog.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        ScrapeLog.objects.bulk_create(batch)
+        return count + len(batch)
+
+    def seed_rates(self, times, step, seed):
+        base = settings.SCRAPER_RATE_BASE
+        targets = [target for target in settings.SCRAPER_RATE_TARGETS if target != base]
+        paths = gbm_paths([START_RATES.get(target, 1) for target in targets],
+                          len(times), step, seed=seed + 1, drift=0,
+                          volatility=0.08, correlation=0.3)
+        snapshots = [
+            ExchangeRateSnapshot(base_currency=base, target_currency=target,
+                                 rate=price(paths[row, column]), timestamp=timestamp)
+            for row, timestamp in enumerate(times)
+            for column, target in enumerate(targets)
+        ]
+        with backdated(ExchangeRateSnapshot._meta.get_field('timestamp')):
+            ExchangeRateSnapshot.objects.bulk_create(snapshots, batch_size=BATCH_SIZE)
+        return len(snapshots)
+
+    def seed_activities(self, users, per_user, end, days, rng):
+        span = days * 86400
+        activities = [
+            UserActivity(user=user, action=rng.choice(ACTIONS),
+                         timestamp=end - timedelta(seconds=rng.randrange(span)))
+            for user in users for _ in range(per_user)
+        ]
+        with backdated(UserActivity._meta.get_field('timestamp')):
+            UserActivity.objects.bulk_create(activities, batch_size=BATCH_SIZE)
+        return len(activities)
+
+    def seed_comparisons(self, users, coins, per_user, times, paths, rng):
+        comparisons = []
+        for user in users:
+            for _ in range(per_user):
+                first, second = rng.sample(range(len(coins)), 2)
+                row = rng.randrange(len(times))
+                comparisons.append(CoinComparison(
+                    user=user, coin1=coins[first], coin2=coins[second],
+                    coin1_price=price(paths[row, first]),
+                    coin2_price=price(paths[row, second]),
+                    comparison_date=times[row]))
+        with backdated(CoinComparison._meta.get_field('comparison_date')):
+            CoinComparison.objects.bulk_create(comparisons, batch_size=BATCH_SIZE)
+        return len(comparisons)
+
+    def seed_schedules(self, users, coins, end):
+        # Due right away, so a drain has work to coalesce
+        ScheduledScrape.objects.bulk_create([
+            ScheduledScrape(user=user, coin=coin, currency='USD', interval_minutes=60,
+                            next_run_at=end)
+            for user in users for coin in coins
+        ], batch_size=BATCH_SIZE)
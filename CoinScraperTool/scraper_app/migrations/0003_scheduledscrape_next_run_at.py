@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-18 06:39
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_next_run_at(apps, schema_editor):
+    ScheduledScrape = apps.get_model('scraper_app', 'ScheduledScrape')
+    now = timezone.now()
+    batch = []
+    for scrape in ScheduledScrape.objects.only(
+            'id', 'last_run', 'interval_minutes').iterator(chunk_size=2000):
+        scrape.next_run_at = (
+            scrape.last_run + timedelta(minutes=scrape.interval_minutes)
+            if scrape.last_run else now)
+        batch.append(scrape)
+        if len(batch) >= 2000:
+            ScheduledScrape.objects.bulk_update(batch, ['next_run_at'])
+            batch = []
+    ScheduledScrape.objects.bulk_update(batch, ['next_run_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper_app', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduledscrape',
+            name='next_run_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(populate_next_run_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='scheduledscrape',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['next_run_at'], name='scheduled_scrape_due_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2 on 2026-10-18 06:40
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+from django.db.models.functions import Upper
+
+
+BRIN_INDEX = 'scrapelog_timestamp_brin'
+
+
+# SQLite copies the old 'YYYY-MM-DD' text as-is; give it a time component.
+# PostgreSQL casts date -> timestamptz (midnight UTC) during ALTER COLUMN.
+def widen_sqlite_dates(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    table = apps.get_model('scraper_app', 'ScrapeLog')._meta.db_table
+    schema_editor.execute(
+        f'UPDATE "{table}" SET "timestamp" = "timestamp" || \' 00:00:00\' '
+        f'WHERE length("timestamp") = 10')
+
+
+# Normalising symbols lets lookups use plain equality instead of iexact
+def uppercase_symbols(apps, schema_editor):
+    ScrapeLog = apps.get_model('scraper_app', 'ScrapeLog')
+    ScrapeLog.objects.filter(
+        ~Q(coin=Upper('coin')) | ~Q(currency=Upper('currency'))
+    ).update(coin=Upper('coin'), currency=Upper('currency'))
+
+
+# Tiny block-range index for market-wide time scans (PostgreSQL only)
+def create_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = apps.get_model('scraper_app', 'ScrapeLog')._meta.db_table
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS "{BRIN_INDEX}" ON "{table}" '
+        f'USING brin ("timestamp") WITH (pages_per_range = 32)')
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS "{BRIN_INDEX}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper_app', '0003_scheduledscrape_next_run_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scrapelog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(widen_sqlite_dates, migrations.RunPython.noop),
+        migrations.RunPython(uppercase_symbols, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='scrapelog',
+            index=models.Index(fields=['user', 'coin', 'currency', 'timestamp'], name='scrapelog_user_pair_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scrapelog',
+            index=models.Index(fields=['user', 'timestamp'], name='scrapelog_user_ts_idx'),
+        ),
+        migrations.RunPython(create_brin_index, drop_brin_index),
+    ]
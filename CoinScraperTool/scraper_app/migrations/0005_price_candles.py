@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-18 06:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper_app', '0004_scrapelog_timeseries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PriceCandle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('1m', '1 minute'), ('1h', '1 hour'), ('1d', '1 day')], max_length=2)),
+                ('coin', models.CharField(max_length=20)),
+                ('currency', models.CharField(default='USD', max_length=10)),
+                ('bucket', models.DateTimeField()),
+                ('open', models.DecimalField(decimal_places=6, max_digits=20)),
+                ('high', models.DecimalField(decimal_places=6, max_digits=20)),
+                ('low', models.DecimalField(decimal_places=6, max_digits=20)),
+                ('close', models.DecimalField(decimal_places=6, max_digits=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('open_at', models.DateTimeField()),
+                ('close_at', models.DateTimeField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('resolution', 'coin', 'currency', 'bucket'), name='unique_price_candle')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper_app', '0005_price_candles'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exchangeratesnapshot',
+            index=models.Index(fields=['base_currency', 'target_currency', '-timestamp'], name='rate_pair_ts_idx'),
+        ),
+    ]
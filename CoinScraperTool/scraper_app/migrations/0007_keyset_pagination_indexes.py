@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 06:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper_app', '0006_exchangerate_pair_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='scrapelog',
+            name='scrapelog_user_ts_idx',
+        ),
+        migrations.AddIndex(
+            model_name='errorlog',
+            index=models.Index(fields=['user', 'timestamp', 'id'], name='errorlog_user_ts_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='errorlog',
+            index=models.Index(fields=['timestamp', 'id'], name='errorlog_ts_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exchangeratesnapshot',
+            index=models.Index(fields=['timestamp', 'id'], name='rate_ts_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scrapelog',
+            index=models.Index(fields=['user', 'timestamp', 'id'], name='scrapelog_user_ts_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='useractivity',
+            index=models.Index(fields=['user', 'timestamp', 'id'], name='activity_user_ts_id_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-18 07:31
+
+from django.db import migrations, models
+
+
+# Before this migration every ScrapeLog row was posted by a user through the
+# API, so existing rows are manual and stay out of the shared market data
+def mark_existing_manual(apps, schema_editor):
+    ScrapeLog = apps.get_model('scraper_app', 'ScrapeLog')
+    ScrapeLog.objects.update(is_manual=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper_app', '0007_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapelog',
+            name='is_manual',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_existing_manual, migrations.RunPython.noop),
+    ]
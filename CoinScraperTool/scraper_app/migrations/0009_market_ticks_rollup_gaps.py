@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 09:12
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+# Existing fan-out copies share (coin, currency, timestamp, price); the
+# first row of each quote stays the market tick
+def mark_market_ticks(apps, schema_editor):
+    ScrapeLog = apps.get_model('scraper_app', 'ScrapeLog')
+    ScrapeLog.objects.filter(is_manual=True).update(is_market_tick=False)
+    firsts = (ScrapeLog.objects.filter(is_manual=False)
+              .values('coin', 'currency', 'timestamp', 'price')
+              .annotate(first=Min('id')).values('first'))
+    ScrapeLog.objects.filter(is_manual=False).exclude(
+        id__in=firsts).update(is_market_tick=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper_app', '0008_scrapelog_is_manual'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapelog',
+            name='is_market_tick',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='rollupwatermark',
+            name='gaps',
+            field=models.JSONField(default=list),
+        ),
+        migrations.RunPython(mark_market_ticks, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
+from datetime import timedelta
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 # Create your models here.
@@ -19,14 +21,36 @@ class Profile(models.Model):
 class ScrapeLog(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='scrape_logs')
-    coin = models.CharField(max_length=20)  # eg BTC, ETH
+    coin = models.CharField(max_length=20)  # eg BTC, ETH (stored upper-case)
     price = models.DecimalField(max_digits=20, decimal_places=6)
     currency = models.CharField(max_length=10, default='USD')
-    timestamp = models.DateField(auto_now_add=True)
+    # Time the price was observed at the source (full resolution)
+    timestamp = models.DateTimeField(default=timezone.now)
+    # Entered by the user through the API rather than scraped; such prices
+    # stay private and never feed candles, alerts, caches or live streams
+    is_manual = models.BooleanField(default=False)
+    # One row per fetched quote feeds the market candles; the copies fanned
+    # out to the other users who follow the pair (and manual rows) do not
+    is_market_tick = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [
+            # by_coin / price_history: equality on user+coin(+currency), range on time
+            models.Index(fields=['user', 'coin', 'currency', 'timestamp'],
+                         name='scrapelog_user_pair_ts_idx'),
+            # default list ordering per user and its (timestamp, id) keyset pages
+            models.Index(fields=['user', 'timestamp', 'id'],
+                         name='scrapelog_user_ts_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.coin} price at {self.timestamp}"
 
+    def save(self, *args, **kwargs):
+        self.coin = self.coin.upper()
+        self.currency = self.currency.upper()
+        super().save(*args, **kwargs)
+
 
 # ✅ Model to track the user preference for notifications
 class UserPreference(models.Model):
@@ -44,6 +68,10 @@ class UserPreference(models.Model):
         return f"Preferences for {self.user.username}"
 
 
+# Fields whose changes move ScheduledScrape.next_run_at
+SCHEDULE_FIELDS = {'last_run', 'interval_minutes', 'is_active'}
+
+
 # ✅ Model to schedule scraping jobs based on user preference
 class ScheduledScrape(models.Model):
     user = models.ForeignKey(
@@ -56,10 +84,56 @@ class ScheduledScrape(models.Model):
     is_active = models.BooleanField(default=True)
     # Time of the last successful scrape
     last_run = models.DateTimeField(null=True, blank=True)
+    # Precomputed due time so the dispatcher never does per-row arithmetic
+    next_run_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_run_at'], name='scheduled_scrape_due_idx',
+                         condition=models.Q(is_active=True)),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.coin} every {self.interval_minutes} mins"
 
+    # Remembering the loaded schedule, so saves can tell what changed
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_schedule = {
+            name: value for name, value in zip(field_names, values)
+            if name in SCHEDULE_FIELDS}
+        return instance
+
+    def compute_next_run(self):
+        if self.last_run is None:
+            return timezone.now()
+        return self.last_run + timedelta(minutes=self.interval_minutes)
+
+    def schedule_changed(self):
+        loaded = getattr(self, '_loaded_schedule', None)
+        if self._state.adding or loaded is None:
+            return True
+        changed = {name for name in SCHEDULE_FIELDS
+                   if name in self.__dict__ and self.__dict__[name] != loaded.get(name)}
+        # Switching a schedule off leaves its due time (and any lease) alone
+        if changed == {'is_active'} and not self.is_active:
+            return False
+        return bool(changed)
+
+    # next_run_at only moves with the schedule: other edits of a row leased
+    # by claim_due_scrapes must not make it due again
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if (update_fields is None or SCHEDULE_FIELDS & set(update_fields)) \
+                and self.schedule_changed():
+            self.next_run_at = self.compute_next_run()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'next_run_at'}
+        super().save(*args, **kwargs)
+        self._loaded_schedule = {name: self.__dict__[name] for name in SCHEDULE_FIELDS
+                                 if name in self.__dict__}
+
 
 # ✅ Model to store errors or failures that occured during scraping or API interactions
 class ErrorLog(models.Model):
@@ -71,6 +145,14 @@ class ErrorLog(models.Model):
     timestamp = models.DateTimeField(
         auto_now_add=True)  # When the error occured
 
+    class Meta:
+        indexes = [
+            # (timestamp, id) keyset pages, per user and for staff across users
+            models.Index(fields=['user', 'timestamp', 'id'],
+                         name='errorlog_user_ts_id_idx'),
+            models.Index(fields=['timestamp', 'id'], name='errorlog_ts_id_idx'),
+        ]
+
     def __str__(self):
         return f"Error at {self.timestamp} from {self.source}"
 
@@ -84,6 +166,15 @@ class ExchangeRateSnapshot(models.Model):
     timestamp = models.DateTimeField(
         auto_now_add=True)  # Timestamp of the snapshot
 
+    class Meta:
+        indexes = [
+            # latest-per-pair (DISTINCT ON) and currency_pair history lookups
+            models.Index(fields=['base_currency', 'target_currency', '-timestamp'],
+                         name='rate_pair_ts_idx'),
+            # (timestamp, id) keyset pages of the full list
+            models.Index(fields=['timestamp', 'id'], name='rate_ts_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.base_currency} to {self.target_currency} @ {self.rate}"
 
@@ -110,5 +201,56 @@ class UserActivity(models.Model):
     action = models.CharField(max_length=255)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # (timestamp, id) keyset pages per user
+            models.Index(fields=['user', 'timestamp', 'id'],
+                         name='activity_user_ts_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.action} at {self.timestamp}"
+
+
+# ✅ Model to store OHLC candles rolled up from the raw ScrapeLog ticks
+class PriceCandle(models.Model):
+    RESOLUTIONS = [
+        ('1m', '1 minute'),
+        ('1h', '1 hour'),
+        ('1d', '1 day'),
+    ]
+    resolution = models.CharField(max_length=2, choices=RESOLUTIONS)
+    coin = models.CharField(max_length=20)  # eg BTC, ETH
+    currency = models.CharField(max_length=10, default='USD')
+    bucket = models.DateTimeField()  # Start of the candle's time bucket
+    open = models.DecimalField(max_digits=20, decimal_places=6)
+    high = models.DecimalField(max_digits=20, decimal_places=6)
+    low = models.DecimalField(max_digits=20, decimal_places=6)
+    close = models.DecimalField(max_digits=20, decimal_places=6)
+    count = models.PositiveIntegerField(default=0)  # Ticks folded into the candle
+    # Times of the opening/closing ticks, so late ticks merge correctly
+    open_at = models.DateTimeField()
+    close_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['resolution', 'coin', 'currency', 'bucket'],
+                name='unique_price_candle'),
+        ]
+
+    def __str__(self):
+        return f"{self.coin}/{self.currency} {self.resolution} candle at {self.bucket}"
+
+
+# ✅ Model to remember how far incremental jobs have read (e.g. candle rollups)
+class RollupWatermark(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)  # Last ScrapeLog id processed
+    # [low, high, seen_at] id ranges below last_id that were not visible yet
+    # (rows of transactions still in flight), re-read until they expire
+    gaps = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
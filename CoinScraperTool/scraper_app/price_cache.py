@@ -0,0 +1,100 @@
+import json
+import logging
+from datetime import datetime
+from decimal import Decimal
+
+import redis
+from django.conf import settings
+from django.utils import timezone
+
+from core.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'price:latest'
+# Same precision as ScrapeLog.price so cached and stored prices render alike
+PRICE_QUANTUM = Decimal('0.000001')
+
+
+def cache_key(coin, currency):
+    return f"{KEY_PREFIX}:{coin.upper()}:{currency.upper()}"
+
+
+def cached_timestamp(value):
+    return datetime.fromisoformat(json.loads(value)['timestamp'])
+
+
+# ✅ Write-through of the newest price per (coin, currency)
+def write_latest_prices(ticks):
+    """
+    `ticks` yields (coin, currency, price, timestamp). An entry is only
+    replaced by a tick at least as new, so a slow drain or a backfill from
+    the database never rolls the cache back: the keys are WATCHed, and the
+    check and the writes are retried if another process writes in between.
+    The cache is a best effort layer: a Redis outage is logged and never
+    fails the scrape. Returns the number of entries written.
+    """
+    latest = {}
+    for coin, currency, price, timestamp in ticks:
+        key = cache_key(coin, currency)
+        if key not in latest or timestamp >= latest[key][1]:
+            latest[key] = (price, timestamp)
+    if not latest:
+        return 0
+    keys = list(latest)
+
+    def write_newer(pipe):
+        current = pipe.mget(keys)
+        pipe.multi()
+        written = 0
+        for key, value in zip(keys, current):
+            price, timestamp = latest[key]
+            if value is not None and cached_timestamp(value) > timestamp:
+                continue
+            pipe.set(key, json.dumps({
+                'price': str(Decimal(price).quantize(PRICE_QUANTUM)),
+                'timestamp': timestamp.isoformat(),
+            }), ex=settings.LATEST_PRICE_TTL)
+            written += 1
+        return written
+
+    try:
+        return get_redis().transaction(write_newer, *keys, value_from_callable=True)
+    except redis.RedisError as exc:
+        logger.warning("Latest price cache write failed: %s", exc)
+        return 0
+
+
+# ✅ Reading many latest prices in one MGET round trip
+def read_latest_prices(pairs):
+    """
+    Returns {(coin, currency): entry or None}. Entries carry the price, its
+    timestamp, its age and a `stale` flag once older than
+    LATEST_PRICE_STALE_SECONDS.
+    """
+    pairs = [(coin.upper(), currency.upper()) for coin, currency in pairs]
+    if not pairs:
+        return {}
+    try:
+        values = get_redis().mget([cache_key(*pair) for pair in pairs])
+    except redis.RedisError as exc:
+        logger.warning("Latest price cache read failed: %s", exc)
+        values = [None] * len(pairs)
+
+    now = timezone.now()
+    entries = {}
+    for pair, value in zip(pairs, values):
+        if value is None:
+            entries[pair] = None
+            continue
+        payload = json.loads(value)
+        timestamp = datetime.fromisoformat(payload['timestamp'])
+        age = (now - timestamp).total_seconds()
+        entries[pair] = {
+            'price': Decimal(payload['price']),
+            'timestamp': timestamp,
+            'age_seconds': round(age, 3),
+            'stale': age > settings.LATEST_PRICE_STALE_SECONDS,
+        }
+    return entries
@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+from decimal import Decimal
+
+import redis
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from core.redis_client import get_redis
+from .models import ExchangeRateSnapshot
+
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'rates:version'
+
+
+# ✅ One query returning the newest snapshot of every currency pair
+def latest_snapshots_queryset():
+    if connection.features.can_distinct_on_fields:
+        # PostgreSQL: DISTINCT ON walks the (base, target, -timestamp) index
+        return ExchangeRateSnapshot.objects.order_by(
+            'base_currency', 'target_currency', '-timestamp', '-id'
+        ).distinct('base_currency', 'target_currency')
+
+    return ExchangeRateSnapshot.objects.annotate(
+        pair_rank=Window(
+            RowNumber(),
+            partition_by=[F('base_currency'), F('target_currency')],
+            order_by=[F('timestamp').desc(), F('id').desc()],
+        )
+    ).filter(pair_rank=1).order_by('base_currency', 'target_currency')
+
+
+# Bumped whenever snapshots are written so matrices know to reload
+def bump_rates_version():
+    try:
+        get_redis().incr(VERSION_KEY)
+    except redis.RedisError as exc:
+        logger.warning("Could not bump exchange rate version: %s", exc)
+
+
+def current_rates_version():
+    try:
+        return get_redis().get(VERSION_KEY)
+    except redis.RedisError as exc:
+        logger.warning("Could not read exchange rate version: %s", exc)
+        return None
+
+
+# ✅ Process-local matrix of the latest rate for every currency pair
+class RateMatrix:
+    """
+    Holds the latest snapshot per pair (plus derived inverse rates) in
+    memory. It checks the shared version counter at most once every
+    RATE_MATRIX_CHECK_SECONDS and reloads from the database only when a
+    newer snapshot has been written; every other lookup is a dict access.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.version = None
+        self.checked_at = None
+        self.snapshots = []
+        self.rates = {}
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if (not force and self.checked_at is not None
+                and now - self.checked_at < settings.RATE_MATRIX_CHECK_SECONDS):
+            return False
+
+        with self._lock:
+            self.checked_at = now
+            version = current_rates_version()
+            # An unknown version (no counter yet, Redis down) always reloads
+            if not force and version is not None and version == self.version:
+                return False
+            self.load(list(latest_snapshots_queryset()), version)
+            return True
+
+    def load(self, snapshots, version=None):
+        rates = {}
+        for snapshot in snapshots:
+            if snapshot.rate:
+                rates[(snapshot.target_currency, snapshot.base_currency)] = (
+                    Decimal(1) / snapshot.rate)
+        # Quoted pairs take precedence over derived inverses
+        for snapshot in snapshots:
+            rates[(snapshot.base_currency, snapshot.target_currency)] = snapshot.rate
+
+        self.snapshots, self.rates, self.version = snapshots, rates, version
+
+    def latest_snapshots(self):
+        self.refresh()
+        return self.snapshots
+
+    def rate(self, base, target):
+        self.refresh()
+        base, target = base.upper(), target.upper()
+        if base == target:
+            return Decimal(1)
+        return self.rates.get((base, target))
+
+    def convert(self, amount, base, target):
+        rate = self.rate(base, target)
+        return None if rate is None else Decimal(amount) * rate
+
+
+rate_matrix = RateMatrix()
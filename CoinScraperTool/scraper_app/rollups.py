@@ -0,0 +1,188 @@
+import logging
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from core.redis_client import get_redis
+from .models import ScrapeLog, PriceCandle, RollupWatermark
+
+
+logger = logging.getLogger(__name__)
+
+# Bucket widths in seconds, keyed by the PriceCandle.resolution value
+RESOLUTIONS = {'1m': 60, '1h': 3600, '1d': 86400}
+WATERMARK = 'price_candles'
+CANDLE_FIELDS = ['open', 'high', 'low', 'close', 'count', 'open_at', 'close_at']
+
+
+def version_key(coin, currency):
+    return f"candles:version:{coin}:{currency}"
+
+
+# Bumped per (coin, currency) whenever its candles change, so results
+# derived from them (e.g. analytics) know when to recompute
+def bump_candle_versions(pairs):
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for coin, currency in pairs:
+            pipe.incr(version_key(coin, currency))
+        pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Could not bump candle versions: %s", exc)
+
+
+def candle_versions(pairs):
+    try:
+        return get_redis().mget([version_key(*pair) for pair in pairs])
+    except redis.RedisError as exc:
+        logger.warning("Could not read candle versions: %s", exc)
+        return [None] * len(pairs)
+
+
+def bucket_start(timestamp, resolution):
+    step = RESOLUTIONS[resolution]
+    epoch = int(timestamp.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % step, tz=dt_timezone.utc)
+
+
+def fold_tick(candle, price, timestamp):
+    if timestamp < candle.open_at:
+        candle.open, candle.open_at = price, timestamp
+    if timestamp >= candle.close_at:
+        candle.close, candle.close_at = price, timestamp
+    candle.high = max(candle.high, price)
+    candle.low = min(candle.low, price)
+    candle.count += 1
+
+
+def merge_candle(candle, other):
+    if other.open_at < candle.open_at:
+        candle.open, candle.open_at = other.open, other.open_at
+    if other.close_at >= candle.close_at:
+        candle.close, candle.close_at = other.close, other.close_at
+    candle.high = max(candle.high, other.high)
+    candle.low = min(candle.low, other.low)
+    candle.count += other.count
+
+
+# ✅ Folding raw (coin, currency, price, timestamp) ticks into in-memory candles
+def aggregate_ticks(ticks):
+    candles = {}
+    for coin, currency, price, timestamp in ticks:
+        for resolution in RESOLUTIONS:
+            key = (resolution, coin, currency,
+                   bucket_start(timestamp, resolution))
+            candle = candles.get(key)
+            if candle is None:
+                candles[key] = PriceCandle(
+                    resolution=resolution, coin=coin, currency=currency,
+                    bucket=key[3], open=price, high=price, low=price,
+                    close=price, count=1, open_at=timestamp, close_at=timestamp)
+            else:
+                fold_tick(candle, price, timestamp)
+    return candles
+
+
+# The parts of the [low, high, seen_at] id ranges not covered by sorted `ids`
+def remaining_gaps(gaps, ids):
+    remaining = []
+    for low, high, seen_at in gaps:
+        for found in ids[bisect_left(ids, low):bisect_right(ids, high)]:
+            if found > low:
+                remaining.append([low, found - 1, seen_at])
+            low = found + 1
+        if low <= high:
+            remaining.append([low, high, seen_at])
+    return remaining
+
+
+# ✅ Merging fresh candles into stored ones, touching only changed buckets
+def merge_candles(fresh):
+    buckets_by_series = defaultdict(list)
+    for resolution, coin, currency, bucket in fresh:
+        buckets_by_series[(resolution, coin, currency)].append(bucket)
+
+    existing = {}
+    for (resolution, coin, currency), buckets in buckets_by_series.items():
+        for candle in PriceCandle.objects.filter(
+                resolution=resolution, coin=coin, currency=currency,
+                bucket__in=buckets):
+            existing[(resolution, coin, currency, candle.bucket)] = candle
+
+    to_create, to_update = [], []
+    for key, candle in fresh.items():
+        stored = existing.get(key)
+        if stored is None:
+            to_create.append(candle)
+        else:
+            merge_candle(stored, candle)
+            to_update.append(stored)
+
+    PriceCandle.objects.bulk_create(to_create, batch_size=1000)
+    PriceCandle.objects.bulk_update(to_update, CANDLE_FIELDS, batch_size=1000)
+    return len(to_create), len(to_update)
+
+
+def update_candles(batch_size=None, max_batches=None):
+    """
+    Reads ScrapeLog ticks past the stored id watermark in batches and folds
+    the market ones into 1m/1h/1d candles. Each batch commits together with
+    its watermark, and the watermark row is locked so concurrent runs queue
+    up instead of double counting.
+
+    Ids are handed out before commit, so with concurrent writers a lower id
+    can become visible after a higher one was rolled up. Every id skipped
+    on the way is kept as a gap and read again on later runs until it shows
+    up or CANDLE_ROLLUP_GAP_SECONDS pass (rolled back or deleted rows never
+    will); each row is still folded exactly once.
+    """
+    batch_size = batch_size or settings.CANDLE_ROLLUP_BATCH_SIZE
+    max_batches = max_batches or settings.CANDLE_ROLLUP_MAX_BATCHES
+    RollupWatermark.objects.get_or_create(name=WATERMARK)
+
+    processed = created = updated = 0
+    for _ in range(max_batches):
+        with transaction.atomic():
+            watermark = RollupWatermark.objects.select_for_update().get(
+                name=WATERMARK)
+            now = time.time()
+            gaps = [gap for gap in watermark.gaps
+                    if gap[2] > now - settings.CANDLE_ROLLUP_GAP_SECONDS]
+            unseen = Q(id__gt=watermark.last_id)
+            for low, high, _ in gaps:
+                unseen |= Q(id__range=(low, high))
+            # Fan-out copies are read too, or their ids would look like gaps
+            rows = list(
+                ScrapeLog.objects.filter(unseen)
+                .order_by('id')
+                .values_list('id', 'is_market_tick', 'coin', 'currency',
+                             'price', 'timestamp')
+                [:batch_size]
+            )
+            if not rows:
+                break
+
+            ids = [row[0] for row in rows]
+            if ids[-1] > watermark.last_id:
+                gaps.append([watermark.last_id + 1, ids[-1], now])
+                watermark.last_id = ids[-1]
+            watermark.gaps = remaining_gaps(gaps, ids)
+            ticks = [row[2:] for row in rows if row[1]]
+            new, changed = merge_candles(aggregate_ticks(ticks))
+            watermark.save(update_fields=['last_id', 'gaps', 'updated_at'])
+
+        bump_candle_versions({(tick[0], tick[1]) for tick in ticks})
+
+        processed += len(ticks)
+        created += new
+        updated += changed
+
+    logger.info("Rolled up %s ticks into %s new and %s updated candles",
+                processed, created, updated)
+    return processed, created, updated
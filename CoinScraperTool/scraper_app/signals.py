@@ -0,0 +1,43 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .alerts import index_preference, subscription
+from .models import CoinComparison, ErrorLog, ExchangeRateSnapshot, UserActivity, UserPreference
+from .rates import bump_rates_version
+from .user_versions import bump_user_versions
+
+
+# ✅ Telling every process's rate matrix that a newer snapshot exists
+@receiver(post_save, sender=ExchangeRateSnapshot)
+@receiver(post_delete, sender=ExchangeRateSnapshot)
+def exchange_rate_changed(sender, **kwargs):
+    # Only once committed: a matrix reloading earlier would cache the old
+    # rates under the new version
+    transaction.on_commit(bump_rates_version)
+
+
+# ✅ Keeping the coin -> subscribers alert index in step with preferences
+# once committed, so a rolled back save or delete leaves the index alone
+@receiver(post_save, sender=UserPreference)
+def preference_saved(sender, instance, **kwargs):
+    pk, watched = instance.pk, subscription(instance)
+    transaction.on_commit(lambda: index_preference(pk, watched))
+
+
+@receiver(post_delete, sender=UserPreference)
+def preference_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: index_preference(pk))
+
+
+# ✅ Moving cached per-user responses on whenever the rows behind them change
+@receiver(post_save, sender=UserActivity)
+@receiver(post_delete, sender=UserActivity)
+@receiver(post_save, sender=ErrorLog)
+@receiver(post_delete, sender=ErrorLog)
+@receiver(post_save, sender=CoinComparison)
+@receiver(post_delete, sender=CoinComparison)
+def user_rows_changed(sender, instance, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(lambda: bump_user_versions(sender, [user_id]))
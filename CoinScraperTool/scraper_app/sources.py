@@ -0,0 +1,166 @@
+import hashlib
+from collections import namedtuple
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+
+
+# ✅ A single price observation returned by a source adapter
+Quote = namedtuple('Quote', ['coin', 'currency', 'price', 'fetched_at'])
+
+# ✅ A single exchange rate observation returned by a source adapter
+RateQuote = namedtuple(
+    'RateQuote', ['base_currency', 'target_currency', 'rate', 'fetched_at'])
+
+
+class SourceError(Exception):
+    """
+    Raised by an adapter when the upstream answered but the payload is unusable
+    """
+
+
+# ✅ Base class every source adapter extends
+class BaseSource:
+    """
+    Adapters translate one *batch* of symbols into one upstream request.
+    `max_batch` tells the engine how many coins (or target currencies) the
+    upstream accepts in a single call.
+    """
+    name = 'base'
+    max_batch = 1
+
+    async def fetch_prices(self, client, coins, currencies):
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not provide coin prices")
+
+    async def fetch_rates(self, client, base, targets):
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not provide exchange rates")
+
+
+# ✅ CoinGecko's public price API (many ids x many currencies per request)
+class CoinGeckoSource(BaseSource):
+    name = 'CoinGecko'
+    max_batch = 100
+    url = 'https://api.coingecko.com/api/v3/simple/price'
+
+    # CoinGecko identifies coins by slug rather than ticker symbol
+    default_ids = {
+        'BTC': 'bitcoin',
+        'ETH': 'ethereum',
+        'USDT': 'tether',
+        'BNB': 'binancecoin',
+        'SOL': 'solana',
+        'XRP': 'ripple',
+        'USDC': 'usd-coin',
+        'ADA': 'cardano',
+        'DOGE': 'dogecoin',
+        'TRX': 'tron',
+        'DOT': 'polkadot',
+        'LTC': 'litecoin',
+        'AVAX': 'avalanche-2',
+        'LINK': 'chainlink',
+        'MATIC': 'matic-network',
+    }
+
+    def __init__(self, ids=None):
+        self.ids = {**self.default_ids,
+                    **getattr(settings, 'SCRAPER_COINGECKO_IDS', {}),
+                    **(ids or {})}
+
+    async def fetch_prices(self, client, coins, currencies):
+        ids = {self.ids.get(coin, coin.lower()): coin for coin in coins}
+        response = await client.get(self.url, params={
+            'ids': ','.join(ids),
+            'vs_currencies': ','.join(c.lower() for c in currencies),
+        })
+        response.raise_for_status()
+        payload = response.json(parse_float=Decimal)
+
+        fetched_at = timezone.now()
+        quotes = []
+        for coin_id, prices in payload.items():
+            coin = ids.get(coin_id)
+            if coin is None:
+                continue
+            for currency, price in prices.items():
+                quotes.append(Quote(coin, currency.upper(),
+                              Decimal(price), fetched_at))
+        return quotes
+
+
+# ✅ openexchangerates.org latest rates (one base, many targets per request)
+class OpenExchangeRatesSource(BaseSource):
+    name = 'openExchange'
+    max_batch = 200
+    url = 'https://openexchangerates.org/api/latest.json'
+
+    def __init__(self, app_id=None):
+        self.app_id = app_id or getattr(settings, 'OPEN_EXCHANGE_APP_ID', '')
+
+    async def fetch_rates(self, client, base, targets):
+        response = await client.get(self.url, params={
+            'app_id': self.app_id,
+            'base': base,
+            'symbols': ','.join(targets),
+        })
+        response.raise_for_status()
+        payload = response.json(parse_float=Decimal)
+        if 'rates' not in payload:
+            raise SourceError(payload.get('description', 'No rates returned'))
+
+        fetched_at = timezone.now()
+        return [
+            RateQuote(base, target.upper(), Decimal(rate), fetched_at)
+            for target, rate in payload['rates'].items()
+        ]
+
+
+# ✅ Local, network-free source used by tests and offline development
+class StubSource(BaseSource):
+    """
+    Returns deterministic prices without touching the network. Every call is
+    recorded in `calls` so tests can assert how requests were batched.
+    """
+    name = 'stub'
+    max_batch = 50
+
+    def __init__(self, prices=None, rates=None, max_batch=None, fail_on=()):
+        self.prices = prices or {}
+        self.rates = rates or {}
+        if max_batch:
+            self.max_batch = max_batch
+        self.fail_on = {coin.upper() for coin in fail_on}
+        self.calls = []
+
+    @staticmethod
+    def _synthetic(*parts):
+        digest = hashlib.sha256(':'.join(parts).encode()).hexdigest()
+        return (Decimal(int(digest[:8], 16) % 100000) / 100) + 1
+
+    async def fetch_prices(self, client, coins, currencies):
+        self.calls.append(('prices', tuple(coins), tuple(currencies)))
+        failing = self.fail_on.intersection(coins)
+        if failing:
+            raise SourceError(f"Stub failure for {', '.join(sorted(failing))}")
+
+        fetched_at = timezone.now()
+        return [
+            Quote(coin, currency,
+                  self.prices.get((coin, currency),
+                                  self._synthetic(coin, currency)),
+                  fetched_at)
+            for coin in coins for currency in currencies
+        ]
+
+    async def fetch_rates(self, client, base, targets):
+        self.calls.append(('rates', base, tuple(targets)))
+        fetched_at = timezone.now()
+        return [
+            RateQuote(base, target,
+                      self.rates.get((base, target),
+                                     self._synthetic(base, target)),
+                      fetched_at)
+            for target in targets
+        ]
@@ -0,0 +1,38 @@
+import math
+
+import numpy as np
+
+
+SECONDS_PER_YEAR = 365 * 86400
+
+# Rough starting prices so seeded data looks like the real market
+START_PRICES = {
+    'BTC': 60000, 'ETH': 3000, 'SOL': 150, 'ADA': 0.45, 'XRP': 0.55,
+    'DOGE': 0.12, 'DOT': 7, 'LTC': 80, 'AVAX': 35, 'LINK': 15,
+}
+START_RATES = {'EUR': 0.92, 'GBP': 0.79, 'KES': 129, 'JPY': 150}
+
+
+def coin_symbols(count):
+    symbols = list(START_PRICES)[:count]
+    return symbols + [f'SYN{i}' for i in range(len(symbols), count)]
+
+
+# ✅ Deterministic geometric Brownian motion paths sharing a market factor
+def gbm_paths(starts, steps, step_seconds, seed=42, drift=0.05,
+              volatility=0.6, correlation=0.5):
+    """
+    Returns a (steps x len(starts)) array. Each column follows
+    S(t+dt) = S(t) * exp((mu - sigma^2 / 2) dt + sigma sqrt(dt) Z), where Z
+    mixes one common shock with the column's own so that every pair of
+    columns has log-return correlation `correlation`. The same arguments
+    always give the same paths.
+    """
+    rng = np.random.default_rng(seed)
+    dt = step_seconds / SECONDS_PER_YEAR
+    market = rng.standard_normal((steps - 1, 1))
+    own = rng.standard_normal((steps - 1, len(starts)))
+    shocks = math.sqrt(correlation) * market + math.sqrt(1 - correlation) * own
+    increments = (drift - volatility ** 2 / 2) * dt + volatility * math.sqrt(dt) * shocks
+    log_paths = np.vstack([np.zeros((1, len(starts))), np.cumsum(increments, axis=0)])
+    return np.asarray(starts, dtype=np.float64) * np.exp(log_paths)
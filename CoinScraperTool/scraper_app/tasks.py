@@ -0,0 +1,74 @@
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from users.mailer import MailQueue
+from .dispatcher import drain_due_scrapes
+from .engine import ScrapeEngine, save_price_logs, save_rate_snapshots, save_errors
+from .rollups import update_candles
+
+
+# ✅ Scraping a user's coins in all requested currencies in one engine run
+@shared_task
+def scrape_coin_prices(user_id, coins, currencies=None):
+    pairs = [(coin, currency)
+             for coin in coins for currency in (currencies or ['USD'])]
+    result = ScrapeEngine().scrape_prices(pairs)
+
+    save_price_logs(result.quotes.values(), [user_id])
+    save_errors(result.errors, user_id=user_id)
+    return f"💰 Scraped {len(result.quotes)}/{len(pairs)} prices with {len(result.errors)} failed batches."
+
+
+# ✅ Refreshing exchange rate snapshots for the configured currency pairs
+@shared_task
+def refresh_exchange_rates(base=None, targets=None):
+    base = base or settings.SCRAPER_RATE_BASE
+    pairs = [(base, target)
+             for target in (targets or settings.SCRAPER_RATE_TARGETS)]
+    result = ScrapeEngine().scrape_rates(pairs)
+
+    save_rate_snapshots(result.quotes.values())
+    save_errors(result.errors)
+    return f"💱 Stored {len(result.quotes)}/{len(pairs)} exchange rates with {len(result.errors)} failed batches."
+
+
+# ✅ Beat-driven tick fanning out to parallel scrape workers
+@shared_task
+def dispatch_scheduled_scrapes():
+    for _ in range(settings.SCRAPER_DISPATCH_WORKERS):
+        drain_scheduled_scrapes.delay()
+    return f"⏱️ Started {settings.SCRAPER_DISPATCH_WORKERS} scrape workers."
+
+
+# ✅ One worker claiming and coalescing due scrapes until none are left
+@shared_task
+def drain_scheduled_scrapes():
+    result = drain_due_scrapes(timezone.now())
+    return f"⏱️ {result.due} due scrapes coalesced into {result.pairs} pairs, {result.logs} logs written."
+
+
+# ✅ Incrementally folding new ticks into the 1m/1h/1d candle tables
+@shared_task
+def roll_up_price_candles():
+    processed, created, updated = update_candles()
+    return f"🕯️ Rolled up {processed} ticks: {created} new and {updated} updated candles."
+
+
+# ✅ Queueing emails for a batch of fired price alerts
+@shared_task
+def send_price_alerts(alerts):
+    users = get_user_model().objects.in_bulk({alert['user_id'] for alert in alerts})
+    queued = 0
+    with MailQueue() as queue:
+        for alert in alerts:
+            user = users.get(alert['user_id'])
+            if user is None or not user.email:
+                continue
+            queue.add(user.email,
+                      f"{alert['coin']} moved {alert['change']:+.2f}% 🔔",
+                      "emails/price_alert.txt", "emails/price_alert.html",
+                      {**alert, 'username': user.username})
+            queued += 1
+    return f"🔔 Queued {queued}/{len(alerts)} price alerts."
@@ -1,3 +1,652 @@
-from django.test import TestCase
+import asyncio
+import json
+from io import StringIO
+from unittest import mock
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+import httpx
+import numpy as np
+from django.core import mail
+from django.core.management import call_command
+from django.conf import settings
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .alerts import evaluate_alerts, watchers_key
+from .analytics import compare_pair, AnalyticsError
+from .conversion import CurrencyGraph, ConversionError, conversion_factors
+from .downsampling import downsample_queryset, lttb_indices
+from .dispatcher import (
+    due_scrapes, dispatch_due_scrapes, claim_due_scrapes, drain_due_scrapes)
+from .engine import ScrapeEngine, fan_out_price_logs, save_rate_snapshots
+from core.redis_client import get_redis
+from core.testing import make_user
+from .models import (
+    ScrapeLog, ExchangeRateSnapshot, ErrorLog, ScheduledScrape, PriceCandle,
+    UserPreference, UserActivity, RollupWatermark)
+from .price_cache import cache_key, read_latest_prices, write_latest_prices
+from .rates import current_rates_version, rate_matrix
+from .rollups import bucket_start, bump_candle_versions, candle_versions, update_candles
+from .sources import CoinGeckoSource, Quote, RateQuote, StubSource
+from .synthetic import gbm_paths
+from .tasks import scrape_coin_prices, refresh_exchange_rates
+
+
+STUB_SOURCES = dict(
+    SCRAPER_PRICE_SOURCE='scraper_app.sources.StubSource',
+    SCRAPER_RATE_SOURCE='scraper_app.sources.StubSource',
+    REDIS_URL='memory://',
+)
+
+
+class ScrapeEngineTests(TestCase):
+
+    def test_pairs_are_batched_per_source_limit(self):
+        source = StubSource(max_batch=2)
+        engine = ScrapeEngine(price_source=source, rate_source=StubSource())
+        pairs = [(coin, 'usd') for coin in ['btc', 'eth', 'sol', 'ada', 'xrp']]
+
+        result = engine.scrape_prices(pairs)
+
+        self.assertEqual(len(result.quotes), 5)
+        self.assertEqual(len(source.calls), 3)
+        self.assertIn(('BTC', 'USD'), result.quotes)
+
+    def test_failed_batch_is_reported_without_losing_others(self):
+        source = StubSource(max_batch=1, fail_on=['ETH'])
+        engine = ScrapeEngine(price_source=source, rate_source=StubSource())
+
+        result = engine.scrape_prices([('BTC', 'USD'), ('ETH', 'USD')])
+
+        self.assertEqual(list(result.quotes), [('BTC', 'USD')])
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(result.errors[0][0], 'stub')
+
+    def test_coingecko_adapter_requests_many_ids_at_once(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.params)
+            return httpx.Response(200, content=json.dumps({
+                'bitcoin': {'usd': 65000.5, 'eur': 60000.25},
+                'ethereum': {'usd': 3200.1, 'eur': 2950.75},
+            }))
+
+        engine = ScrapeEngine(price_source=CoinGeckoSource(),
+                              rate_source=StubSource(),
+                              transport=httpx.MockTransport(handler))
+        result = asyncio.run(engine.fetch_prices(
+            [('BTC', 'USD'), ('BTC', 'EUR'), ('ETH', 'USD'), ('ETH', 'EUR')]))
+
+        self.assertEqual(len(seen), 1)
+        self.assertEqual(seen[0]['ids'], 'bitcoin,ethereum')
+        self.assertEqual(result.quotes[('BTC', 'USD')].price,
+                         Decimal('65000.5'))
+
+
+@override_settings(**STUB_SOURCES)
+class ScrapeTaskTests(TestCase):
+
+    def test_scrape_coin_prices_bulk_creates_logs(self):
+        user = make_user()
+
+        scrape_coin_prices(user.id, ['BTC', 'ETH'], ['USD', 'EUR'])
+
+        self.assertEqual(ScrapeLog.objects.filter(user=user).count(), 4)
+        self.assertFalse(ErrorLog.objects.exists())
+
+    def test_refresh_exchange_rates_stores_snapshots(self):
+        refresh_exchange_rates('USD', ['EUR', 'KES'])
+
+        self.assertEqual(
+            set(ExchangeRateSnapshot.objects.values_list(
+                'base_currency', 'target_currency')),
+            {('USD', 'EUR'), ('USD', 'KES')})
+
+
+@override_settings(REDIS_URL='memory://')
+class DispatcherTests(TestCase):
+
+    def setUp(self):
+        self.source = StubSource()
+        self.engine = ScrapeEngine(price_source=self.source,
+                                   rate_source=StubSource())
+        self.users = [make_user(f'user{i}') for i in range(5)]
+
+    def test_subscribers_of_one_pair_share_one_fetch(self):
+        for user in self.users:
+            ScheduledScrape.objects.create(
+                user=user, coin='btc', currency='usd', interval_minutes=5)
+        ScheduledScrape.objects.create(
+            user=self.users[0], coin='ETH', currency='USD', interval_minutes=5)
+        now = timezone.now()
+
+        result = dispatch_due_scrapes(due_scrapes(now), now=now,
+                                      engine=self.engine)
+
+        self.assertEqual((result.due, result.pairs, result.logs), (6, 2, 6))
+        self.assertEqual(len(self.source.calls), 1)
+        self.assertEqual(
+            ScrapeLog.objects.filter(coin='BTC').count(), len(self.users))
+        self.assertFalse(
+            ScheduledScrape.objects.exclude(last_run=now).exists())
+
+    def test_only_due_rows_are_dispatched(self):
+        now = timezone.now()
+        ScheduledScrape.objects.create(
+            user=self.users[0], coin='BTC', interval_minutes=5,
+            last_run=now - timedelta(minutes=10))
+        ScheduledScrape.objects.create(
+            user=self.users[1], coin='BTC', interval_minutes=60,
+            last_run=now - timedelta(minutes=10))
+        ScheduledScrape.objects.create(
+            user=self.users[2], coin='BTC', is_active=False)
+
+        self.assertEqual(
+            [scrape.user_id for scrape in due_scrapes(now)], [self.users[0].id])
+
+    def test_failed_pairs_keep_their_last_run(self):
+        self.source.fail_on = {'ETH'}
+        self.source.max_batch = 1
+        for coin in ['BTC', 'ETH']:
+            ScheduledScrape.objects.create(user=self.users[0], coin=coin)
+        now = timezone.now()
+
+        dispatch_due_scrapes(due_scrapes(now), now=now, engine=self.engine)
+
+        self.assertIsNone(ScheduledScrape.objects.get(coin='ETH').last_run)
+        self.assertEqual(ErrorLog.objects.count(), 1)
+
+
+@override_settings(REDIS_URL='memory://')
+class ClaimTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user()
+        self.past = timezone.now() - timedelta(hours=2)
+        for coin in ['BTC', 'ETH', 'SOL']:
+            ScheduledScrape.objects.create(
+                user=self.user, coin=coin, interval_minutes=30,
+                last_run=self.past)
+
+    def test_next_run_at_is_precomputed_on_save(self):
+        scrape = ScheduledScrape.objects.get(coin='BTC')
+
+        self.assertEqual(scrape.next_run_at, self.past + timedelta(minutes=30))
+
+    def test_claimed_rows_are_not_claimed_again(self):
+        now = timezone.now()
+
+        first = claim_due_scrapes(now, batch_size=2)
+        second = claim_due_scrapes(now, batch_size=2)
+        third = claim_due_scrapes(now, batch_size=2)
+
+        self.assertEqual((len(first), len(second), len(third)), (2, 1, 0))
+        self.assertFalse({s.pk for s in first} & {s.pk for s in second})
+
+    def test_edits_of_a_leased_row_keep_the_lease(self):
+        now = timezone.now()
+        claim_due_scrapes(now, batch_size=3)
+        scrape = ScheduledScrape.objects.get(coin='BTC')
+        leased = scrape.next_run_at
+
+        scrape.currency = 'EUR'
+        scrape.save()
+        scrape.is_active = False
+        scrape.save()
+        self.assertEqual(ScheduledScrape.objects.get(pk=scrape.pk).next_run_at, leased)
+        self.assertEqual(claim_due_scrapes(now), [])
+
+        scrape.interval_minutes = 60
+        scrape.save(update_fields=['interval_minutes'])
+        self.assertEqual(ScheduledScrape.objects.get(pk=scrape.pk).next_run_at,
+                         self.past + timedelta(minutes=60))
+
+    def test_drain_reschedules_from_interval(self):
+        engine = ScrapeEngine(price_source=StubSource(),
+                              rate_source=StubSource())
+        now = timezone.now()
+
+        result = drain_due_scrapes(now, engine=engine)
+
+        self.assertEqual((result.due, result.logs), (3, 3))
+        self.assertEqual(
+            set(ScheduledScrape.objects.values_list('next_run_at', flat=True)),
+            {now + timedelta(minutes=30)})
+        self.assertEqual(due_scrapes(now), [])
+
+
+@override_settings(REDIS_URL='memory://')
+class CandleRollupTests(TestCase):
+
+    def setUp(self):
+        get_redis().flushdb()
+        self.users = [make_user(f'user{i}') for i in range(2)]
+        self.start = timezone.now().replace(
+            hour=10, minute=0, second=0, microsecond=0)
+
+    def tick(self, minute, second, price, user=None, **fields):
+        return ScrapeLog.objects.create(
+            user=user or self.users[0], coin='BTC', price=price,
+            timestamp=self.start + timedelta(minutes=minute, seconds=second),
+            **fields)
+
+    def test_minute_and_hour_candles(self):
+        self.tick(0, 10, '100')
+        self.tick(0, 50, '90')
+        self.tick(0, 30, '120')
+        self.tick(5, 0, '110')
+
+        update_candles()
+
+        first = PriceCandle.objects.get(resolution='1m', bucket=self.start)
+        self.assertEqual((first.open, first.high, first.low, first.close,
+                          first.count), (100, 120, 90, 90, 3))
+        hour = PriceCandle.objects.get(resolution='1h', bucket=self.start)
+        self.assertEqual((hour.open, hour.close, hour.count), (100, 110, 4))
+
+    def test_incremental_runs_only_fold_new_ticks(self):
+        self.tick(0, 10, '100')
+        update_candles()
+        # A late tick for the same minute plus a fan-out duplicate
+        self.tick(0, 5, '95')
+        self.tick(0, 5, '95', user=self.users[1], is_market_tick=False)
+
+        processed, created, updated = update_candles()
+
+        candle = PriceCandle.objects.get(resolution='1m', bucket=self.start)
+        self.assertEqual((processed, created, updated), (1, 0, 3))
+        self.assertEqual((candle.open, candle.close, candle.count),
+                         (95, 100, 2))
+        self.assertEqual(update_candles(), (0, 0, 0))
+
+    def test_fan_out_copies_count_once_across_batches(self):
+        quote = Quote('BTC', 'USD', Decimal('100'), self.start)
+        fan_out_price_logs([quote], {('BTC', 'USD'): [user.id for user in self.users]})
+
+        self.assertEqual(update_candles(batch_size=1), (1, 3, 0))
+        candle = PriceCandle.objects.get(resolution='1m', bucket=self.start)
+        self.assertEqual(candle.count, 1)
+
+    def test_rows_committed_late_are_folded_once(self):
+        self.tick(0, 10, '100')
+        late = self.tick(0, 20, '105')
+        self.tick(0, 30, '110')
+        # The middle row's transaction has not committed when the rollup runs
+        late_id = late.id
+        late.delete()
+        self.assertEqual(update_candles()[0], 2)
+        ScrapeLog.objects.create(id=late_id, user=self.users[0], coin='BTC',
+                                 price='105', timestamp=late.timestamp)
+
+        self.assertEqual(update_candles()[0], 1)
+        self.assertEqual(update_candles(), (0, 0, 0))
+        candle = PriceCandle.objects.get(resolution='1m', bucket=self.start)
+        self.assertEqual((candle.count, candle.high), (3, 110))
+        self.assertEqual(RollupWatermark.objects.get().gaps, [])
+
+    @override_settings(CANDLE_ROLLUP_GAP_SECONDS=0)
+    def test_gaps_of_rolled_back_rows_expire(self):
+        self.tick(0, 10, '100')
+        self.tick(0, 20, '105').delete()
+        self.tick(0, 30, '110')
+        update_candles()
+
+        self.assertEqual(update_candles(), (0, 0, 0))
+
+    def test_rollups_bump_candle_versions(self):
+        self.tick(0, 10, '100')
+        update_candles()
+        first = candle_versions([('BTC', 'USD'), ('ETH', 'USD')])
+        self.tick(1, 0, '101')
+        update_candles()
+
+        self.assertEqual(first, ['1', None])
+        self.assertEqual(candle_versions([('BTC', 'USD')]), ['2'])
+
+
+@override_settings(REDIS_URL='memory://')
+class LegacyScrapeLogMigrationTests(TransactionTestCase):
+    before = [('scraper_app', '0007_keyset_pagination_indexes')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_rows_posted_before_the_flag_never_become_candles(self):
+        get_redis().flushdb()
+        old = self.migrate(self.before)
+        user = old.get_model(settings.AUTH_USER_MODEL).objects.create(
+            username='legacy', email='legacy@example.com')
+        old.get_model('scraper_app', 'ScrapeLog').objects.create(
+            user_id=user.id, coin='BTC', price='1.00', timestamp=timezone.now())
+
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+        log = ScrapeLog.objects.get()
+        self.assertEqual((log.is_manual, log.is_market_tick), (True, False))
+        self.assertEqual(update_candles()[0], 0)
+        self.assertFalse(PriceCandle.objects.exists())
+
+
+@override_settings(REDIS_URL='memory://', LATEST_PRICE_STALE_SECONDS=60)
+class LatestPriceCacheTests(TestCase):
+
+    def setUp(self):
+        get_redis().flushdb()
+
+    @override_settings(**STUB_SOURCES)
+    def test_scrapes_write_through(self):
+        scrape_coin_prices(make_user().id, ['BTC'], ['USD'])
+
+        entry = read_latest_prices([('btc', 'usd')])[('BTC', 'USD')]
+        self.assertEqual(entry['price'], ScrapeLog.objects.get().price)
+        self.assertFalse(entry['stale'])
+
+    def test_newest_tick_wins_and_old_entries_are_flagged_stale(self):
+        now = timezone.now()
+        write_latest_prices([
+            ('ETH', 'USD', Decimal('3000'), now - timedelta(minutes=10)),
+            ('ETH', 'USD', Decimal('2900'), now - timedelta(minutes=20)),
+        ])
+
+        entries = read_latest_prices([('ETH', 'USD'), ('SOL', 'USD')])
+
+        self.assertEqual(entries[('ETH', 'USD')]['price'], Decimal('3000'))
+        self.assertTrue(entries[('ETH', 'USD')]['stale'])
+        self.assertIsNone(entries[('SOL', 'USD')])
+
+    def test_older_ticks_never_replace_newer_entries(self):
+        now = timezone.now()
+        write_latest_prices([('ETH', 'USD', Decimal('3000'), now)])
+
+        written = write_latest_prices([
+            ('ETH', 'USD', Decimal('2900'), now - timedelta(minutes=5)),
+            ('BTC', 'USD', Decimal('65000'), now - timedelta(minutes=5)),
+        ])
+
+        entries = read_latest_prices([('ETH', 'USD'), ('BTC', 'USD')])
+        self.assertEqual(written, 1)
+        self.assertEqual(entries[('ETH', 'USD')]['price'], Decimal('3000'))
+        self.assertEqual(entries[('BTC', 'USD')]['price'], Decimal('65000'))
+
+    def test_writes_racing_on_a_key_are_retried(self):
+        now = timezone.now()
+        client = get_redis()
+        transaction = client.transaction
+
+        raced = []
+
+        # Another drain stores a newer tick between the read and the write
+        def racing(func, *watches, **kwargs):
+            def interleaved(pipe):
+                written = func(pipe)
+                if not raced:
+                    raced.append(client.set(cache_key('ETH', 'USD'), json.dumps(
+                        {'price': '3100', 'timestamp': now.isoformat()})))
+                return written
+            return transaction(interleaved, *watches, **kwargs)
+
+        with mock.patch.object(client, 'transaction', racing):
+            written = write_latest_prices(
+                [('ETH', 'USD', Decimal('3000'), now - timedelta(minutes=1))])
+
+        self.assertEqual(written, 0)
+        self.assertEqual(read_latest_prices([('ETH', 'USD')])[('ETH', 'USD')]['price'],
+                         Decimal('3100'))
+
+
+@override_settings(REDIS_URL='memory://')
+class ConversionTests(TestCase):
+
+    def setUp(self):
+        get_redis().flushdb()
+        rate_matrix.reset()
+        self.t0 = timezone.now() - timedelta(days=2)
+
+    def snapshot(self, base, target, rate, hours):
+        snapshot = ExchangeRateSnapshot.objects.create(
+            base_currency=base, target_currency=target, rate=rate)
+        ExchangeRateSnapshot.objects.filter(pk=snapshot.pk).update(
+            timestamp=self.t0 + timedelta(hours=hours))
+
+    def test_graph_finds_shortest_path_through_intermediates(self):
+        graph = CurrencyGraph([('USD', 'KES'), ('USD', 'EUR'), ('EUR', 'GBP')])
+
+        self.assertEqual(graph.path('KES', 'GBP'), ['KES', 'USD', 'EUR', 'GBP'])
+        with self.assertRaises(ConversionError):
+            graph.path('KES', 'JPY')
+
+    def test_factors_use_the_rate_valid_at_each_tick(self):
+        self.snapshot('USD', 'KES', '100', 0)
+        self.snapshot('USD', 'KES', '200', 10)
+        self.snapshot('USD', 'EUR', '0.5', 0)
+        ticks = [self.t0 + timedelta(hours=h) for h in (1, 11, 12)]
+
+        factors = conversion_factors(ticks, 'KES', 'EUR')
+
+        self.assertEqual(list(factors), [0.005, 0.0025, 0.0025])
+
+    def test_rates_version_moves_once_snapshots_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ExchangeRateSnapshot.objects.create(base_currency='USD',
+                                                target_currency='EUR', rate='0.9')
+            save_rate_snapshots([RateQuote('USD', 'KES', Decimal('130'), self.t0)])
+            self.assertIsNone(current_rates_version())
+
+        self.assertEqual(current_rates_version(), '2')
+
+
+class DownsamplingTests(TestCase):
+
+    def test_lttb_keeps_endpoints_and_extremes(self):
+        x = np.arange(1000, dtype=np.float64)
+        y = np.sin(x / 50)
+        y[537] = 25  # a single spike must survive
+
+        keep = lttb_indices(x, y, 100)
+
+        self.assertEqual(len(keep), 100)
+        self.assertEqual((keep[0], keep[-1]), (0, 999))
+        self.assertIn(537, keep)
+        self.assertTrue(np.all(np.diff(keep) > 0))
+
+    def test_short_series_are_returned_whole(self):
+        self.assertEqual(list(lttb_indices(np.arange(5.0), np.arange(5.0), 10)),
+                         [0, 1, 2, 3, 4])
+
+    def test_queryset_is_downsampled_per_currency(self):
+        user = make_user()
+        now = timezone.now()
+        for currency in ('USD', 'EUR'):
+            ScrapeLog.objects.bulk_create(
+                ScrapeLog(user=user, coin='BTC', currency=currency, price=i,
+                          timestamp=now - timedelta(minutes=i))
+                for i in range(50))
+
+        logs = downsample_queryset(
+            ScrapeLog.objects.order_by('timestamp'), 10, 'timestamp', 'price',
+            series_field='currency')
+
+        self.assertEqual(logs.filter(currency='USD').count(), 10)
+        self.assertEqual(logs.filter(currency='EUR').count(), 10)
+
+    def test_series_that_fit_are_not_listed_by_id(self):
+        user = make_user()
+        now = timezone.now()
+        for currency, count in (('USD', 50), ('EUR', 5)):
+            ScrapeLog.objects.bulk_create(
+                ScrapeLog(user=user, coin='BTC', currency=currency, price=i,
+                          timestamp=now - timedelta(minutes=i))
+                for i in range(count))
+        queryset = ScrapeLog.objects.order_by('timestamp')
+
+        self.assertIs(downsample_queryset(queryset, 50, 'timestamp', 'price',
+                                          series_field='currency'), queryset)
+        logs = downsample_queryset(queryset, 10, 'timestamp', 'price',
+                                   series_field='currency')
+        self.assertEqual(logs.filter(currency='EUR').count(), 5)
+        self.assertIn('"currency" IN', str(logs.query))
+
+
+@override_settings(REDIS_URL='memory://')
+class AnalyticsTests(TestCase):
+
+    def setUp(self):
+        get_redis().flushdb()
+        self.start = bucket_start(timezone.now() - timedelta(hours=30), '1h')
+
+    def candles(self, coin, closes, offset=0):
+        PriceCandle.objects.bulk_create(
+            PriceCandle(resolution='1h', coin=coin, currency='USD',
+                        bucket=self.start + timedelta(hours=offset + i),
+                        open=close, high=close, low=close, close=close,
+                        count=1, open_at=self.start, close_at=self.start)
+            for i, close in enumerate(closes))
+
+    def test_pair_statistics(self):
+        steps = np.random.default_rng(7).normal(0, 0.03, 19)
+        btc = list(100 * np.exp(np.concatenate([[0], np.cumsum(steps)])))
+        self.candles('BTC', btc)
+        # ETH moves exactly twice as hard in log terms
+        eth = [b ** 2 / 100 for b in btc]
+        self.candles('ETH', eth)
+
+        result = compare_pair('eth', 'btc', window=5)
+
+        self.assertEqual(result['points'], 20)
+        self.assertAlmostEqual(result['correlation']['spearman'], 1.0, places=6)
+        self.assertAlmostEqual(result['correlation']['pearson'], 1.0, places=4)
+        self.assertAlmostEqual(result['total_return']['BTC'], btc[-1] / btc[0] - 1,
+                               places=6)
+        self.assertAlmostEqual(result['relative_performance'],
+                               (eth[-1] / eth[0]) / (btc[-1] / btc[0]) - 1, places=6)
+        self.assertAlmostEqual(result['beta'], 2.0, places=3)
+
+    def test_gaps_carry_the_last_close_forward(self):
+        self.candles('BTC', [1, 2, 3, 4, 5])
+        self.candles('ETH', [1, 2])
+        self.candles('ETH', [4, 5], offset=3)
+        # SOL only starts trading at the third hour
+        self.candles('SOL', [3, 3, 3], offset=2)
+
+        self.assertEqual(compare_pair('BTC', 'ETH')['points'], 5)
+        self.assertEqual(compare_pair('BTC', 'SOL')['points'], 3)
+
+    def test_results_are_memoized_until_candles_change(self):
+        self.candles('BTC', [1, 2, 3, 4])
+        self.candles('ETH', [4, 3, 2, 1])
+        compare_pair('BTC', 'ETH')
+
+        with self.assertNumQueries(0):
+            compare_pair('BTC', 'ETH')
+        bump_candle_versions([('ETH', 'USD')])
+        with self.assertNumQueries(1):
+            compare_pair('BTC', 'ETH')
+
+    def test_needs_overlapping_history(self):
+        self.candles('BTC', [1, 2, 3])
+        with self.assertRaises(AnalyticsError):
+            compare_pair('BTC', 'ETH')
+
+
+@override_settings(REDIS_URL='memory://', ALERT_COOLDOWN_SECONDS=600)
+class PriceAlertTests(TestCase):
+
+    def setUp(self):
+        get_redis().flushdb()
+        self.now = timezone.now()
+        self.user = make_user()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.preference = UserPreference.objects.create(
+                user=self.user, favorite_coins=['btc', 'eth'], notify_threshhold=5)
+        mail.outbox = []
+
+    def tick(self, price, coin='BTC', currency='USD'):
+        return evaluate_alerts([(coin, currency, price, self.now)])
+
+    def test_index_follows_favorite_coins(self):
+        redis_client = get_redis()
+        self.assertEqual(redis_client.smembers(watchers_key('ETH', 'USD')),
+                         {str(self.preference.pk)})
+
+        self.preference.favorite_coins = ['BTC']
+        # Until the save commits the index keeps the old coins
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.preference.save()
+        self.assertEqual(redis_client.smembers(watchers_key('ETH', 'USD')),
+                         {str(self.preference.pk)})
+        callbacks[0]()
+        self.assertEqual(redis_client.smembers(watchers_key('ETH', 'USD')), set())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.preference.delete()
+        self.assertEqual(redis_client.smembers(watchers_key('BTC', 'USD')), set())
+
+    def test_threshold_crossing_fires_once_per_cooldown(self):
+        self.assertEqual(self.tick('100'), [])  # seeds the reference price
+        with self.assertNumQueries(0):
+            self.assertEqual(self.tick('104'), [])
+        self.assertEqual(self.tick('100', currency='EUR'), [])
+
+        alerts = self.tick('94')
+        self.assertEqual([(a['coin'], a['change']) for a in alerts], [('BTC', -6.0)])
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('BTC moved -6.00%', mail.outbox[0].subject)
+
+        # The cooldown swallows the next crossing; ETH is tracked separately
+        self.assertEqual(self.tick('80'), [])
+        self.tick('10', coin='ETH')
+        self.assertEqual(len(self.tick('11', coin='ETH')), 1)
+
+    def test_disabled_preferences_are_not_watched(self):
+        self.preference.notify_on_price_change = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.preference.save()
+        self.tick('100')
+        self.assertEqual(self.tick('200'), [])
+
+
+@override_settings(REDIS_URL='memory://')
+class BenchmarkSuiteTests(TestCase):
+
+    def setUp(self):
+        get_redis().flushdb()
+        rate_matrix.reset()
+
+    def test_gbm_paths_are_deterministic_and_correlated(self):
+        paths = gbm_paths([100, 50], 5000, 3600, seed=7, correlation=0.5)
+        self.assertTrue(np.array_equal(paths, gbm_paths([100, 50], 5000, 3600, seed=7)))
+        self.assertEqual(paths[0].tolist(), [100, 50])
+        returns = np.diff(np.log(paths), axis=0)
+        self.assertAlmostEqual(np.corrcoef(returns, rowvar=False)[0, 1], 0.5, delta=0.05)
+
+    def test_seed_then_benchmark(self):
+        call_command('seed_market_data', users=2, coins=3, days=10,
+                     interval_minutes=240, activities=20, comparisons=5,
+                     stdout=StringIO())
+        self.assertEqual(ScrapeLog.objects.count(), 2 * 3 * 60)
+        self.assertEqual(ExchangeRateSnapshot.objects.count(), 4 * 60)
+        self.assertEqual(UserActivity.objects.count(), 40)
+        self.assertTrue(PriceCandle.objects.filter(resolution='1d').exists())
+
+        out = StringIO()
+        call_command('run_benchmarks', repeat=1, warmup=0,
+                     only=['scrape_logs.price_history', 'roll_up'], stdout=out)
+        results = json.loads(out.getvalue())
+        self.assertEqual(results['meta']['rows']['ScrapeLog'], 360)
+        self.assertEqual(set(results['endpoints']), {
+            'scrape_logs.price_history', 'scrape_logs.price_history_1y_downsampled',
+            'scrape_logs.price_history_1y_candles', 'scrape_logs.price_history_converted'})
+        self.assertTrue(all(result['status'] == 200
+                            for result in results['endpoints'].values()))
+        self.assertEqual(results['tasks']['roll_up_price_candles.full']['state'], 'SUCCESS')
+        # Task runs are rolled back
+        self.assertEqual(ScrapeLog.objects.count(), 360)
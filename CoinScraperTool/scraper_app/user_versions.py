@@ -0,0 +1,50 @@
+import logging
+
+import redis
+from django.dispatch import Signal
+
+from core.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+VERSION_PREFIX = 'user_data:version'
+# Scope of results read across every user's rows (e.g. staff error views)
+ALL_USERS = 'all'
+
+# Sent (with the model as sender) when a bump could not be stored: results
+# cached under the current versions may then be stale
+bump_failed = Signal()
+
+
+def version_key(model, scope):
+    return f"{VERSION_PREFIX}:{model._meta.label_lower}:{scope}"
+
+
+# Bumped whenever a user's rows of `model` change, so results cached from
+# them (e.g. API responses) move on to a new key. Callers bump once the
+# write has committed (transaction.on_commit); a bump made earlier would let
+# a concurrent read cache the old rows under the new version.
+def bump_user_versions(model, user_ids):
+    scopes = {user_id for user_id in user_ids if user_id is not None} | {ALL_USERS}
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for scope in scopes:
+            pipe.incr(version_key(model, scope))
+        pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Could not bump %s versions: %s", model._meta.label, exc)
+        bump_failed.send(sender=model)
+
+
+def user_versions(models, scope):
+    """
+    Current versions of `models` for one user (or ALL_USERS); None when
+    Redis cannot be read, in which case nothing may be served from cache
+    """
+    try:
+        versions = get_redis().mget([version_key(model, scope) for model in models])
+    except redis.RedisError as exc:
+        logger.warning("Could not read user data versions: %s", exc)
+        return None
+    return tuple(version or '0' for version in versions)
@@ -16,11 +16,10 @@ class AsyncPasswordResetForm(PasswordResetForm):
         subject = loader.render_to_string(subject_template_name, context)
         subject = ''.join(subject.splitlines())
 
+        # Only JSON-safe values can cross the broker, so the link is built here
+        reset_link = "{}://{}/{}".format(
+            context['protocol'], context['domain'],
+            settings.PASSWORD_RESET_CONFIRM_URL.format(
+                uid=context['uid'], token=context['token']))
         send_password_reset_email.delay(
-            subject,
-            from_email,
-            to_email,
-            context,
-            html_email_template_name or "emails/password_reset_email.html",
-            text_template=email_template_name or "emails/password_reset_email.html"
-        )
+            to_email, reset_link, context['user'].get_username(), subject=subject)
@@ -0,0 +1,92 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template import loader
+
+
+# ✅ One outgoing email: templates plus the recipient's own (JSON-safe) context
+Mail = namedtuple('Mail', ['to', 'subject', 'text_template', 'html_template', 'context'])
+
+
+class MailDeliveryError(Exception):
+    """
+    Raised when a batch fails part way; `sent` messages already went out
+    """
+
+    def __init__(self, sent, error):
+        super().__init__(str(error))
+        self.sent = sent
+        self.error = error
+
+
+# ✅ Rendering a batch, compiling each distinct template only once
+def build_messages(mails):
+    templates = {}
+
+    def render(name, context):
+        if name not in templates:
+            templates[name] = loader.get_template(name)
+        return templates[name].render(context)
+
+    messages = []
+    for mail in mails:
+        mail = Mail(*mail)
+        context = mail.context or {}
+        msg = EmailMultiAlternatives(
+            mail.subject, render(mail.text_template, context),
+            settings.EMAIL_HOST_USER, [mail.to])
+        if mail.html_template:
+            msg.attach_alternative(render(mail.html_template, context), "text/html")
+        messages.append(msg)
+    return messages
+
+
+# ✅ Sending a batch over one SMTP connection
+def deliver(mails, connection=None):
+    """
+    Opens the connection once for the whole batch. Messages go out one
+    `send_messages` call at a time so a failure reports how many were
+    already delivered and a retry can resume after them.
+    """
+    messages = build_messages(mails)
+    if not messages:
+        return 0
+    connection = connection or get_connection()
+    sent = 0
+    try:
+        with connection:
+            for message in messages:
+                sent += connection.send_messages([message]) or 0
+    except Exception as exc:
+        raise MailDeliveryError(sent, exc) from exc
+    return sent
+
+
+# ✅ Collecting mails and handing them to the worker in fixed-size batches
+class MailQueue:
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or settings.MAIL_BATCH_SIZE
+        self.pending = []
+
+    def add(self, to, subject, text_template, html_template=None, context=None):
+        self.pending.append(Mail(to, subject, text_template, html_template, context))
+
+    def flush(self):
+        # Imported here: the tasks module imports this one
+        from .tasks import send_mail_batch
+
+        batches = 0
+        pending, self.pending = self.pending, []
+        for start in range(0, len(pending), self.batch_size):
+            send_mail_batch.delay(pending[start:start + self.batch_size])
+            batches += 1
+        return batches
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.flush()
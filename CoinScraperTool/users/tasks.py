@@ -1,44 +1,48 @@
+import logging
+
 from celery import shared_task
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
 from django.conf import settings
 
+from .mailer import Mail, MailDeliveryError, deliver
+
+
+logger = logging.getLogger(__name__)
 
-# ✅ Sending emails asynchronously
-@shared_task
-def send_welcome_email(user_email, username):
-    subject = "Welcome to Coinlytics"
-    from_email = settings.EMAIL_HOST_USER
-    recipient_list = [user_email]
 
-    # rendering the template with context
-    html_content = render_to_string(
-        "emails/welcome_email.html", {"username": username})
+# Delivers `mails`, or schedules a retry of `task` with exponential backoff;
+# with `resume` the retry gets only the mails that did not go out
+def deliver_or_retry(task, mails, resume=False):
+    try:
+        return deliver(mails)
+    except MailDeliveryError as exc:
+        remaining = mails[exc.sent:]
+        if task.request.retries >= settings.MAIL_MAX_RETRIES:
+            logger.error("Giving up on %s emails after %s retries: %s",
+                         len(remaining), task.request.retries, exc.error)
+            raise exc.error
+        countdown = settings.MAIL_RETRY_BACKOFF * 2 ** task.request.retries
+        raise task.retry(args=[remaining] if resume else None, exc=exc.error,
+                         countdown=countdown)
 
-    # fallback text when html is not rendered
-    text_context = f"Hi {username}, \n\nThanks for signing up with CoinScraper!"
 
-    # building the mail
-    msg = EmailMultiAlternatives(
-        subject, text_context, from_email, recipient_list)
-    msg.attach_alternative(html_content, "text/html")
-    msg.send()
+# ✅ Sending one batch of queued mails, retrying the undelivered rest with backoff
+@shared_task(bind=True, max_retries=None)
+def send_mail_batch(self, mails):
+    sent = deliver_or_retry(self, mails, resume=True)
+    return f"📧 Sent {sent}/{len(mails)} emails."
+
+
+# ✅ Sending emails asynchronously
+@shared_task(bind=True, max_retries=None)
+def send_welcome_email(self, user_email, username):
+    deliver_or_retry(self, [Mail(user_email, "Welcome to Coinlytics",
+                                 "emails/welcome_email.txt", "emails/welcome_email.html",
+                                 {"username": username})])
 
 
 # ✅ sending reset passwords emails asynchronously
-def send_password_reset_email(user_email, reset_link, username):
-    subject = "Password Reset Request 🔑"
-    from_email = settings.EMAIL_HOST_USER
-    recipient_list = [user_email]
-
-    html_content = render_to_string(
-        "emails/password_reset.html", {"username": username,
-                                       "reset_link": reset_link}
-    )
-
-    text_content = f"Hi {username},\nClick here to reset your password: {reset_link}"
-
-    msg = EmailMultiAlternatives(
-        subject, text_content, from_email, recipient_list)
-    msg.attach_alternative(html_content, "text/html")
-    msg.send()
+@shared_task(bind=True, max_retries=None)
+def send_password_reset_email(self, user_email, reset_link, username, subject=None):
+    deliver_or_retry(self, [Mail(user_email, subject or "Password Reset Request 🔑",
+                                 "emails/password_reset.txt", "emails/password_reset.html",
+                                 {"username": username, "reset_link": reset_link})])
@@ -1,3 +1,90 @@
-from django.test import TestCase
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.template import loader
+from django.test import TestCase, override_settings
+
+from core.testing import make_user
+
+from .forms import AsyncPasswordResetForm
+from .mailer import Mail, MailQueue, deliver
+from .tasks import send_mail_batch, send_welcome_email
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                   MAIL_BATCH_SIZE=2, MAIL_RETRY_BACKOFF=0)
+class MailerTests(TestCase):
+
+    def setUp(self):
+        mail.outbox = []
+
+    def mails(self, count):
+        return [Mail(f'user{i}@example.com', 'Hello', 'emails/welcome_email.txt',
+                     'emails/welcome_email.html', {'username': f'user{i}'})
+                for i in range(count)]
+
+    def test_batch_renders_per_recipient_over_one_connection(self):
+        with mock.patch('django.template.loader.get_template',
+                        wraps=loader.get_template) as get_template:
+            self.assertEqual(deliver(self.mails(3)), 3)
+
+        self.assertEqual(get_template.call_count, 2)
+        self.assertEqual([m.to for m in mail.outbox],
+                         [['user0@example.com'], ['user1@example.com'], ['user2@example.com']])
+        self.assertIn('Hi user2', mail.outbox[2].body)
+        self.assertIn('user2', mail.outbox[2].alternatives[0][0])
+
+    def test_queue_flushes_fixed_size_batches(self):
+        with mock.patch('users.tasks.send_mail_batch.delay') as delay:
+            with MailQueue() as queue:
+                for m in self.mails(5):
+                    queue.add(*m)
+
+        self.assertEqual([len(call.args[0]) for call in delay.call_args_list], [2, 2, 1])
+
+    def test_failed_batch_retries_only_undelivered_mails(self):
+        real_send = mail.get_connection().__class__.send_messages
+        calls = []
+
+        def flaky_send(connection, messages):
+            calls.append(messages[0].to[0])
+            if len(calls) == 2:
+                raise SMTPException('connection dropped')
+            return real_send(connection, messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        flaky_send):
+            send_mail_batch.apply(args=[self.mails(3)])
+
+        self.assertEqual(calls, ['user0@example.com', 'user1@example.com',
+                                 'user1@example.com', 'user2@example.com'])
+        self.assertEqual(len(mail.outbox), 3)
+
+    @override_settings(MAIL_MAX_RETRIES=1)
+    def test_welcome_email_retries_smtp_failures(self):
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=SMTPException('connection refused')) as send:
+            result = send_welcome_email.apply(args=['member@example.com', 'member'])
+
+        self.assertEqual(send.call_count, 2)
+        self.assertIsInstance(result.result, SMTPException)
+
+    @override_settings(
+        PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_password_reset_form_queues_a_reset_link(self):
+        user = make_user()
+        user.set_password('s3cret-pass')
+        user.save()
+        mail.outbox = []
+        form = AsyncPasswordResetForm({'email': 'member@example.com'})
+        self.assertTrue(form.is_valid())
+
+        form.save(domain_override='coinlytics.test',
+                  subject_template_name='emails/password_reset_subject.txt',
+                  email_template_name='emails/password_reset.txt',
+                  html_email_template_name='emails/password_reset.html')
+
+        self.assertEqual(mail.outbox[0].to, ['member@example.com'])
+        self.assertEqual(mail.outbox[0].subject, 'Reset your Coinscraper password')
+        self.assertIn('http://coinlytics.test/password-reset/', mail.outbox[0].body)